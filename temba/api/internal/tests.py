@@ -1,6 +1,10 @@
+import base64
+import json
 from datetime import timedelta
 from unittest.mock import call, patch
 
+from django.db import connection
+from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 
@@ -11,10 +15,11 @@ from temba.ai.types.openai.type import OpenAIType
 from temba.api.tests.mixins import APITestMixin
 from temba.campaigns.models import Campaign, CampaignEvent
 from temba.contacts.models import Contact, ContactExport, ContactField, ContactGroup, ContactURN
-from temba.flows.models import Flow, FlowLabel
+from temba.flows.models import Flow, FlowActivityCount, FlowLabel
 from temba.globals.models import Global
 from temba.knowledge.models import Article, Knowledge
-from temba.msgs.models import Broadcast, Msg
+from temba.msgs.api import MessagesEndpoint
+from temba.msgs.models import Broadcast, Msg, MsgFolder
 from temba.notifications.types import ExportFinishedNotificationType
 from temba.orgs.models import Org, OrgRole
 from temba.schedules.models import Schedule
@@ -211,12 +216,48 @@ class EndpointsTest(APITestMixin, TembaTest):
         self.assertEqual(1, response.json()["count"])
         response = self.assertGet(endpoint_url + "?search=bob", [self.admin], results=[msg2])
         self.assertEqual(1, response.json()["count"])
+        self.assertNotIn("count_capped", response.json())
+        self.assertNotIn("contacts_capped", response.json())
+
+        # if too many contacts match by name, the response says so
+        with patch("temba.msgs.api.MessagesEndpoint.SEARCH_MAX_CONTACTS", 0):
+            response = self.assertGet(endpoint_url + "?search=bob", [self.admin], results=[])
+            self.assertTrue(response.json()["contacts_capped"])
+
+        # the text and contact matches are served by their own indexes rather than a check of every message
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plan = (
+            MsgFolder.INBOX.get_queryset(self.org)
+            .filter(
+                Q(created_on__gte=timezone.now() - MessagesEndpoint.SEARCH_WINDOW)
+                & (Q(text__icontains="bob") | Q(contact_id__in=[contact2.id]))
+            )
+            .explain()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = on")
+
+        self.assertIn("BitmapOr", plan)
+        self.assertIn("msgs_text_search", plan)
+        self.assertIn("msgs_by_contact", plan)
+
+        # counting of search matches stops at the limit
+        with patch("temba.msgs.api.MessagesEndpoint.Pagination.search_count_limit", 2):
+            response = self.assertGet(endpoint_url + "?search=ann", [self.admin], results=[live_msg, msg1, old_msg])
+            self.assertEqual(2, response.json()["count"])
+            self.assertTrue(response.json()["count_capped"])
 
         # search is rejected with 413 if it exceeds the legacy 1000-char cap (matches BaseListView.search_max_length)
         self.login(self.admin)
         response = self.client.get(endpoint_url + "?search=" + "x" * 1001)
         self.assertEqual(413, response.status_code)
 
+        # and rejected with 400 if it's too short to use the trigram indexes
+        response = self.client.get(endpoint_url + "?search=bo")
+        self.assertEqual(400, response.status_code)
+
         # search is restricted to the last 90 days; unfiltered listing below still includes the backdated message
         ancient = self.create_incoming_msg(contact1, "ancient", created_on=timezone.now() - timedelta(days=120))
         self.assertGet(endpoint_url + f"?search={ancient.text}", [self.admin], results=[])
@@ -563,6 +604,9 @@ class EndpointsTest(APITestMixin, TembaTest):
             flow1.counts.create(scope=scope, count=count)
         flow2.counts.create(scope="status:W", count=5)
 
+        # sorting by run counts reads the totals maintained by squashing
+        FlowActivityCount.squash()
+
         # and some recent engagement for the sparkline
         today = timezone.now().date()
         flow1.counts.create(scope=f"msgsin:date:{today - timedelta(days=1)}", count=3)
@@ -616,6 +660,39 @@ class EndpointsTest(APITestMixin, TembaTest):
         # an unknown sort falls back to the folder's default ordering
         self.assertGet(endpoint_url + "?sort=nope", [self.admin], results=[flow2, flow1])
 
+        # passing a cursor switches to keyset pagination which can walk forwards and backwards through any sort
+        self.login(self.admin)
+
+        def get_uuids(response):
+            return [r["uuid"] for r in response.json()["results"]]
+
+        for sort, expected in (("", [flow2, flow1]), ("-runs", [flow1, flow2]), ("-name", [flow2, flow1])):
+            response = self.client.get(endpoint_url + f"?sort={sort}&page_size=1&cursor=")
+            self.assertEqual([str(expected[0].uuid)], get_uuids(response))
+            self.assertEqual(2, response.json()["count"])
+            self.assertFalse(response.json()["count_estimated"])
+            self.assertIsNone(response.json()["previous"])
+
+            response = self.client.get(response.json()["next"])
+            self.assertEqual([str(expected[1].uuid)], get_uuids(response))
+            self.assertIsNone(response.json()["next"])
+
+            response = self.client.get(response.json()["previous"])
+            self.assertEqual([str(expected[0].uuid)], get_uuids(response))
+            self.assertIsNone(response.json()["previous"])
+            self.assertIsNotNone(response.json()["next"])
+
+        # totals beyond the exact count limit come from the query planner
+        with patch("temba.api.support.KeysetListPagination.exact_count_limit", 1):
+            response = self.client.get(endpoint_url + "?cursor=")
+            self.assertEqual([str(flow2.uuid), str(flow1.uuid)], get_uuids(response))
+            self.assertTrue(response.json()["count_estimated"])
+            self.assertGreaterEqual(response.json()["count"], 2)
+
+        # an invalid cursor is rejected
+        response = self.client.get(endpoint_url + "?cursor=xyz")
+        self.assertEqual(404, response.status_code)
+
         # an over-long search query is rejected
         self.login(self.admin)
         response = self.client.get(endpoint_url + "?search=" + ("x" * 1001))
@@ -1252,6 +1329,40 @@ class EndpointsTest(APITestMixin, TembaTest):
 
         self.assertGet(endpoint_url + "?folder=scheduled", [self.admin], raw=check_scheduled_shape)
 
+        # keyset cursors can walk forwards and backwards through the scheduled folder
+        self.login(self.admin)
+
+        def get_uuids(response):
+            return [r["uuid"] for r in response.json()["results"]]
+
+        for sort, expected in (
+            ("next_fire", [bcast4, bcast3, bcast5]),
+            ("-next_fire", [bcast5, bcast3, bcast4]),
+        ):
+            response = self.client.get(endpoint_url + f"?folder=scheduled&sort={sort}&page_size=1&cursor=")
+            walked = get_uuids(response)
+            while response.json()["next"]:
+                response = self.client.get(response.json()["next"])
+                walked += get_uuids(response)
+
+            self.assertEqual([str(b.uuid) for b in expected], walked, f"forwards mismatch for sort {sort}")
+
+            while response.json()["previous"]:
+                response = self.client.get(response.json()["previous"])
+                walked += get_uuids(response)
+
+            self.assertEqual(
+                [str(b.uuid) for b in expected + list(reversed(expected[:-1]))],
+                walked,
+                f"backwards mismatch for {sort}",
+            )
+
+        # a cursor whose values don't match the number or types of the sort keys is rejected
+        for values in (["x"], ["x", "y"]):
+            cursor = base64.urlsafe_b64encode(json.dumps({"v": values, "r": False}).encode()).decode()
+            response = self.client.get(endpoint_url + f"?sort=created_on&cursor={cursor}")
+            self.assertEqual(404, response.status_code)
+
     def test_triggers(self):
         endpoint_url = reverse("api.internal.triggers") + ".json"
 
@@ -6,10 +6,11 @@ from smartmin.models import SmartModel
 
 from django.conf import settings
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from temba.orgs.models import Org, OrgRole
+from temba.orgs.models import Org, OrgMembership, OrgRole
 from temba.utils.models import JSONAsTextField
 from temba.utils.text import generate_secret
 
@@ -210,6 +211,9 @@ class APIToken(models.Model):
 
     ALLOWED_ROLES = (OrgRole.ADMINISTRATOR, OrgRole.EDITOR)
 
+    # fields of the user's membership of the org which are loaded with the token
+    MEMBERSHIP_FIELDS = ("id", "role_code", "team_id", "can_assign", "can_reply_non_own", "last_seen_on")
+
     key = models.CharField(max_length=40, primary_key=True)
     org = models.ForeignKey(Org, on_delete=models.PROTECT, related_name="api_tokens")
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name="api_tokens")
@@ -227,6 +231,35 @@ class APIToken(models.Model):
 
         return cls.objects.create(user=user, org=org, key=generate_secret(40))
 
+    @classmethod
+    def get_active(cls, key: str):
+        """
+        Gets the active token with the given key, with its user, org and the user's membership of the org loaded by a
+        single query, so that authenticating and then checking permissions doesn't require any further queries.
+        """
+
+        membership = OrgMembership.objects.filter(org=OuterRef("org"), user=OuterRef("user"))
+        token = (
+            cls.objects.filter(is_active=True, key=key)
+            .select_related("user", "org", "org__parent")
+            .annotate(**{f"membership_{f}": Subquery(membership.values(f)[:1]) for f in cls.MEMBERSHIP_FIELDS})
+            .first()
+        )
+        if not token:
+            return None
+
+        # cache the membership on the org, or its absence if the user no longer has a role in the org
+        membership = None
+        if token.membership_id:
+            membership = OrgMembership(org=token.org, user=token.user)
+            for f in cls.MEMBERSHIP_FIELDS:
+                setattr(membership, f, getattr(token, f"membership_{f}"))
+            membership._state.adding = False
+            membership._state.db = token._state.db
+
+        token.org._membership_cache[token.user] = membership
+        return token
+
     def record_used(self):
         r = get_valkey_connection()
         r.sadd("api_tokens_used", self.key)
@@ -1,13 +1,20 @@
+import base64
+import json
 import logging
+from datetime import date, datetime
 
 from rest_framework import exceptions, status
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication, TokenAuthentication
 from rest_framework.exceptions import APIException
 from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, OrderBy, Q
 from django.http import HttpResponse, HttpResponseServerError
 
 from temba.utils import str_to_bool
@@ -45,12 +52,10 @@ class APITokenAuthentication(RequestAttributesMixin, TokenAuthentication):
     """
 
     model = APIToken
-    select_related = ("user", "org", "org__parent")
 
     def authenticate_credentials(self, key):
-        try:
-            token = self.model.objects.select_related(*self.select_related).get(is_active=True, key=key)
-        except self.model.DoesNotExist:
+        token = self.model.get_active(key)
+        if not token:
             raise exceptions.AuthenticationFailed("Invalid token")
 
         if token.user.is_active:
@@ -155,15 +160,19 @@ class DocumentationRenderer(BrowsableAPIRenderer):
 class SearchLengthMixin:
     """
     View mixin that rejects an over-long `search=` value with a 413 before it can drive an expensive database/ES
-    query — the same cap and response as BaseListView.
+    query — the same cap and response as BaseListView. Views whose search relies on trigram indexes can also set
+    `search_min_length` to reject searches too short to use them with a 400.
     """
 
     search_max_length = 1_000
+    search_min_length = 0
 
     def get(self, request, *args, **kwargs):
         search = request.query_params.get("search") or ""
         if len(search) > self.search_max_length:
             return HttpResponse("Search query too long", status=413)
+        if search and len(search) < self.search_min_length:
+            return HttpResponse("Search query too short", status=400)
         return super().get(request, *args, **kwargs)
 
 
@@ -172,20 +181,39 @@ class SearchCountMixin:
     Pagination mixin that includes a `count` of matching rows on the response when the request carries a `search=`
     query param. CursorPagination omits count by default to skip a COUNT(*) per request — but searched list views need
     the tally so the UI can surface "N results". A search has already narrowed the queryset enough that the count is
-    cheap; an unfiltered listing still pays no count cost.
+    cheap; an unfiltered listing still pays no count cost. Where a search can still match a huge number of rows, set
+    `search_count_limit` to stop counting at that many - the response then carries `count_capped` so the UI can show
+    "N+ results".
     """
 
+    search_count_limit = None
+
     def paginate_queryset(self, queryset, request, view=None):
         # Capture the count from the filtered queryset before the parent slices it down to a single cursor page. The
         # base CursorPagination doesn't keep the source queryset on `self`, so we have to grab it here.
-        self._search_count = queryset.count() if request.query_params.get("search") else None
+        self._search_count, self._search_count_capped = None, False
+        if request.query_params.get("search"):
+            self._search_count = self.count_search(queryset)
         return super().paginate_queryset(queryset, request, view)
 
+    def count_search(self, queryset) -> int:
+        if self.search_count_limit is None:
+            return queryset.count()
+
+        # counting over a LIMIT subquery lets the database stop as soon as it's seen one row more than the limit
+        count = queryset.order_by()[: self.search_count_limit + 1].count()
+        if count > self.search_count_limit:
+            self._search_count_capped = True
+            return self.search_count_limit
+        return count
+
     def get_paginated_response(self, data):
         response = super().get_paginated_response(data)
         count = getattr(self, "_search_count", None)
         if count is not None:
             response.data["count"] = count
+        if getattr(self, "_search_count_capped", False):
+            response.data["count_capped"] = True
         return response
 
 
@@ -200,6 +228,166 @@ class ListPagination(PageNumberPagination):
     max_page_size = 500
 
 
+class KeysetListPagination(ListPagination):
+    """
+    List component pagination which uses page numbers by default but switches to keyset navigation when the request
+    carries a `cursor` param (empty for the first page). Keyset pages are fetched by filtering on the sort keys of the
+    row at the edge of the previous page rather than with an OFFSET, so deep pages cost the same as the first. The
+    total is exact if there are at most `exact_count_limit` rows, otherwise it's the query planner's estimate and the
+    response carries `count_estimated`.
+
+    The sort keys are taken from the queryset's ordering, which must end with a unique key (e.g. `-id`) and use the
+    database's default placement of nulls.
+    """
+
+    cursor_query_param = "cursor"
+    exact_count_limit = 1_000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request)
+
+        # annotate each sort key so we can read it back from rows and filter on it
+        keys = self.get_keys(queryset)
+        keyed = queryset.annotate(**{f"keyset_{i}": expr for i, (expr, desc) in enumerate(keys)})
+        nullable = [keyed.query.annotations[f"keyset_{i}"].output_field.null for i in range(len(keys))]
+        descending = [desc != reverse for expr, desc in keys]
+
+        if values is not None:
+            if len(values) != len(keys):
+                raise exceptions.NotFound(self.invalid_cursor_message)
+
+            # cursor values which can't be converted to the types of the sort keys are as invalid as a bad encoding
+            try:
+                keyed = keyed.filter(self.after_values(values, descending, nullable))
+            except ValidationError, ValueError, TypeError:
+                raise exceptions.NotFound(self.invalid_cursor_message)
+
+        keyed = keyed.order_by(
+            *[F(f"keyset_{i}").desc() if desc else F(f"keyset_{i}").asc() for i, desc in enumerate(descending)]
+        )
+
+        rows = list(keyed[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next, has_previous = (True, has_more) if reverse else (has_more, values is not None)
+        self.next_cursor = self.row_values(rows[-1], len(keys)) if rows and has_next else None
+        self.previous_cursor = self.row_values(rows[0], len(keys)) if rows and has_previous else None
+        self.count, self.count_estimated = self.get_count(queryset)
+
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(
+            {
+                "count": self.count,
+                "count_estimated": self.count_estimated,
+                "next": self.get_cursor_link(self.next_cursor, reverse=False),
+                "previous": self.get_cursor_link(self.previous_cursor, reverse=True),
+                "results": data,
+            }
+        )
+
+    @staticmethod
+    def get_keys(queryset) -> list[tuple]:
+        """
+        Gets the sort keys of the given queryset as tuples of expression and whether it's descending
+        """
+
+        keys = []
+        for term in queryset.query.order_by or ("-id",):
+            if isinstance(term, str):
+                keys.append((F(term.removeprefix("-")), term.startswith("-")))
+            elif isinstance(term, OrderBy):
+                keys.append((term.expression, term.descending))
+            else:
+                keys.append((term, False))
+        return keys
+
+    @staticmethod
+    def after_values(values: list, descending: list[bool], nullable: list[bool]) -> Q:
+        """
+        Builds a filter for rows which sort after the given key values. Nulls are treated as larger than any value
+        which is how the database orders them by default.
+        """
+
+        after_any = None
+        equal_prior = Q()
+        for i, (value, desc, null) in enumerate(zip(values, descending, nullable)):
+            key = f"keyset_{i}"
+            if value is None:
+                after = Q(**{f"{key}__isnull": False}) if desc else None
+                equal = Q(**{f"{key}__isnull": True})
+            else:
+                after = Q(**{f"{key}__lt" if desc else f"{key}__gt": value})
+                if null and not desc:
+                    after |= Q(**{f"{key}__isnull": True})
+                equal = Q(**{key: value})
+
+            if after is not None:
+                after_any = (equal_prior & after) if after_any is None else (after_any | (equal_prior & after))
+            equal_prior &= equal
+
+        return after_any if after_any is not None else Q(pk__in=[])
+
+    def get_count(self, queryset) -> tuple[int, bool]:
+        """
+        Gets the total for the given queryset, counting only if that can be done cheaply
+        """
+
+        count = queryset.order_by()[: self.exact_count_limit + 1].count()
+        if count <= self.exact_count_limit:
+            return count, False
+
+        try:
+            plan = json.loads(queryset.order_by().explain(format="json"))
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+        except ValueError, LookupError, TypeError:  # pragma: no cover
+            estimate = 0
+
+        return max(estimate, count), True
+
+    @staticmethod
+    def row_values(row, num_keys: int) -> list:
+        return [getattr(row, f"keyset_{i}") for i in range(num_keys)]
+
+    def decode_cursor(self, request) -> tuple[list, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return list(cursor["v"]), bool(cursor["r"])
+        except ValueError, TypeError, KeyError:
+            raise exceptions.NotFound(self.invalid_cursor_message)
+
+    def get_cursor_link(self, values: list, reverse: bool) -> str:
+        if values is None:
+            return None
+
+        def encode_value(v):
+            # isoformat rather than DjangoJSONEncoder which truncates datetimes to milliseconds
+            return v.isoformat() if isinstance(v, (datetime, date)) else str(v)
+
+        cursor = json.dumps({"v": values, "r": reverse}, default=encode_value)
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+
 class CreatedOnCursorPagination(CursorPagination):
     ordering = ("-created_on", "-id")
     offset_cutoff = 100000
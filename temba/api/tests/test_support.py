@@ -0,0 +1,55 @@
+from datetime import datetime, timezone as tzone
+from urllib.parse import parse_qsl, urlparse
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from django.db.models import F
+
+from temba.api.support import KeysetListPagination
+from temba.contacts.models import Contact
+from temba.tests import TembaTest
+
+
+class KeysetListPaginationTest(TembaTest):
+    def test_nullable_keys(self):
+        contact1 = self.create_contact(
+            "Ann", phone="+250788000001", last_seen_on=datetime(2025, 1, 1, tzinfo=tzone.utc)
+        )
+        contact2 = self.create_contact(
+            "Bob", phone="+250788000002", last_seen_on=datetime(2025, 1, 2, tzinfo=tzone.utc)
+        )
+        contact3 = self.create_contact("Cat", phone="+250788000003")
+        contact4 = self.create_contact("Dan", phone="+250788000004")
+
+        contacts = Contact.objects.filter(id__in=[contact1.id, contact2.id, contact3.id, contact4.id])
+        factory = APIRequestFactory()
+
+        def get_page(queryset, params: dict) -> dict:
+            paginator = KeysetListPagination()
+            rows = paginator.paginate_queryset(queryset, Request(factory.get("/contacts.json", params)))
+            return paginator.get_paginated_response([r.id for r in rows]).data
+
+        def follow(queryset, url: str) -> dict:
+            return get_page(queryset, dict(parse_qsl(urlparse(url).query)))
+
+        # last_seen_on is nullable so nulls sort last ascending and first descending, and ties are broken by id. The
+        # ascending sort is an expression rather than a field name or an OrderBy.
+        for queryset, expected in (
+            (contacts.order_by(F("last_seen_on"), "-id"), [contact1, contact2, contact4, contact3]),
+            (contacts.order_by("-last_seen_on", "-id"), [contact4, contact3, contact2, contact1]),
+        ):
+            page = get_page(queryset, {"cursor": "", "page_size": 1})
+            walked = page["results"]
+            while page["next"]:
+                page = follow(queryset, page["next"])
+                walked += page["results"]
+
+            self.assertEqual([c.id for c in expected], walked)
+            self.assertEqual(4, page["count"])
+
+            while page["previous"]:
+                page = follow(queryset, page["previous"])
+                walked += page["results"]
+
+            self.assertEqual([c.id for c in expected + list(reversed(expected[:-1]))], walked)
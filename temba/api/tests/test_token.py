@@ -2,7 +2,7 @@ from django.contrib.auth.models import Group
 
 from temba.api.models import APIToken
 from temba.api.tasks import update_tokens_used
-from temba.orgs.models import OrgRole
+from temba.orgs.models import Org, OrgMembership, OrgRole
 from temba.tests import TembaTest
 
 
@@ -43,3 +43,44 @@ class APITokenTest(TembaTest):
 
         self.assertIsNotNone(token1.last_used_on)
         self.assertIsNone(token2.last_used_on)
+
+    def test_get_active(self):
+        token1 = APIToken.create(self.org, self.admin)
+        token2 = APIToken.create(self.org, self.editor)
+
+        # token is loaded with its org, user and the user's membership in a single query
+        with self.assertNumQueries(1):
+            token = APIToken.get_active(token1.key)
+            self.assertEqual(OrgRole.ADMINISTRATOR, token.org.get_user_role(token.user))
+            self.assertTrue(token.org.get_membership(token.user).can_assign)
+
+        self.assertEqual(token1, token)
+        self.assertEqual(self.org, token.org)
+        self.assertEqual(self.admin, token.user)
+        self.assertEqual(token1.created, token.created)
+
+        # the org and user are always current
+        Org.objects.filter(id=self.org.id).update(name="Renamed")
+        self.assertEqual("Renamed", APIToken.get_active(token1.key).org.name)
+
+        # a user who no longer has a role in the org has a token without a role
+        OrgMembership.objects.filter(org=self.org, user=self.admin).delete()
+
+        with self.assertNumQueries(1):
+            token = APIToken.get_active(token1.key)
+            self.assertIsNone(token.org.get_user_role(token.user))
+
+        # changing the user's role is seen immediately
+        self.org.add_user(self.admin, OrgRole.EDITOR)
+        self.assertEqual(OrgRole.EDITOR, APIToken.get_active(token1.key).org.get_user_role(self.admin))
+
+        # as is releasing the token
+        token1.release()
+        self.assertIsNone(APIToken.get_active(token1.key))
+
+        # or the user
+        self.assertEqual(token2, APIToken.get_active(token2.key))
+        self.editor.release(self.admin)
+        self.assertIsNone(APIToken.get_active(token2.key))
+
+        self.assertIsNone(APIToken.get_active("1234567890"))
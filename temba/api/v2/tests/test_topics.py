@@ -51,7 +51,7 @@ class TopicsEndpointTest(APITest):
                     "created_on": format_datetime(self.org.default_topic.created_on),
                 },
             ],
-            num_queries=self.BASE_SESSION_QUERIES + 3,
+            num_queries=self.BASE_SESSION_QUERIES + 2,
         )
 
         # try to create empty topic
@@ -3333,8 +3333,9 @@ class TopicsEndpoint(ListAPIMixin, WriteAPIMixin, BaseEndpoint):
         return super().get_queryset().filter(is_active=True)
 
     def prepare_for_serialization(self, object_list, using: str):
-        open_counts = Ticket.get_topic_counts(self.request.org, object_list, Ticket.STATUS_OPEN)
-        closed_counts = Ticket.get_topic_counts(self.request.org, object_list, Ticket.STATUS_CLOSED)
+        ticket_counts = Ticket.get_counts(self.request.org)
+        open_counts = ticket_counts.get_topic_counts(object_list, Ticket.STATUS_OPEN)
+        closed_counts = ticket_counts.get_topic_counts(object_list, Ticket.STATUS_CLOSED)
         for topic in object_list:
             topic.open_count = open_counts[topic]
             topic.closed_count = closed_counts[topic]
@@ -4,6 +4,8 @@ import hashlib
 import io
 import re
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 
 from dateutil.relativedelta import relativedelta
@@ -23,6 +25,10 @@ KEY_PATTERN = re.compile(r"^(?P<org>\d+)/(?P<type>run|message)_(?P<period>(D|M)\
 class Archive(models.Model):
     DOWNLOAD_EXPIRES = 60 * 60 * 24  # Up to 24 hours
 
+    # when prefetching, the number of archives to fetch concurrently and the max number of records to hold in memory
+    PREFETCH_ARCHIVES = 4
+    PREFETCH_MAX_RECORDS = 250_000
+
     TYPE_MSG = "message"
     TYPE_FLOWRUN = "run"
     TYPE_CHOICES = ((TYPE_MSG, _("Message")), (TYPE_FLOWRUN, _("Run")))
@@ -141,10 +147,20 @@ class Archive(models.Model):
 
     @classmethod
     def iter_all_records(
-        cls, org, archive_type: str, after: datetime = None, before: datetime = None, where: dict = None
+        cls,
+        org,
+        archive_type: str,
+        after: datetime = None,
+        before: datetime = None,
+        where: dict = None,
+        *,
+        prefetch: int = 0,
+        max_buffered: int = PREFETCH_MAX_RECORDS,
     ):
         """
-        Creates a record iterator across archives of the given type for records which match the given criteria
+        Creates a record iterator across archives of the given type for records which match the given criteria. If
+        prefetch is given, up to that many archives are fetched and decoded concurrently ahead of the archive being
+        iterated, as long as their combined record counts don't exceed max_buffered.
         """
 
         if not where:
@@ -156,6 +172,9 @@ class Archive(models.Model):
 
         archives = cls._get_covering_period(org, archive_type, after, before)
 
+        if prefetch:
+            return cls._iter_prefetched(list(archives), where, prefetch, max_buffered)
+
         def generator():
             for archive in archives:
                 for record in archive.iter_records(where=where):
@@ -163,13 +182,54 @@ class Archive(models.Model):
 
         return generator()
 
-    def iter_records(self, *, where: dict = None):
+    @classmethod
+    def _iter_prefetched(cls, archives: list, where: dict, prefetch: int, max_buffered: int):
         """
-        Creates an iterator for the records in this archive, streaming and decompressing on the fly
+        Iterates over the records of the given archives in order, fetching the next archives in a thread pool
         """
 
+        # boto3 clients are thread safe, but storages create a connection per thread, so share this thread's client
         s3_client = s3.client()
 
+        def fetch(archive) -> list:
+            return list(archive.iter_records(where=where, s3_client=s3_client))
+
+        def generator():
+            remaining = deque(archives)
+            pending = deque()  # of (future, record count) in archive order
+            buffered = 0
+
+            executor = ThreadPoolExecutor(max_workers=prefetch)
+            try:
+                while remaining or pending:
+                    # top up our in-flight fetches, always allowing one so that a huge archive can't stall us
+                    while (
+                        remaining
+                        and len(pending) < prefetch
+                        and (not pending or buffered + remaining[0].record_count <= max_buffered)
+                    ):
+                        archive = remaining.popleft()
+                        pending.append((executor.submit(fetch, archive), archive.record_count))
+                        buffered += archive.record_count
+
+                    future, record_count = pending.popleft()
+
+                    yield from future.result()
+
+                    buffered -= record_count
+            finally:
+                # if iteration is stopped early, don't make the caller wait for fetches that are no longer needed
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return generator()
+
+    def iter_records(self, *, where: dict = None, s3_client=None):
+        """
+        Creates an iterator for the records in this archive, streaming and decompressing on the fly
+        """
+
+        s3_client = s3_client or s3.client()
+
         if where:
             bucket, key = self.get_storage_location()
             response = s3_client.select_object_content(
@@ -255,9 +315,8 @@ def jsonlgz_iterate(in_file):
     in_stream = gzip.GzipFile(fileobj=in_file, mode="r")
 
     def generator():
-        for line in in_stream:
-            record = json.loads(line.decode("utf-8"))
-            yield record
+        for line in jsonl_read_lines(in_stream):
+            yield _jsonl_decoder.decode(line.decode("utf-8"))
 
     return generator()
 
@@ -269,11 +328,8 @@ def jsonlgz_rewrite(in_file, out_file, transform) -> tuple:
     out_wrapped = FileAndHash(out_file)
     out_stream = gzip.GzipFile(fileobj=out_wrapped, mode="w", mtime=0)
 
-    for record in jsonlgz_iterate(in_file):
-        record = transform(record)
-        if record is not None:
-            new_line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
-            out_stream.write(new_line)
+    records = (transform(record) for record in jsonlgz_iterate(in_file))
+    jsonl_write_records(out_stream, (r for r in records if r is not None))
 
     out_stream.close()
 
@@ -285,14 +341,56 @@ def jsonlgz_encode(records: list) -> tuple:
     wrapper = FileAndHash(stream)
     gz = gzip.GzipFile(fileobj=wrapper, mode="wb", mtime=0)
 
-    for record in records:
-        gz.write(json.dumps(record, separators=(",", ":")).encode("utf-8"))
-        gz.write(b"\n")
+    jsonl_write_records(gz, records)
     gz.close()
 
     return stream, wrapper.hash.hexdigest(), wrapper.size
 
 
+# size of the decompressed blocks we read and the batches of encoded lines we write for JSONL streams
+JSONL_BLOCK_SIZE = 1024 * 1024
+
+# shared instances to avoid creating a new decoder and encoder for every record
+_jsonl_decoder = json.TembaDecoder()
+_jsonl_encoder = json.TembaEncoder(separators=(",", ":"))
+
+
+def jsonl_read_lines(in_stream):
+    """
+    Reads a JSONL stream in large blocks and yields its non-empty lines as bytes
+    """
+    remainder = b""
+
+    while block := in_stream.read(JSONL_BLOCK_SIZE):
+        lines = block.split(b"\n")
+        lines[0] = remainder + lines[0]
+        remainder = lines.pop()  # last line is incomplete or empty
+
+        yield from (line for line in lines if line.strip())
+
+    if remainder.strip():
+        yield remainder
+
+
+def jsonl_write_records(out_stream, records):
+    """
+    Encodes records as JSONL and writes them to the given stream in large batches
+    """
+    batch, batch_size = [], 0
+
+    for record in records:
+        line = _jsonl_encoder.encode(record)
+        batch.append(line)
+        batch_size += len(line)
+
+        if batch_size >= JSONL_BLOCK_SIZE:
+            out_stream.write(("\n".join(batch) + "\n").encode("utf-8"))
+            batch, batch_size = [], 0
+
+    if batch:
+        out_stream.write(("\n".join(batch) + "\n").encode("utf-8"))
+
+
 class FileAndHash:
     """
     Stream which writes to both a child stream and a MD5 hash
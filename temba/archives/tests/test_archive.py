@@ -1,4 +1,6 @@
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timezone as tzone
 from unittest.mock import ANY, call, patch
 
@@ -173,6 +175,75 @@ class ArchiveTest(TembaTest):
                 mock_select_object_content.mock_calls,
             )
 
+    def test_iter_all_records_prefetched(self):
+        for d in range(1, 8):
+            self.create_archive(
+                Archive.TYPE_MSG,
+                "D",
+                date(2020, 8, d),
+                [{"id": d * 10 + i, "created_on": f"2020-08-0{d}T1{i}:00:00Z"} for i in range(3)],
+            )
+
+        expected = [d * 10 + i for d in range(1, 8) for i in range(3)]
+
+        # records are returned in archive order regardless of when each fetch completes
+        record_iter = Archive.iter_all_records(self.org, Archive.TYPE_MSG, prefetch=3)
+        self.assertEqual(expected, [r["id"] for r in record_iter])
+
+        # a memory ceiling smaller than a single archive still makes progress one archive at a time
+        record_iter = Archive.iter_all_records(self.org, Archive.TYPE_MSG, prefetch=3, max_buffered=2)
+        self.assertEqual(expected, [r["id"] for r in record_iter])
+
+        # filtering still goes through S3 select on the shared client
+        with patch.object(s3.client(), "select_object_content") as mock_select_object_content:
+            mock_select_object_content.return_value = {"ResponseMetadata": ANY, "Payload": [{"Stats": {}, "End": {}}]}
+
+            record_iter = Archive.iter_all_records(self.org, Archive.TYPE_MSG, where={"id__gt": 30}, prefetch=2)
+            self.assertEqual([], list(record_iter))
+            self.assertEqual(7, mock_select_object_content.call_count)
+
+        # stopping iteration early doesn't wait for fetches still in flight, and cancels any not yet started
+        real_iter_records = Archive.iter_records
+        started, release = threading.Event(), threading.Event()
+        fetched = []
+
+        def iter_records(archive, **kwargs):
+            if archive.start_date != date(2020, 8, 1):
+                started.set()
+                release.wait(5)
+            records = list(real_iter_records(archive, **kwargs))
+            fetched.append(archive.start_date)
+            return iter(records)
+
+        futures, shutdowns = [], []
+
+        class TrackedExecutor(ThreadPoolExecutor):
+            def __init__(self, max_workers):
+                super().__init__(max_workers=1)  # so that later fetches are queued behind the blocked one
+
+            def submit(self, fn, *args, **kwargs):
+                futures.append(super().submit(fn, *args, **kwargs))
+                return futures[-1]
+
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                shutdowns.append((wait, cancel_futures))
+                super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+        with (
+            patch.object(Archive, "iter_records", autospec=True, side_effect=iter_records),
+            patch("temba.archives.models.ThreadPoolExecutor", TrackedExecutor),
+        ):
+            record_iter = Archive.iter_all_records(self.org, Archive.TYPE_MSG, prefetch=3)
+            self.assertEqual(11, next(record_iter)["id"])
+            started.wait(5)  # the second fetch is in flight and the third is queued
+            record_iter.close()
+
+            self.assertEqual([(False, True)], shutdowns)
+            self.assertEqual([date(2020, 8, 1)], fetched)
+            self.assertEqual([False, False, True], [f.cancelled() for f in futures])
+
+            release.set()
+
     def test_end_date(self):
         daily = self.create_archive(Archive.TYPE_FLOWRUN, "D", date(2018, 2, 1), [], needs_deletion=True)
         monthly = self.create_archive(Archive.TYPE_FLOWRUN, "M", date(2018, 1, 1), [])
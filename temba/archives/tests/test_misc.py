@@ -1,8 +1,10 @@
 import gzip
 import hashlib
 import io
+from decimal import Decimal
+from unittest.mock import patch
 
-from temba.archives.models import jsonlgz_rewrite
+from temba.archives.models import jsonlgz_encode, jsonlgz_iterate, jsonlgz_rewrite
 from temba.tests import TembaTest
 
 
@@ -54,3 +56,42 @@ class JSONLGZTest(TembaTest):
         self.assertEqual(b'{"id":123,"name":"Jim"}\n{"id":345,"name":"Ann"}\n', gzip.decompress(data4))
         self.assertEqual(hashlib.md5(data4).hexdigest(), hash4)
         self.assertEqual(56, size4)
+
+    @patch("temba.archives.models.JSONL_BLOCK_SIZE", 10)
+    def test_jsonlgz_blocks(self):
+        # lines which straddle block boundaries are reassembled, and a missing final newline is tolerated
+        data = b'{"id":123,"name":"Jim"}\n{"id":234,"name":"Bob","score":1.5}\n{"id":345,"name":"Ann"}'
+
+        records = list(jsonlgz_iterate(io.BytesIO(gzip.compress(data))))
+        self.assertEqual(
+            [
+                {"id": 123, "name": "Jim"},
+                {"id": 234, "name": "Bob", "score": Decimal("1.5")},
+                {"id": 345, "name": "Ann"},
+            ],
+            records,
+        )
+
+        # encoding writes several batches but produces the same output as a single batch
+        stream, hash1, size1 = jsonlgz_encode(records)
+
+        self.assertEqual(
+            b'{"id":123,"name":"Jim"}\n{"id":234,"name":"Bob","score":1.5}\n{"id":345,"name":"Ann"}\n',
+            gzip.decompress(stream.getvalue()),
+        )
+
+        with patch("temba.archives.models.JSONL_BLOCK_SIZE", 1024):
+            stream, hash2, size2 = jsonlgz_encode(records)
+
+        self.assertEqual(hash1, hash2)
+        self.assertEqual(size1, size2)
+
+        # blank lines are skipped
+        data = b'{"id":123,"name":"Jim"}\n\n{"id":345,"name":"Ann"}\n\n \n'
+        self.assertEqual(
+            [{"id": 123, "name": "Jim"}, {"id": 345, "name": "Ann"}],
+            list(jsonlgz_iterate(io.BytesIO(gzip.compress(data)))),
+        )
+
+        # empty stream
+        self.assertEqual([], list(jsonlgz_iterate(io.BytesIO(gzip.compress(b"")))))
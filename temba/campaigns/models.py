@@ -1,7 +1,6 @@
 from collections import defaultdict
-from datetime import datetime, timedelta, timezone as tzone
+from datetime import timedelta
 
-from django_valkey import get_valkey_connection
 from smartmin.models import SmartModel
 
 from django.contrib.postgres.fields import ArrayField
@@ -12,7 +11,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _, ngettext
 
 from temba import mailroom
-from temba.contacts.models import ContactField, ContactGroup, ContactGroupCount
+from temba.contacts.models import Contact, ContactField, ContactGroup, ContactGroupCount
 from temba.flows.models import Flow
 from temba.orgs.models import Org
 from temba.utils import json, languages, on_transaction_commit
@@ -568,27 +567,17 @@ class CampaignEvent(TembaUUIDMixin, SmartModel):
         on_transaction_commit(lambda: mailroom.get_client().campaign_schedule(self.campaign.org, self))
 
     def get_recent_fires(self) -> list[dict]:
-        r = get_valkey_connection()
-        key = f"recent_campaign_fires:{self.id}"
-
-        # fetch members of the sorted set from valkey and save as tuples of (contact_id, operand, time)
-        contact_ids = set()
-        raw = []
-        for member, score in r.zrange(key, start=0, end=-1, desc=True, withscores=True):
-            rand, contact_id = member.decode().split("|", maxsplit=2)
-            contact_ids.add(int(contact_id))
-            raw.append((int(contact_id), datetime.fromtimestamp(score, tzone.utc)))
-
-        # lookup all the referenced contacts
-        contacts_by_id = {c.id: c for c in self.campaign.org.contacts.filter(id__in=contact_ids, is_active=True)}
-
-        # if contact still exists, include in results
-        recent = []
-        for r in raw:
-            if contact := contacts_by_id.get(r[0]):
-                recent.append({"contact": contact, "time": r[1]})
-
-        return recent
+        return self.get_recent_fires_by_event(self.campaign.org, [self])[self]
+
+    @classmethod
+    def get_recent_fires_by_event(cls, org, events) -> dict:
+        """
+        Gets the recent fires for each of the given events in a single round trip to valkey and a single contacts query
+        """
+        keys = {e: f"recent_campaign_fires:{e.id}" for e in events}
+        recent = Contact.get_recent(org, list(keys.values()))
+
+        return {e: [{"contact": r["contact"], "time": r["time"]} for r in recent[key]] for e, key in keys.items()}
 
     def get_fire_count(self) -> int:
         if hasattr(self, "_fire_count"):  # use prefetched value if available
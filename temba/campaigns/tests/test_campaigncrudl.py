@@ -1,4 +1,7 @@
 from unittest.mock import call
+from uuid import uuid4
+
+from django_valkey import get_valkey_connection
 
 from django.urls import reverse
 
@@ -195,6 +198,59 @@ class CampaignCRUDLTest(TembaTest, CRUDLTestMixin):
         self.assertFalse(response.json()["can_edit"])
         self.assertTrue(response.json()["can_delete"])
 
+    def test_fires(self):
+        group = self.create_group("Reporters", contacts=[])
+        campaign = self.create_campaign(self.org, "Welcomes", group)
+        event1 = campaign.events.get()
+        event2 = CampaignEvent.create_flow_event(
+            self.org,
+            self.admin,
+            campaign,
+            self.org.fields.get(key="registered"),
+            offset=2,
+            unit="W",
+            flow=event1.flow,
+        )
+        ann = self.create_contact("Ann", phone="+1234567890")
+        bob = self.create_contact("Bob", phone="+1234567891")
+
+        r = get_valkey_connection()
+        r.zadd(f"recent_campaign_fires:{event1.id}", mapping={f"{uuid4()}|{ann.id}": 1639338554.969123})
+        r.zadd(f"recent_campaign_fires:{event1.id}", mapping={f"{uuid4()}|{bob.id}": 1639338555.234567})
+        r.zadd(f"recent_campaign_fires:{event2.id}", mapping={f"{uuid4()}|{ann.id}": 1639338561.345678})
+
+        fires_url = reverse("campaigns.campaign_fires", args=[campaign.uuid])
+
+        self.assertRequestDisallowed(fires_url, [None, self.agent, self.admin2])
+
+        self.login(self.editor)
+
+        response = self.client.get(fires_url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {
+                "fires": {
+                    str(event1.uuid): [
+                        {
+                            "contact": {"uuid": str(bob.uuid), "name": "Bob", "url": f"/contact/read/{bob.uuid}/"},
+                            "time": "2021-12-12T19:49:15.234567+00:00",
+                        },
+                        {
+                            "contact": {"uuid": str(ann.uuid), "name": "Ann", "url": f"/contact/read/{ann.uuid}/"},
+                            "time": "2021-12-12T19:49:14.969123+00:00",
+                        },
+                    ],
+                    str(event2.uuid): [
+                        {
+                            "contact": {"uuid": str(ann.uuid), "name": "Ann", "url": f"/contact/read/{ann.uuid}/"},
+                            "time": "2021-12-12T19:49:21.345678+00:00",
+                        }
+                    ],
+                }
+            },
+            response.json(),
+        )
+
     @mock_mailroom
     def test_update(self, mr_mocks):
         group1 = self.create_group("Reporters", contacts=[])
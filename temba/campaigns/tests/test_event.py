@@ -2,11 +2,12 @@ from datetime import datetime, timedelta, timezone as tzone
 
 from django_valkey import get_valkey_connection
 
+from django.test import override_settings
 from django.utils import timezone
 
 from temba.campaigns.models import Campaign, CampaignEvent
 from temba.contacts.models import ContactField, ContactFire
-from temba.tests import TembaTest, mock_mailroom
+from temba.tests import TembaTest, cleanup, mock_mailroom
 from temba.utils.uuid import uuid4
 
 
@@ -124,6 +125,7 @@ class CampaignEventTest(TembaTest):
         self.assertEqual(1, event1.get_fire_count())
         self.assertEqual(0, event2.get_fire_count())
 
+    @cleanup(valkey=True)
     def test_get_recent_fires(self):
         contact1 = self.create_contact("Ann", phone="+1234567890")
         contact2 = self.create_contact("Bob", phone="+1234567891")
@@ -155,16 +157,40 @@ class CampaignEventTest(TembaTest):
         add_recent_contact(event1, contact2, 1639338555.234567)
         add_recent_contact(event2, contact1, 1639338561.345678)
 
+        ann = {"uuid": str(contact1.uuid), "name": "Ann"}
+        bob = {"uuid": str(contact2.uuid), "name": "Bob"}
+
         self.assertEqual(
             [
-                {"contact": contact2, "time": datetime(2021, 12, 12, 19, 49, 15, 234567, tzone.utc)},
-                {"contact": contact1, "time": datetime(2021, 12, 12, 19, 49, 14, 969123, tzone.utc)},
+                {"contact": bob, "time": datetime(2021, 12, 12, 19, 49, 15, 234567, tzone.utc)},
+                {"contact": ann, "time": datetime(2021, 12, 12, 19, 49, 14, 969123, tzone.utc)},
             ],
             event1.get_recent_fires(),
         )
         self.assertEqual(
             [
-                {"contact": contact1, "time": datetime(2021, 12, 12, 19, 49, 21, 345678, tzone.utc)},
+                {"contact": ann, "time": datetime(2021, 12, 12, 19, 49, 21, 345678, tzone.utc)},
             ],
             event2.get_recent_fires(),
         )
+
+        # fetching for multiple events only needs a single contacts query
+        with self.assertNumQueries(1):
+            recent = CampaignEvent.get_recent_fires_by_event(self.org, [event1, event2])
+
+        self.assertEqual({event1: event1.get_recent_fires(), event2: event2.get_recent_fires()}, recent)
+
+        # released contacts are omitted
+        contact2.is_active = False
+        contact2.save(update_fields=("is_active",))
+
+        self.assertEqual([ann], [f["contact"] for f in event1.get_recent_fires()])
+
+        # with caching enabled, contacts are only fetched once
+        with override_settings(RECENT_CONTACTS_CACHE_TTL=60):
+            CampaignEvent.get_recent_fires_by_event(self.org, [event1, event2])
+
+            with self.assertNumQueries(0):
+                recent = CampaignEvent.get_recent_fires_by_event(self.org, [event1, event2])
+
+            self.assertEqual([ann], [f["contact"] for f in recent[event1]])
@@ -53,9 +53,28 @@ class CampaignForm(forms.ModelForm):
         widgets = {"name": InputWidget()}
 
 
+def fire_as_json(fire: dict) -> dict:
+    return {
+        "contact": {**fire["contact"], "url": reverse("contacts.contact_read", args=[fire["contact"]["uuid"]])},
+        "time": fire["time"].isoformat(),
+    }
+
+
 class CampaignCRUDL(SmartCRUDL):
     model = Campaign
-    actions = ("create", "read", "update", "list", "delete", "archived", "archive", "activate", "menu", "events")
+    actions = (
+        "create",
+        "read",
+        "update",
+        "list",
+        "delete",
+        "archived",
+        "archive",
+        "activate",
+        "menu",
+        "events",
+        "fires",
+    )
 
     class Menu(BaseMenuView):
         def derive_menu(self):
@@ -178,6 +197,22 @@ class CampaignCRUDL(SmartCRUDL):
                 }
             )
 
+    class Fires(BaseReadView):
+        """
+        The most recent contacts that each event of a campaign fired for, keyed by event UUID, so that the read page
+        can preload its recent-contacts popups in one request.
+        """
+
+        permission = "campaigns.campaign_read"
+
+        def render_to_response(self, context, **response_kwargs):
+            events = list(self.object.get_events())
+            recent = CampaignEvent.get_recent_fires_by_event(self.object.org, events)
+
+            return JsonResponse(
+                {"fires": {str(e.uuid): [fire_as_json(f) for f in fires] for e, fires in recent.items()}}
+            )
+
     class Create(ModalFormMixin, OrgPermsMixin, SmartCreateView):
         fields = ("name", "group")
         form_class = CampaignForm
@@ -647,19 +682,7 @@ class CampaignEventCRUDL(SmartCRUDL):
             return self.get_object().campaign.org
 
         def render_to_response(self, context, **response_kwargs):
-            org = self.object.campaign.org
-            fires = [
-                {
-                    "contact": {
-                        "uuid": str(f["contact"].uuid),
-                        "name": f["contact"].get_display(org),
-                        "url": reverse("contacts.contact_read", args=[f["contact"].uuid]),
-                    },
-                    "time": f["time"].isoformat(),
-                }
-                for f in self.object.get_recent_fires()
-            ]
-            return JsonResponse({"fires": fires})
+            return JsonResponse({"fires": [fire_as_json(f) for f in self.object.get_recent_fires()]})
 
     class Delete(BaseDeleteModal):
         model_org_lookup = "campaign__org"
@@ -0,0 +1,32 @@
+from django_valkey import get_valkey_connection
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from temba.channels.models import ChannelDailyRollup, ChannelMonthlyRollup
+
+
+class Command(BaseCommand):
+    """
+    Rollups are only updated by squashes which run the current code, so squashes by workers still running the previous
+    release lose their deltas. Run this once a release adding or changing rollups has been deployed to all workers. It
+    holds the squash task's lock so that no squash can add deltas while the rollups are rebuilt.
+    """
+
+    help = "Rebuilds the org-level daily and monthly channel count rollups from squashed channel counts"
+
+    # the lock held by the squash_channel_counts cron task
+    SQUASH_LOCK_KEY = "celery-task-lock:squash_channel_counts"
+    SQUASH_LOCK_TIMEOUT = 7200
+
+    def handle(self, *args, **options):
+        r = get_valkey_connection()
+
+        self.stdout.write("Waiting for any running squash of channel counts to finish...")
+
+        with r.lock(self.SQUASH_LOCK_KEY, timeout=self.SQUASH_LOCK_TIMEOUT):
+            with transaction.atomic(), connection.cursor() as cursor:
+                for rollup in (ChannelDailyRollup, ChannelMonthlyRollup):
+                    cursor.execute(rollup.get_rebuild_sql())
+
+                    self.stdout.write(f"Rebuilt {rollup._meta.db_table} ({rollup.objects.count()} rows)")
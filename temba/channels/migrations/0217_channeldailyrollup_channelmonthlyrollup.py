@@ -0,0 +1,75 @@
+# Generated by Django 6.0.7 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# populate from squashed counts in the same transaction as creating the tables, since unsquashed counts are added to
+# the rollups when they are squashed. Workers still running the previous release squash without rolling up, so once
+# this release is deployed to all workers, run the rebuild_channel_rollups command to recalculate them.
+BACKFILL_SQL = """
+INSERT INTO channels_channeldailyrollup("org_id", "day", "scope", "count")
+SELECT ch."org_id", cc."day", cc."scope", SUM(cc."count") FROM channels_channelcount cc
+INNER JOIN channels_channel ch ON ch."id" = cc."channel_id"
+WHERE cc."is_squashed" GROUP BY 1, 2, 3 HAVING SUM(cc."count") != 0;
+
+INSERT INTO channels_channelmonthlyrollup("org_id", "month", "scope", "count")
+SELECT "org_id", date_trunc('month', "day")::date, "scope", SUM("count") FROM channels_channeldailyrollup
+GROUP BY 1, 2, 3;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("channels", "0216_release_chip_channels"),
+        ("orgs", "0188_reset_dropped_languages"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChannelDailyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ("scope", models.CharField(max_length=128)),
+                ("count", models.BigIntegerField()),
+                ("day", models.DateField()),
+                (
+                    "org",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="channel_daily_rollups",
+                        to="orgs.org",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("org", "day", "scope"), name="channeldailyrollup_unique")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ChannelMonthlyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ("scope", models.CharField(max_length=128)),
+                ("count", models.BigIntegerField()),
+                ("month", models.DateField()),
+                (
+                    "org",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="channel_monthly_rollups",
+                        to="orgs.org",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("org", "month", "scope"), name="channelmonthlyrollup_unique")
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -33,7 +33,7 @@ from temba.utils.models import (
     delete_in_batches,
     generate_uuid,
 )
-from temba.utils.models.counts import BaseDailyCount
+from temba.utils.models.counts import BaseDailyCount, DailyCountQuerySet, ScopedCountQuerySet
 from temba.utils.text import generate_secret
 
 logger = logging.getLogger(__name__)
@@ -739,6 +739,10 @@ class ChannelCount(BaseDailyCount):
 
     channel = models.ForeignKey(Channel, on_delete=models.PROTECT, related_name="counts", db_index=False)
 
+    @classmethod
+    def get_squash_rollups(cls) -> list[str]:
+        return [ChannelDailyRollup.get_rollup_sql(), ChannelMonthlyRollup.get_rollup_sql()]
+
     class Meta:
         indexes = [
             models.Index(
@@ -751,6 +755,89 @@ class ChannelCount(BaseDailyCount):
         ]
 
 
+class BaseChannelRollup(models.Model):
+    """
+    Base class for org-level rollups of channel counts. Rows are upserted with the deltas of unsquashed channel counts
+    as those are squashed, so they lag behind by at most one squash but can be queried across orgs without joining
+    through channels.
+    """
+
+    period_field = None
+    period_expr = None
+
+    id = models.BigAutoField(auto_created=True, primary_key=True)
+    scope = models.CharField(max_length=128)
+    count = models.BigIntegerField()
+
+    @classmethod
+    def get_rollup_sql(cls) -> str:
+        """
+        Gets the statement run during channel count squashing which adds the deltas of the removed unsquashed rows.
+        """
+        table, period = cls._meta.db_table, cls.period_field
+
+        return f"""
+            INSERT INTO {table}("org_id", "{period}", "scope", "count")
+            SELECT c."org_id", {cls.period_expr}, r."scope", SUM(r."count") FROM removed r
+            INNER JOIN {Channel._meta.db_table} c ON c."id" = r."channel_id"
+            WHERE NOT r."is_squashed" GROUP BY 1, 2, 3 HAVING SUM(r."count") != 0
+            ON CONFLICT ("org_id", "{period}", "scope") DO UPDATE SET "count" = {table}."count" + EXCLUDED."count"
+        """
+
+    @classmethod
+    def get_rebuild_sql(cls) -> str:
+        """
+        Gets the statements which recalculate this rollup from squashed channel counts. Unsquashed counts are left to
+        be added when they're squashed, so this mustn't run concurrently with squashing.
+        """
+        table, period = cls._meta.db_table, cls.period_field
+
+        return f"""
+            DELETE FROM {table};
+            INSERT INTO {table}("org_id", "{period}", "scope", "count")
+            SELECT c."org_id", {cls.period_expr}, r."scope", SUM(r."count") FROM {ChannelCount._meta.db_table} r
+            INNER JOIN {Channel._meta.db_table} c ON c."id" = r."channel_id"
+            WHERE r."is_squashed" GROUP BY 1, 2, 3 HAVING SUM(r."count") != 0;
+        """
+
+    class Meta:
+        abstract = True
+
+
+class ChannelDailyRollup(BaseChannelRollup):
+    """
+    Org-level daily totals of channel counts.
+    """
+
+    period_field = "day"
+    period_expr = 'r."day"'
+
+    org = models.ForeignKey(Org, on_delete=models.PROTECT, related_name="channel_daily_rollups", db_index=False)
+    day = models.DateField()
+
+    objects = DailyCountQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(name="channeldailyrollup_unique", fields=("org", "day", "scope"))]
+
+
+class ChannelMonthlyRollup(BaseChannelRollup):
+    """
+    Org-level monthly totals of channel counts, where month is the first day of the month.
+    """
+
+    period_field = "month"
+    period_expr = """date_trunc('month', r."day")::date"""
+
+    org = models.ForeignKey(Org, on_delete=models.PROTECT, related_name="channel_monthly_rollups", db_index=False)
+    month = models.DateField()
+
+    objects = ScopedCountQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(name="channelmonthlyrollup_unique", fields=("org", "month", "scope"))]
+
+
 class ChannelEvent(TembaUUIDMixin, models.Model):
     """
     An event other than a message that occurs between a channel and a contact. Can be used to trigger flows etc.
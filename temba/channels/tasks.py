@@ -9,7 +9,7 @@ from django.utils import timezone
 
 from temba import mailroom
 from temba.utils.crons import cron_task
-from temba.utils.models import delete_in_batches
+from temba.utils.models import delete_by_keyset
 
 from .models import Channel, ChannelCount, ChannelEvent, SyncEvent
 from .types.android import AndroidType
@@ -61,9 +61,7 @@ def trim_channel_events():
 
     trim_before = timezone.now() - settings.RETENTION_PERIODS["channelevent"]
 
-    num_deleted = delete_in_batches(ChannelEvent.objects.filter(created_on__lte=trim_before))
-
-    return {"deleted": num_deleted}
+    return delete_by_keyset(ChannelEvent.objects.filter(created_on__lte=trim_before))
 
 
 @cron_task()
@@ -97,4 +95,4 @@ def trim_channel_sync_events():
 
 @cron_task(lock_timeout=7200)
 def squash_channel_counts():
-    ChannelCount.squash()
+    return {"ChannelCount": ChannelCount.squash()}
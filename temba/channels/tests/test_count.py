@@ -1,10 +1,14 @@
 from datetime import date, datetime, timezone as tzone
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
 
 from temba.msgs.models import Msg
 from temba.tests import TembaTest
 from temba.utils.uuid import uuid7
 
-from ..models import ChannelCount
+from ..models import ChannelCount, ChannelDailyRollup, ChannelMonthlyRollup
 from ..tasks import squash_channel_counts
 
 
@@ -94,6 +98,29 @@ class ChannelCountTest(TembaTest):
             self.channel.counts.day_totals(scoped=True),
         )
 
+        # squashing also rolls up unsquashed rows into the org-level rollups
+        self.assertEqual(
+            {
+                (date(2023, 5, 31), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 2,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+            },
+            self.org.channel_daily_rollups.day_totals(scoped=True),
+        )
+        self.assertEqual(
+            {
+                (date(2023, 5, 1), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 2,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+            },
+            {(r.month, r.scope): r.count for r in self.org.channel_monthly_rollups.all()},
+        )
+        self.assertEqual(0, self.org2.channel_daily_rollups.count())
+
         # soft deleting a message doesn't decrement the count
         Msg.objects.filter(text="A").update(visibility=Msg.VISIBILITY_DELETED_BY_USER)
 
@@ -121,3 +148,84 @@ class ChannelCountTest(TembaTest):
             },
             self.channel.counts.day_totals(scoped=True),
         )
+
+        # add to an existing set and a new set in another channel
+        other_channel = self.create_channel("T", "Other", "+250788000000")
+        self.create_incoming_msg(contact, "I", created_on=datetime(2023, 6, 1, 13, 0, 30, 0, tzone.utc))
+        self.create_incoming_msg(
+            contact, "J", channel=other_channel, created_on=datetime(2023, 6, 2, 13, 0, 30, 0, tzone.utc)
+        )
+
+        squash_channel_counts()
+
+        # already squashed rows aren't rolled up again
+        self.assertEqual(
+            {
+                (date(2023, 5, 31), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 3,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+                (date(2023, 6, 2), "text:in"): 1,
+            },
+            self.org.channel_daily_rollups.day_totals(scoped=True),
+        )
+        self.assertEqual(
+            {
+                (date(2023, 5, 1), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 4,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+            },
+            {(r.month, r.scope): r.count for r in self.org.channel_monthly_rollups.all()},
+        )
+
+        # squashes by workers without rollups lose their deltas, which the rebuild command recovers
+        self.create_incoming_msg(contact, "K", created_on=datetime(2023, 6, 2, 13, 0, 30, 0, tzone.utc))
+        ChannelDailyRollup.objects.all().delete()
+        ChannelMonthlyRollup.objects.all().delete()
+
+        with patch.object(ChannelCount, "get_squash_rollups", return_value=[]):
+            squash_channel_counts()
+
+        self.create_incoming_msg(contact, "L", created_on=datetime(2023, 6, 2, 14, 0, 30, 0, tzone.utc))
+
+        call_command("rebuild_channel_rollups", stdout=StringIO())
+
+        # unsquashed counts are left to be added when they're squashed
+        self.assertEqual(
+            {
+                (date(2023, 5, 31), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 3,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+                (date(2023, 6, 2), "text:in"): 2,
+            },
+            self.org.channel_daily_rollups.day_totals(scoped=True),
+        )
+
+        squash_channel_counts()
+
+        self.assertEqual(
+            {
+                (date(2023, 5, 31), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 3,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+                (date(2023, 6, 2), "text:in"): 3,
+            },
+            self.org.channel_daily_rollups.day_totals(scoped=True),
+        )
+        self.assertEqual(
+            {
+                (date(2023, 5, 1), "text:in"): 1,
+                (date(2023, 6, 1), "text:in"): 6,
+                (date(2023, 6, 1), "text:out"): 3,
+                (date(2023, 6, 1), "voice:in"): 1,
+                (date(2023, 6, 1), "voice:out"): 1,
+            },
+            {(r.month, r.scope): r.count for r in self.org.channel_monthly_rollups.all()},
+        )
@@ -2,7 +2,7 @@ from datetime import timedelta
 
 from django.utils import timezone
 
-from temba.tests import TembaTest
+from temba.tests import TembaTest, matchers
 
 from ..models import ChannelEvent
 from ..tasks import trim_channel_events
@@ -29,7 +29,7 @@ class ChannelEventTest(TembaTest):
         )
 
         results = trim_channel_events()
-        self.assertEqual({"deleted": 1}, results)
+        self.assertEqual({"deleted": 1, "time": matchers.Float(), "rate": matchers.Float()}, results)
 
         # should only have one event remaining and should be e2
         self.assertEqual(1, ChannelEvent.objects.all().count())
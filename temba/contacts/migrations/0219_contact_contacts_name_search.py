@@ -0,0 +1,39 @@
+# Generated by Django 6.1 on 2026-10-18 10:12
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+from django.db.migrations.operations.models import AddIndex
+
+
+class AddIndexConcurrentlyPlainReverse(AddIndexConcurrently):
+    """
+    Adds the index concurrently but reverses with a plain drop, so that migration tests - which roll the graph
+    backwards inside a transaction - can unapply it.
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("contacts", "0218_alter_contactgroup_uuid"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrentlyPlainReverse(
+            model_name="contact",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                condition=models.Q(("is_active", True)),
+                name="contacts_name_search",
+            ),
+        ),
+    ]
@@ -1,6 +1,12 @@
+import csv
+import hashlib
+import io
 import itertools
 import logging
 from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import date, datetime, timedelta, timezone as tzone
 from decimal import Decimal
 from pathlib import Path
@@ -10,16 +16,19 @@ from uuid import UUID
 import iso8601
 import phonenumbers
 import regex
+from django_valkey import get_valkey_connection
 from openpyxl import load_workbook
 from smartmin.models import SmartModel
 
 from django.conf import settings
 from django.contrib.humanize.templatetags.humanize import intcomma
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.db import models, transaction
 from django.db.models import Count, F, Max, Q, Sum, Value
-from django.db.models.functions import Concat, Lower
+from django.db.models.functions import Concat, Lower, Upper
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -33,7 +42,7 @@ from temba.orgs.realtime import AssetNameMixin
 from temba.utils import dynamo, format_number, on_transaction_commit
 from temba.utils.export import MultiSheetExporter
 from temba.utils.models import JSONField, LegacyIDMixin, LegacyUUIDMixin, TembaModel, delete_in_batches
-from temba.utils.models.counts import BaseSquashableCount
+from temba.utils.models.counts import BaseSquashableCount, CountsCache
 from temba.utils.text import obfuscate, unsnakify
 from temba.utils.urns import ParsedURN, parse_number, parse_urn
 from temba.utils.uuid import uuid4
@@ -607,6 +616,7 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
 
     # maximum number of contacts to release without using a background task
     BULK_RELEASE_IMMEDIATELY_LIMIT = 50
+    BULK_MODIFY_BATCH_SIZE = 500  # larger modifications are split into batches sent to mailroom concurrently
 
     @classmethod
     def create(
@@ -749,44 +759,36 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
 
         return results
 
-    def get_timeline(
-        self, *, before: str = None, after: str = None, past_limit: int = 5, future_limit: int = 10
-    ) -> dict:
+    def _get_timeline_projection(self, campaigns, horizon) -> tuple[list, list]:
         """
-        Gets this contact's timeline - a merged, time-ordered view of campaign events and
-        broadcasts, both upcoming and past.
-
-        By default we return up to `future_limit` upcoming events plus the most recent `past_limit`
-        past events. Passing the returned `next_before` cursor pages further back through past events
-        with no limit; passing `next_after` pages further forward through upcoming events. The
-        returned `future_count` is the total number of upcoming events (uncapped) so callers can
-        display an accurate badge.
+        Gets the campaign event times and the projected fires of scheduled broadcasts and triggers for this contact's
+        timeline as lists of (datetime, event-dict) tuples. The projection is cached against a version stamp of
+        everything it depends on, so repeated views and paging reuse it until something changes. Schedule fires are
+        projected up to the start of the day after the horizon so that a cached projection covers the horizon for
+        the rest of the day, and callers should filter to their own horizon.
         """
-        now = timezone.now()
-        # upcoming events are capped at a year out across the board - projected
-        # repeating schedules stop at the horizon, and one-off events beyond
-        # the horizon are simply dropped
-        horizon = now + timedelta(days=365)
-        campaigns = self._get_campaigns()
 
-        # build the canonical future and past pools - we always compute both so that
-        # future_count is accurate regardless of which page is being requested
-        future_full = []
-        past_full = []
+        broadcasts = list(self.get_scheduled_broadcasts())
+        triggers = list(self.get_scheduled_triggers())
+        horizon = (horizon + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-        for when, event in self._get_campaign_events(campaigns):
-            if when < now:
-                past_full.append((when, event))
-            elif when <= horizon:
-                future_full.append((when, event))
+        if settings.TIMELINE_CACHE_TTL:
+            version = self._get_timeline_version(campaigns, broadcasts, triggers)
+            cache_key = f"contact_timeline:{self.id}"
+            cached = cache.get(cache_key)
+            if cached and cached["version"] == version and cached["horizon"] >= horizon:
+                return cached["campaign_events"], cached["scheduled_events"]
+
+        campaign_events = self._get_campaign_events(campaigns)
 
         # repeating schedules expand into multiple timeline entries within the
         # one-year horizon so the user sees the cadence directly rather than a
         # "Weekly" caption on a single dot
-        for broadcast in self.get_scheduled_broadcasts():
+        scheduled_events = []
+        for broadcast in broadcasts:
             text = broadcast.get_translation()["text"]
-            for fire_time in broadcast.schedule.project_fires(horizon):
-                future_full.append(
+            for fire_time in broadcast.schedule.get_projected_fires(horizon):
+                scheduled_events.append(
                     (
                         fire_time,
                         {
@@ -796,13 +798,13 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
                         },
                     )
                 )
-        for trigger in self.get_scheduled_triggers():
+        for trigger in triggers:
             flow_ref = {
                 **trigger.flow.as_export_ref(),
                 "url": reverse("flows.flow_editor", args=[trigger.flow.uuid]),
             }
-            for fire_time in trigger.schedule.project_fires(horizon):
-                future_full.append(
+            for fire_time in trigger.schedule.get_projected_fires(horizon):
+                scheduled_events.append(
                     (
                         fire_time,
                         {
@@ -813,6 +815,82 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
                     )
                 )
 
+        if settings.TIMELINE_CACHE_TTL:
+            cache.set(
+                cache_key,
+                {
+                    "version": version,
+                    "horizon": horizon,
+                    "campaign_events": campaign_events,
+                    "scheduled_events": scheduled_events,
+                },
+                timeout=settings.TIMELINE_CACHE_TTL,
+            )
+
+        return campaign_events, scheduled_events
+
+    def _get_timeline_version(self, campaigns, broadcasts, triggers) -> str:
+        """
+        Builds a version stamp for this contact's timeline projection. Field values, language and group membership
+        changes all bump the contact's modified_on, and membership changes also change which campaigns, broadcasts
+        and triggers are included.
+        """
+
+        def schedule_state(s):
+            return (
+                s.id,
+                s.next_fire,
+                s.repeat_period,
+                s.repeat_hour_of_day,
+                s.repeat_minute_of_hour,
+                s.repeat_day_of_month,
+                s.repeat_days_of_week,
+            )
+
+        parts = [
+            self.modified_on,
+            str(self.org.timezone),
+            [(c.id, c.modified_on, [(e.id, e.modified_on, e.is_active) for e in c.events.all()]) for c in campaigns],
+            [(b.id, b.modified_on, schedule_state(b.schedule)) for b in broadcasts],
+            [(t.id, t.modified_on, t.flow.modified_on, schedule_state(t.schedule)) for t in triggers],
+        ]
+        return hashlib.md5(repr(parts).encode()).hexdigest()
+
+    def get_timeline(
+        self, *, before: str = None, after: str = None, past_limit: int = 5, future_limit: int = 10
+    ) -> dict:
+        """
+        Gets this contact's timeline - a merged, time-ordered view of campaign events and
+        broadcasts, both upcoming and past.
+
+        By default we return up to `future_limit` upcoming events plus the most recent `past_limit`
+        past events. Passing the returned `next_before` cursor pages further back through past events
+        with no limit; passing `next_after` pages further forward through upcoming events. The
+        returned `future_count` is the total number of upcoming events (uncapped) so callers can
+        display an accurate badge.
+        """
+        now = timezone.now()
+        # upcoming events are capped at a year out across the board - projected
+        # repeating schedules stop at the horizon, and one-off events beyond
+        # the horizon are simply dropped
+        horizon = now + timedelta(days=365)
+        campaigns = self._get_campaigns()
+
+        # build the canonical future and past pools - we always compute both so that
+        # future_count is accurate regardless of which page is being requested
+        future_full = []
+        past_full = []
+
+        campaign_events, scheduled_events = self._get_timeline_projection(campaigns, horizon)
+
+        for when, event in campaign_events:
+            if when < now:
+                past_full.append((when, event))
+            elif when <= horizon:
+                future_full.append((when, event))
+
+        future_full.extend((w, e) for (w, e) in scheduled_events if now <= w <= horizon)
+
         future_full.sort(key=lambda e: e[0])
 
         # past page: events strictly before the past cursor (defaults to now). a malformed cursor
@@ -1072,14 +1150,27 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
             return
 
         org = contacts[0].org
+        via = "api" if via_api else "ui"
         client = mailroom.get_client()
         try:
-            response = client.contact_modify(org, user, contacts, mods, "api" if via_api else "ui")
+            if len(contacts) <= cls.BULK_MODIFY_BATCH_SIZE:
+                events = client.contact_modify(org, user, contacts, mods, via)["events"]
+            else:
+                with client.batch() as batch:
+                    responses = [
+                        batch.contact_modify(org, user, list(b), mods, via)
+                        for b in itertools.batched(contacts, cls.BULK_MODIFY_BATCH_SIZE)
+                    ]
+
+                events = {k: v for r in responses for k, v in r.result()["events"].items()}
         except mailroom.RequestException as e:
             logger.error(f"Contact update failed: {str(e)}", exc_info=True)
             raise e
 
-        return [c.id for c in contacts if response["events"].get(str(c.uuid), [])]
+        # group and status changes move contacts between groups
+        ContactGroupCount.totals_cache.invalidate(org.id)
+
+        return [c.id for c in contacts if events.get(str(c.uuid), [])]
 
     @classmethod
     def bulk_change_status(cls, user, contacts, status, via_api=False):
@@ -1213,6 +1304,8 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
             for group in self.get_groups():
                 group.contacts.remove(self)
 
+            on_transaction_commit(lambda: ContactGroupCount.totals_cache.invalidate(self.org_id))
+
             # delete any upcoming fires
             self.fires.all().delete()
 
@@ -1239,6 +1332,7 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
         Deletes everything owned by this contact
         """
 
+        from temba.mailroom.events import Event
         from temba.msgs.models import Msg
 
         assert not self.is_active, "can't fully release a contact which hasn't been released"
@@ -1278,9 +1372,64 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
         self.notes.all().delete()
 
         counts["events"] = dynamo.delete_partition(dynamo.HISTORY, f"con#{self.uuid}")
+        Event._invalidate_history_cache(self)
 
         return counts
 
+    @classmethod
+    def get_recent(cls, org, keys: list[str]) -> dict[str, list[dict]]:
+        """
+        Reads the recent contacts recorded by mailroom in the given sorted sets in a single round trip, returning for
+        each key a list of dicts of contact (uuid and display name), time and any extra value, most recent first.
+        Members are formatted as <random>|<contact_id>[|<extra>] and contacts which no longer exist are omitted.
+        """
+        r = get_valkey_connection()
+        with r.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.zrange(key, start=0, end=-1, desc=True, withscores=True)
+            results = pipe.execute()
+
+        # parse members as tuples of (contact_id, time, extra)
+        raw = {}
+        for key, members in zip(keys, results):
+            raw[key] = []
+            for member, score in members:
+                parts = member.decode().split("|", maxsplit=2)
+                extra = parts[2] if len(parts) > 2 else None
+                raw[key].append((int(parts[1]), datetime.fromtimestamp(score, tzone.utc), extra))
+
+        refs = cls._get_recent_refs(org, {item[0] for items in raw.values() for item in items})
+
+        return {
+            key: [{"contact": refs[c_id], "time": t, "extra": extra} for c_id, t, extra in items if c_id in refs]
+            for key, items in raw.items()
+        }
+
+    @classmethod
+    def _get_recent_refs(cls, org, contact_ids: set) -> dict[int, dict]:
+        """
+        Gets uuids and display names of the given contacts, using and populating a short-lived cache so that the same
+        contacts appearing across many segments or repeated lookups don't have to be re-fetched and re-rendered
+        """
+        ttl = settings.RECENT_CONTACTS_CACHE_TTL
+        cache_keys = {c_id: f"recent_contact:{org.id}:{c_id}" for c_id in contact_ids}
+
+        cached = cache.get_many(cache_keys.values()) if ttl and contact_ids else {}
+        refs = {c_id: cached[k] for c_id, k in cache_keys.items() if k in cached}
+
+        missing = contact_ids - refs.keys()
+        if missing:
+            contacts = list(org.contacts.filter(id__in=missing, is_active=True).only("id", "uuid", "name", "org"))
+            cls.bulk_urn_cache_initialize([c for c in contacts if not c.name])
+
+            fetched = {c.id: {"uuid": str(c.uuid), "name": c.get_display(org=org)} for c in contacts}
+            refs.update(fetched)
+
+            if ttl and fetched:
+                cache.set_many({cache_keys[c_id]: ref for c_id, ref in fetched.items()}, timeout=ttl)
+
+        return refs
+
     @classmethod
     def bulk_urn_cache_initialize(cls, contacts, *, using: str = "default"):
         """
@@ -1409,6 +1558,10 @@ class Contact(LegacyIDMixin, LegacyUUIDMixin, SmartModel):
             models.Index(
                 name="contacts_by_org_deleted", fields=("org", "-modified_on", "-id"), condition=Q(is_active=False)
             ),
+            # used for substring searches of contact names (icontains queries compare uppercased values)
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="contacts_name_search", condition=Q(is_active=True)
+            ),
         ]
         constraints = [
             models.CheckConstraint(condition=Q(status__in=("A", "B", "S", "V")), name="contact_status_valid"),
@@ -1720,6 +1873,9 @@ class ContactGroup(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         except mailroom.QueryValidationException as e:
             raise ValueError(str(e))
 
+        # counts of this group are read uncached until it's ready again
+        on_transaction_commit(lambda: ContactGroupCount.totals_cache.invalidate(self.org_id))
+
         # start background task to re-evaluate who belongs in this group
         if reevaluate:
             on_transaction_commit(lambda: mailroom.get_client().contact_populate_group(self.org, self))
@@ -1729,8 +1885,23 @@ class ContactGroup(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         """
         Gets contact counts for the given groups
         """
-        counts = ContactGroupCount.objects.filter(group__in=groups).values("group_id").annotate(count_sum=Sum("count"))
-        by_group_id = {c["group_id"]: c["count_sum"] for c in counts}
+
+        def fetch(group_ids: list) -> dict:
+            counts = (
+                ContactGroupCount.objects.filter(group_id__in=group_ids)
+                .values("group_id")
+                .annotate(count_sum=Sum("count"))
+            )
+            return {c["group_id"]: c["count_sum"] for c in counts}
+
+        # groups which are being (re)evaluated by mailroom are changing too fast to cache
+        ready = [g for g in groups if g.status == cls.STATUS_READY]
+        not_ready = [g for g in groups if g.status != cls.STATUS_READY]
+
+        by_group_id = fetch([g.id for g in not_ready]) if not_ready else {}
+        for org_id, org_groups in itertools.groupby(sorted(ready, key=lambda g: g.org_id), lambda g: g.org_id):
+            by_group_id.update(ContactGroupCount.totals_cache.get(org_id, [g.id for g in org_groups], fetch))
+
         return {g: by_group_id.get(g.id, 0) for g in groups}
 
     def get_member_count(self):
@@ -1782,6 +1953,7 @@ class ContactGroup(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
 
         # delete all counts for this group
         self.counts.all().delete()
+        ContactGroupCount.totals_cache.invalidate(self.org_id)
 
         # delete the m2m related rows in batches, updating the contacts' modified_on as we go
         ContactGroupContacts = self.contacts.through
@@ -1854,6 +2026,7 @@ class ContactGroupCount(BaseSquashableCount):
     """
 
     squash_over = ("group_id",)
+    totals_cache = CountsCache("groups")
 
     group = models.ForeignKey(ContactGroup, on_delete=models.PROTECT, related_name="counts", db_index=True)
 
@@ -1910,8 +2083,10 @@ class ContactExport(ExportType):
     download_prefix = "contacts"
     download_template = "contacts/export_download.html"
 
+    batch_size = 1000
+
     @classmethod
-    def create(cls, org, user, group=None, search=None, with_groups=()):
+    def create(cls, org, user, group=None, search=None, with_groups=(), format=MultiSheetExporter.FORMAT_XLSX):
         export = Export.objects.create(
             org=org,
             export_type=cls.slug,
@@ -1919,6 +2094,7 @@ class ContactExport(ExportType):
                 "group_id": group.id if group else None,
                 "search": search,
                 "with_groups": [g.id for g in with_groups],
+                "format": format,
             },
             created_by=user,
         )
@@ -2005,55 +2181,96 @@ class ContactExport(ExportType):
 
         include_group_memberships = bool(len(group_fields) > 0)
 
-        if search:
-            contact_uuids = mailroom.get_client().contact_export(export.org, group, query=search)
-        else:
-            contact_uuids = group.contacts.using("readonly").order_by("id").values_list("uuid", flat=True).iterator()
-
         # create our exporter
         exporter = MultiSheetExporter(
-            "Contact", [f["label"] for f in fields] + [g["label"] for g in group_fields], export.org.timezone
+            "Contact",
+            [f["label"] for f in fields] + [g["label"] for g in group_fields],
+            export.org.timezone,
+            format=export.format,
         )
 
         num_records = 0
 
-        # write out contacts in batches to limit memory usage
-        for batch_uuids in itertools.batched(contact_uuids, 1000):
-            # fetch all the contacts for our batch
-            batch_contacts = (
-                Contact.objects.filter(uuid__in=batch_uuids).prefetch_related("org", "groups").using("readonly")
-            )
-
-            # to maintain our sort, we need to lookup by uuid, create a map of our uuid->contact to aid in that
-            contact_by_uuid = {str(c.uuid): c for c in batch_contacts}
+        # rows are written by a separate thread so that while a batch is being written out, we're already fetching the
+        # next batch of contacts - all database access stays on this thread
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="export") as writer:
+            writing = None
 
-            Contact.bulk_urn_cache_initialize(batch_contacts, using="readonly")
+            for batch_contacts in self._iter_contact_batches(export.org, group, search):
+                rows = []
+                for contact in batch_contacts:
+                    values = []
+                    for field in fields:
+                        values.append(self.get_field_value(export.org, field, contact=contact))
 
-            for contact_uuid in batch_uuids:
-                contact = contact_by_uuid[str(contact_uuid)]
+                    group_values = []
+                    if include_group_memberships:
+                        contact_groups_ids = [g.id for g in contact.groups.all()]
+                        for col in range(len(group_fields)):
+                            field = group_fields[col]
+                            group_values.append(field["group_id"] in contact_groups_ids)
 
-                values = []
-                for field in fields:
-                    values.append(self.get_field_value(export.org, field, contact=contact))
+                    rows.append(values + group_values)
 
-                group_values = []
-                if include_group_memberships:
-                    contact_groups_ids = [g.id for g in contact.groups.all()]
-                    for col in range(len(group_fields)):
-                        field = group_fields[col]
-                        group_values.append(field["group_id"] in contact_groups_ids)
+                if writing:
+                    writing.result()
+                writing = writer.submit(self._write_rows, exporter, rows)
+                num_records += len(rows)
 
-                # write this contact's values
-                exporter.write_row(values + group_values)
-                num_records += 1
+                # keep bumping our modified_on to show we're alive
+                if timezone.now() - export.modified_on > timedelta(minutes=3):  # pragma: no cover
+                    export.modified_on = timezone.now()
+                    export.save(update_fields=("modified_on",))
 
-            # keep bumping our modified_on to show we're alive
-            if timezone.now() - export.modified_on > timedelta(minutes=3):  # pragma: no cover
-                export.modified_on = timezone.now()
-                export.save(update_fields=("modified_on",))
+            if writing:
+                writing.result()
 
         return *exporter.save_file(), num_records
 
+    def _iter_contact_batches(self, org, group, search: str):
+        """
+        Generates batches of the contacts to be exported, in id order. For searches, matching UUIDs are paged from
+        mailroom, otherwise we page through the group's contacts by id.
+        """
+
+        if search:
+            for batch_uuids in mailroom.get_client().contact_export_batches(
+                org, group, query=search, batch_size=self.batch_size
+            ):
+                # contacts may have been deleted since the search so we can't assume they all exist
+                batch_contacts = list(
+                    Contact.objects.filter(org=org, uuid__in=batch_uuids)
+                    .prefetch_related("org", "groups")
+                    .order_by("id")
+                    .using("readonly")
+                )
+
+                Contact.bulk_urn_cache_initialize(batch_contacts, using="readonly")
+                yield batch_contacts
+        else:
+            last_id = 0
+            while True:
+                batch_contacts = list(
+                    group.contacts.filter(id__gt=last_id)
+                    .prefetch_related("org", "groups")
+                    .order_by("id")
+                    .using("readonly")[: self.batch_size]
+                )
+                if not batch_contacts:
+                    break
+
+                Contact.bulk_urn_cache_initialize(batch_contacts, using="readonly")
+                yield batch_contacts
+
+                if len(batch_contacts) < self.batch_size:
+                    break
+                last_id = batch_contacts[-1].id
+
+    @staticmethod
+    def _write_rows(exporter, rows: list):
+        for row in rows:
+            exporter.write_row(row)
+
     def get_field_value(self, org, field: dict, contact: Contact):
         if field["key"] == "name":
             return contact.name
@@ -2100,8 +2317,42 @@ def get_import_upload_path(instance: Any, filename: str):
     return f"orgs/{instance.org_id}/contact_imports/{instance.uuid}{ext}"
 
 
+class SequentialURNCounter:
+    """
+    Incrementally counts sequential numerical URN paths, i.e. the same count we'd get from sorting all paths and
+    counting those which directly follow the previous one, but without having to hold onto and sort every URN.
+    """
+
+    def __init__(self):
+        self.paths = set()
+        self.count = 1
+
+    def add(self, urn: str):
+        scheme, path, query, display = URN.to_parts(urn)
+        try:
+            path = int(path)
+        except ValueError:
+            return
+
+        if path in self.paths:
+            return
+
+        self.paths.add(path)
+
+        # each new path joins up with any neighbours we've already seen
+        if path - 1 in self.paths:
+            self.count += 1
+        if path + 1 in self.paths:
+            self.count += 1
+
+    def add_all(self, urns: list[str]):
+        for urn in urns:
+            self.add(urn)
+
+
 class ContactImport(SmartModel):
     MAX_RECORDS = 25_000
+    FINISHED_SEEN_TTL = 60 * 60 * 24  # how long we remember that we've seen an import finished
     BATCH_SIZE = 100
     EXPLICIT_CLEAR = "--"
 
@@ -2141,24 +2392,31 @@ class ContactImport(SmartModel):
         """
 
         try:
-            workbook = load_workbook(filename=file, read_only=True, data_only=True)
+            data = cls._read_rows(file, filename)
         except Exception:
             raise ValidationError(_("Import file appears to be corrupted."))
-        ws = workbook.active
 
-        # see https://openpyxl.readthedocs.io/en/latest/optimized.html#worksheet-dimensions but even with this we need
-        # to ignore empty columns after the last column with data
-        ws.reset_dimensions()
+        with closing(data):
+            mappings, num_records = cls._parse_rows(org, data)
+
+        file.seek(0)  # seek back to beginning so subsequent reads work
+
+        return mappings, num_records
 
-        data = ws.iter_rows()
+    @classmethod
+    def _parse_rows(cls, org: Org, data: Iterator[tuple]) -> tuple[list, int]:
+        """
+        Validates the header and every record in the given rows, returning the automatic mappings and record count
+        """
 
         try:
             header_row = next(data)
         except StopIteration:
             raise ValidationError(_("Import file appears to be empty."))
+        except Exception:
+            raise ValidationError(_("Import file appears to be corrupted."))
 
-        headers = [h.value for h in header_row]
-        headers = [str(h).strip() if h else "" for h in headers]
+        headers = [str(h).strip() if h else "" for h in header_row]
 
         # ignore empty header columns after the last column with data
         max_col = 0
@@ -2185,6 +2443,8 @@ class ContactImport(SmartModel):
                 raw_row = next(data)
             except StopIteration:
                 break
+            except Exception:
+                raise ValidationError(_("Import file appears to be corrupted."))
 
             row = cls._parse_row(raw_row, len(mappings))
             uuid, urns = cls._extract_uuid_and_urns(row, mappings)
@@ -2216,10 +2476,36 @@ class ContactImport(SmartModel):
         if num_records == 0:
             raise ValidationError(_("Import file doesn't contain any records."))
 
-        file.seek(0)  # seek back to beginning so subsequent reads work
-
         return mappings, num_records
 
+    @staticmethod
+    def _read_rows(file, filename: str) -> Iterator[tuple]:
+        """
+        Returns an iterator over the rows of the given import file as tuples of raw values. CSV files are streamed
+        with the csv module so only Excel workbooks go through openpyxl.
+        """
+
+        if Path(filename).suffix.lower() == ".csv":
+            return ContactImport._read_csv_rows(file)
+
+        workbook = load_workbook(filename=file, read_only=True, data_only=True)
+        ws = workbook.active
+
+        # see https://openpyxl.readthedocs.io/en/latest/optimized.html#worksheet-dimensions but even with this we need
+        # to ignore empty columns after the last column with data
+        ws.reset_dimensions()
+
+        return ws.iter_rows(values_only=True)
+
+    @staticmethod
+    def _read_csv_rows(file) -> Iterator[tuple]:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            for row in csv.reader(text):
+                yield tuple(row)
+        finally:
+            text.detach()  # don't let the wrapper close the underlying file
+
     @staticmethod
     def _extract_uuid_and_urns(row, mappings) -> tuple[str, list[str]]:
         """
@@ -2360,26 +2646,24 @@ class ContactImport(SmartModel):
             self.group = ContactGroup.create_manual(self.org, self.created_by, name=self.group_name)
             self.save(update_fields=("group",))
 
-        # parse each row, creating batches
-        workbook = load_workbook(filename=self.file, read_only=True, data_only=True)
-        ws = workbook.active
-        ws.reset_dimensions()  # see https://openpyxl.readthedocs.io/en/latest/optimized.html#worksheet-dimensions
-        data = ws.iter_rows(min_row=2)
+        # parse each row in a single pass, creating batches and looking for sequential URNs as we go
+        sequential_urns = SequentialURNCounter()
 
-        urns = []
-        batches = []
+        with self.file.open("rb"), closing(self._read_rows(self.file, self.file.name)) as data:
+            next(data, None)  # skip header row
 
-        for batch_specs, batch_start, batch_end in self._batches_generator(data):
-            batches.append(self.batches.create(specs=batch_specs, record_start=batch_start, record_end=batch_end))
+            for batch_specs, batch_start, batch_end in self._batches_generator(data):
+                self.batches.create(specs=batch_specs, record_start=batch_start, record_end=batch_end)
 
-            for spec in batch_specs:
-                urns.extend(spec.get("urns", []))
+                for spec in batch_specs:
+                    sequential_urns.add_all(spec.get("urns", []))
 
         # tell mailroom to perform the import
         mailroom.get_client().contact_import(self.org, self)
+        ContactGroupCount.totals_cache.invalidate(self.org_id)
 
         # flag org if the set of imported URNs looks suspicious
-        if not self.org.is_verified and self._detect_spamminess(urns):
+        if not self.org.is_verified and sequential_urns.count >= self.SEQUENTIAL_URNS_THRESHOLD:
             self.org.flag()
 
     def _batches_generator(self, row_iter):
@@ -2409,6 +2693,15 @@ class ContactImport(SmartModel):
         if batch_specs:
             yield batch_specs, batch_start, record
 
+    def invalidate_group_counts(self):
+        """
+        Mailroom changes group memberships as it imports, so group counts cached while it ran are stale. This is called
+        when we see that the import has finished, and only invalidates them the first time.
+        """
+
+        if get_valkey_connection().set(f"contact_import_finished:{self.id}", "1", nx=True, ex=self.FINISHED_SEEN_TTL):
+            ContactGroupCount.totals_cache.invalidate(self.org_id)
+
     def get_info(self):
         """
         Gets info about this import by merging info from its batches
@@ -2502,13 +2795,13 @@ class ContactImport(SmartModel):
         return spec
 
     @classmethod
-    def _parse_row(cls, row: list[str], size: int, tz=None) -> list[str]:
+    def _parse_row(cls, row: tuple, size: int, tz=None) -> list[str]:
         """
         Parses the raw values in the given row, returning a new list with the given size
         """
         parsed = []
         for i in range(size):
-            parsed.append(cls._parse_value(row[i].value, tz=tz) if i < len(row) else "")
+            parsed.append(cls._parse_value(row[i], tz=tz) if i < len(row) else "")
         return parsed
 
     @staticmethod
@@ -2534,30 +2827,9 @@ class ContactImport(SmartModel):
         Takes the list of URNs that have been imported and tries to detect spamming
         """
 
-        # extract all numerical URN paths
-        numerical_paths = []
-        for urn in urns:
-            scheme, path, query, display = URN.to_parts(urn)
-            try:
-                numerical_paths.append(int(path))
-            except ValueError:
-                pass
-
-        if len(numerical_paths) < cls.SEQUENTIAL_URNS_THRESHOLD:
-            return False
-
-        numerical_paths = sorted(numerical_paths)
-        last_path = numerical_paths[0]
-        num_sequential = 1
-        for path in numerical_paths[1:]:
-            if path == last_path + 1:
-                num_sequential += 1
-            last_path = path
-
-            if num_sequential >= cls.SEQUENTIAL_URNS_THRESHOLD:
-                return True
-
-        return False
+        counter = SequentialURNCounter()
+        counter.add_all(urns)
+        return counter.count >= cls.SEQUENTIAL_URNS_THRESHOLD
 
     def get_default_group_name(self):
         name = Path(self.original_filename).stem.title()
@@ -45,7 +45,7 @@ def squash_group_counts():
     """
     Squashes our ContactGroupCounts into single rows per ContactGroup
     """
-    ContactGroupCount.squash()
+    return {"ContactGroupCount": ContactGroupCount.squash()}
 
 
 @shared_task
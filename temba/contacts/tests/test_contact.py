@@ -87,7 +87,39 @@ class ContactTest(TembaTest):
         )
 
     @override_settings(MAILROOM_URL="http://mailroom:8090")
-    @patch("requests.post")
+    @patch("requests.Session.post")
+    @patch("temba.contacts.models.Contact.BULK_MODIFY_BATCH_SIZE", 2)
+    def test_bulk_modify_batches(self, mock_post):
+        contacts = [self.joe, self.frank, self.billy, self.voldemort]
+
+        def post(url, **kwargs):
+            uuids = {c.id: str(c.uuid) for c in contacts}
+            events = {uuids[i]: [{"type": "contact_name_changed"}] for i in kwargs["json"]["contact_ids"]}
+            return MockJsonResponse(200, {"events": events})
+
+        mock_post.side_effect = post
+
+        modified = Contact.bulk_modify(self.admin, contacts, [modifiers.Name(name="Bob")])
+
+        # modifications larger than the batch size are split into concurrent requests and their events merged
+        self.assertEqual(2, mock_post.call_count)
+        self.assertEqual(
+            [[self.joe.id, self.frank.id], [self.billy.id, self.voldemort.id]],
+            sorted(c.kwargs["json"]["contact_ids"] for c in mock_post.call_args_list),
+        )
+        self.assertEqual([c.id for c in contacts], modified)
+
+        # an error in any batch is raised
+        mock_post.side_effect = [
+            MockJsonResponse(200, {"events": {}}),
+            MockJsonResponse(500, {"error": "boom"}),
+        ]
+
+        with self.assertRaises(mailroom.RequestException), self.assertLogs("temba.contacts.models", level="ERROR"):
+            Contact.bulk_modify(self.admin, contacts, [modifiers.Name(name="Bob")])
+
+    @override_settings(MAILROOM_URL="http://mailroom:8090")
+    @patch("requests.Session.post")
     def test_open_ticket(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {"events": {str(self.joe.uuid): []}, "skipped": []})
 
@@ -96,6 +128,7 @@ class ContactTest(TembaTest):
         mock_post.assert_called_once_with(
             "http://mailroom:8090/mi/contact/modify",
             headers={"User-Agent": "Temba"},
+            timeout=(5, None),
             json={
                 "org_id": self.org.id,
                 "user_id": self.admin.id,
@@ -314,9 +347,11 @@ class ContactTest(TembaTest):
 
         # and deleting it leaves that as the historical record
         contact.refresh_from_db()
-        contact._full_release()
+        with patch("temba.mailroom.events.Event._invalidate_history_cache") as mock_invalidate:
+            contact._full_release()
 
         self.assertEqual(0, flow.runs.count())
+        self.assertEqual([call(contact)], mock_invalidate.call_args_list)  # cached history pages are also gone
         self.assertEqual({"status:W": 0, "status:I": 1}, flow.counts.prefix("status:").scope_totals())
 
     @mock_mailroom
@@ -771,6 +806,50 @@ class ContactTest(TembaTest):
 
         self.assertEqual(list(self.joe.get_scheduled_broadcasts().order_by("id")), [broadcast1, broadcast2, broadcast3])
 
+    @cleanup(valkey=True)
+    def test_get_timeline_caching(self):
+        group = self.create_group("Joe and Frank", [self.joe, self.frank])
+        bcast = self.create_broadcast(
+            self.admin,
+            {"eng": {"text": "Hello"}},
+            groups=[group],
+            schedule=Schedule.create(self.org, timezone.now() + timedelta(days=2), Schedule.REPEAT_WEEKLY, "MTWRFSU"),
+        )
+
+        with (
+            override_settings(TIMELINE_CACHE_TTL=60),
+            patch.object(Schedule, "project_fires", autospec=True, side_effect=Schedule.project_fires) as mock_project,
+        ):
+            timeline1 = self.joe.get_timeline()
+            self.assertEqual(1, mock_project.call_count)
+            self.assertEqual(10, len(timeline1["future"]))
+
+            # second view of the same contact reuses the cached projection
+            timeline2 = self.joe.get_timeline()
+            self.assertEqual(1, mock_project.call_count)
+            self.assertEqual(timeline1["future"], timeline2["future"])
+            self.assertEqual(timeline1["future_count"], timeline2["future_count"])
+
+            # as does paging through it
+            self.joe.get_timeline(after=timeline1["next_after"])
+            self.assertEqual(1, mock_project.call_count)
+
+            # another contact gets the same schedule expansion
+            self.assertEqual(timeline1["future_count"], self.frank.get_timeline()["future_count"])
+            self.assertEqual(1, mock_project.call_count)
+
+            # changing the schedule invalidates both the contact's projection and the schedule's fires
+            bcast.schedule.update_schedule(timezone.now() + timedelta(days=2), Schedule.REPEAT_WEEKLY, "M")
+            timeline3 = self.joe.get_timeline()
+            self.assertEqual(2, mock_project.call_count)
+            self.assertLess(timeline3["future_count"], timeline1["future_count"])
+
+            # as does the contact leaving the group
+            group.contacts.remove(self.joe)
+            self.joe.modified_on = timezone.now()
+            self.joe.save(update_fields=("modified_on",))
+            self.assertEqual(0, self.joe.get_timeline()["future_count"])
+
     @mock_mailroom
     def test_contacts_search(self, mr_mocks):
         search_url = reverse("contacts.contact_search")
@@ -1033,7 +1033,7 @@ class ContactCRUDLTest(CRUDLTestMixin, TembaTest):
         export_url = reverse("contacts.contact_export")
 
         self.assertRequestDisallowed(export_url, [None, self.agent])
-        response = self.assertUpdateFetch(export_url, [self.editor, self.admin], form_fields=("with_groups",))
+        response = self.assertUpdateFetch(export_url, [self.editor, self.admin], form_fields=("with_groups", "format"))
         self.assertNotContains(response, "already an export in progress")
 
         # create a dummy export task so that we won't be able to export
@@ -1066,7 +1066,12 @@ class ContactCRUDLTest(CRUDLTestMixin, TembaTest):
         export = Export.objects.exclude(id=blocking_export.id).get()
         self.assertEqual("contact", export.export_type)
         self.assertEqual(
-            {"group_id": self.org.active_contacts_group.id, "search": None, "with_groups": [big_group.id]},
+            {
+                "group_id": self.org.active_contacts_group.id,
+                "search": None,
+                "with_groups": [big_group.id],
+                "format": "xlsx",
+            },
             export.config,
         )
 
@@ -1,5 +1,6 @@
 from unittest.mock import call
 
+from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -8,7 +9,7 @@ from temba.campaigns.models import Campaign, CampaignEvent
 from temba.contacts.models import Contact, ContactField, ContactGroup, ContactGroupCount
 from temba.contacts.tasks import squash_group_counts
 from temba.schedules.models import Schedule
-from temba.tests import TembaTest, mock_mailroom
+from temba.tests import TembaTest, cleanup, mock_mailroom
 
 
 class ContactGroupTest(TembaTest):
@@ -190,6 +191,44 @@ class ContactGroupTest(TembaTest):
         self.assertEqual(group.get_member_count(), 0)
         self.assertEqual(set(group.contacts.all()), set())
 
+    @mock_mailroom
+    @cleanup(valkey=True)
+    def test_member_count_cache(self, mr_mocks):
+        group = self.create_group("Cool kids", contacts=[self.joe])
+        smart = self.create_group("Adults", query="age >= 18")
+
+        with override_settings(COUNTS_CACHE_TTL=60):
+            self.assertEqual(1, group.get_member_count())
+            self.assertEqual({str(group.id): 1}, ContactGroupCount.totals_cache.peek(self.org.id))
+
+            # bulk adding and removing contacts invalidates cached counts
+            Contact.bulk_change_group(self.admin, [self.frank, self.mary], group, add=True)
+            self.assertEqual({}, ContactGroupCount.totals_cache.peek(self.org.id))
+            self.assertEqual(3, group.get_member_count())
+
+            Contact.bulk_change_group(self.admin, [self.mary], group, add=False)
+            self.assertEqual(2, group.get_member_count())
+
+            # as does releasing a contact
+            self.frank.release(self.admin)
+            self.assertEqual({}, ContactGroupCount.totals_cache.peek(self.org.id))
+            self.assertEqual(1, group.get_member_count())
+
+            # groups which aren't ready aren't cached
+            smart.contacts.add(self.mary)
+            self.assertEqual(1, ContactGroup.objects.get(id=smart.id).get_member_count())
+            self.assertEqual({str(group.id): 1}, ContactGroupCount.totals_cache.peek(self.org.id))
+
+            smart.status = ContactGroup.STATUS_READY
+            smart.save(update_fields=("status",))
+
+            self.assertEqual(1, smart.get_member_count())
+            self.assertEqual({str(group.id): 1, str(smart.id): 1}, ContactGroupCount.totals_cache.peek(self.org.id))
+
+            # updating a smart group's query invalidates cached counts
+            smart.update_query("age > 18")
+            self.assertEqual({}, ContactGroupCount.totals_cache.peek(self.org.id))
+
     @mock_mailroom
     def test_status_group_counts(self, mr_mocks):
         # start with no contacts
@@ -1,3 +1,4 @@
+import io
 from datetime import date, datetime
 from unittest.mock import call, patch
 from zoneinfo import ZoneInfo
@@ -48,9 +49,18 @@ class ContactImportTest(TembaTest):
                 try_to_parse(imp_file)
             self.assertEqual(imp_error, e.exception.messages[0], f"error mismatch for {imp_file}")
 
+        # CSV files which aren't valid UTF-8, with the invalid bytes in the header or further into the records
+        header = "URN:Tel,Name\n".encode()
+        records = "".join(f"tel:+25078800{i:04d},Bob\n" for i in range(3000)).encode()
+        invalid = "tel:+250788382382,Café\n".encode("cp1252")
+
+        for data in (header + invalid, header + records + invalid):
+            with self.assertRaisesRegex(ValidationError, "Import file appears to be corrupted."):
+                ContactImport.try_to_parse(self.org, io.BytesIO(data), "invalid.csv")
+
     def test_extract_mappings(self):
         # try simple import in different formats
-        for ext in ("xlsx",):
+        for ext in ("xlsx", "csv"):
             imp = self.create_contact_import(f"media/test_imports/simple.{ext}")
             self.assertEqual(3, imp.num_records)
             self.assertEqual(
@@ -475,6 +485,36 @@ class ContactImportTest(TembaTest):
             batch.specs,
         )
 
+    @mock_mailroom
+    def test_batches_from_csv(self, mr_mocks):
+        imp = self.create_contact_import("media/test_imports/simple.csv")
+        imp.start()
+        batch = imp.batches.get()
+
+        self.assertEqual(
+            [
+                {
+                    "_import_row": 2,
+                    "name": "Eric Newcomer",
+                    "urns": ["tel:+250788382382"],
+                    "groups": [str(imp.group.uuid)],
+                },
+                {
+                    "_import_row": 3,
+                    "name": "NIC POTTIER",
+                    "urns": ["tel:+250788383383"],
+                    "groups": [str(imp.group.uuid)],
+                },
+                {
+                    "_import_row": 4,
+                    "name": "jen newcomer",
+                    "urns": ["tel:+250788383385"],
+                    "groups": [str(imp.group.uuid)],
+                },
+            ],
+            batch.specs,
+        )
+
     @mock_mailroom
     def test_batches_from_xlsx_with_formulas(self, mr_mocks):
         imp = self.create_contact_import("media/test_imports/formula_data.xlsx")
@@ -533,6 +573,16 @@ class ContactImportTest(TembaTest):
                 )
             )
 
+            # repeated paths only counted once
+            self.assertFalse(
+                ContactImport._detect_spamminess(["tel:+593979000001", "tel:+593979000002", "tel:+593979000002"])
+            )
+
+            # paths seen out of order can join two existing runs
+            self.assertTrue(
+                ContactImport._detect_spamminess(["tel:+593979000001", "tel:+593979000003", "tel:+593979000002"])
+            )
+
     @mock_mailroom
     def test_detect_spamminess_verified_org(self, mr_mocks):
         # if an org is verified, no flagging occurs
@@ -2,9 +2,10 @@ from unittest.mock import patch
 
 from django.test.utils import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 from temba.contacts.models import ContactField, ContactGroup, ContactImport
-from temba.tests import CRUDLTestMixin, TembaTest, mock_mailroom
+from temba.tests import CRUDLTestMixin, TembaTest, cleanup, mock_mailroom
 
 
 class ContactImportCRUDLTest(TembaTest, CRUDLTestMixin):
@@ -264,6 +265,7 @@ class ContactImportCRUDLTest(TembaTest, CRUDLTestMixin):
 
     @patch("temba.contacts.models.ContactImport.BATCH_SIZE", 2)
     @mock_mailroom
+    @cleanup(valkey=True)
     def test_read(self, mr_mocks):
         imp = self.create_contact_import("media/test_imports/simple.xlsx")
         imp.start()
@@ -273,6 +275,16 @@ class ContactImportCRUDLTest(TembaTest, CRUDLTestMixin):
         self.assertRequestDisallowed(read_url, [None, self.agent, self.admin2])
         self.assertReadFetch(read_url, [self.editor, self.admin], context_object=imp)
 
+        # cached group counts are invalidated once when we first see the import finished, not on every view
+        imp.status = ContactImport.STATUS_COMPLETE
+        imp.finished_on = timezone.now()
+        imp.save(update_fields=("status", "finished_on"))
+
+        with patch("temba.utils.models.counts.CountsCache.invalidate") as mock_invalidate:
+            self.assertReadFetch(read_url, [self.editor, self.admin], context_object=imp)
+
+        self.assertEqual(1, mock_invalidate.call_count)
+
     @mock_mailroom
     def test_preview_with_field_limit_reached(self, mr_mocks):
         """Test that new fields are automatically ignored when field limit is reached"""
@@ -248,7 +248,7 @@ class ContactCRUDL(SmartCRUDL):
         size_limit = 1_000_000
 
         def derive_fields(self):
-            return ("with_groups",)
+            return ("with_groups", "format")
 
         def get_blocker(self) -> str:
             if blocker := super().get_blocker():
@@ -270,7 +270,9 @@ class ContactCRUDL(SmartCRUDL):
         def create_export(self, org, user, form):
             search = self.request.GET.get("s")
             with_groups = form.cleaned_data["with_groups"]
-            return ContactExport.create(org, user, group=self.group, search=search, with_groups=with_groups)
+            return ContactExport.create(
+                org, user, group=self.group, search=search, with_groups=with_groups, format=form.cleaned_data["format"]
+            )
 
     class Omnibox(OrgPermsMixin, SmartListView):
         def get_queryset(self, **kwargs):
@@ -1095,7 +1097,7 @@ class ContactImportCRUDL(SmartCRUDL):
 
     class Create(SpaMixin, OrgPermsMixin, SmartCreateView):
         class Form(forms.ModelForm):
-            file = forms.FileField(validators=[FileExtensionValidator(allowed_extensions=("xlsx",))])
+            file = forms.FileField(validators=[FileExtensionValidator(allowed_extensions=("xlsx", "csv"))])
 
             def __init__(self, *args, org, **kwargs):
                 self.org = org
@@ -1386,6 +1388,10 @@ class ContactImportCRUDL(SmartCRUDL):
             context = super().get_context_data(**kwargs)
             context["info"] = self.import_info
             context["is_finished"] = self.is_import_finished()
+
+            if context["is_finished"]:
+                self.object.invalidate_group_counts()
+
             return context
 
         @cached_property
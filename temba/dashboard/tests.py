@@ -1,8 +1,9 @@
-from datetime import timedelta, timezone as tzone
+from datetime import datetime, timedelta, timezone as tzone
 
 from django.urls import reverse
 from django.utils import timezone
 
+from temba.channels.models import ChannelCount
 from temba.orgs.models import Org
 from temba.tests import TembaTest
 
@@ -17,6 +18,9 @@ class DashboardTest(TembaTest):
         self.create_outgoing_msg(joe, "Wanna hang?", voice=True)
         self.create_incoming_msg(joe, "Sure", voice=True)
 
+        # dashboards are served from rollups which are updated when counts are squashed
+        ChannelCount.squash()
+
     def test_dashboard_home(self):
         dashboard_url = reverse("dashboard.dashboard_home")
 
@@ -130,3 +134,57 @@ class DashboardTest(TembaTest):
         self.assertEqual(2, len(data["datasets"]))
         self.assertEqual([], data["datasets"][0]["data"])  # no incoming data
         self.assertEqual([], data["datasets"][1]["data"])  # no outgoing data
+
+    def test_workspace_stats_across_months(self):
+        stats_url = reverse("dashboard.dashboard_workspace_stats")
+
+        self.org.features += [Org.FEATURE_CHILD_ORGS]
+        child = self.org.create_new(self.admin, "Child Org", tzone.utc, as_child=True)
+        child_channel = self.create_channel("T", "Child Channel", "+250788000000", org=child)
+
+        joe = self.create_contact("Joe", phone="+593979099111")
+        bob = self.create_contact("Bob", phone="+593979099222", org=child)
+
+        def create_msgs(contact, channel, day, num_in, num_out):
+            created_on = datetime(*day, 12, 0, 0, 0, tzone.utc)
+            for i in range(num_in):
+                self.create_incoming_msg(contact, "In", channel=channel, created_on=created_on)
+            for i in range(num_out):
+                self.create_outgoing_msg(contact, "Out", channel=channel, created_on=created_on)
+
+        create_msgs(joe, self.channel, (2025, 1, 14), 1, 0)  # before period
+        create_msgs(joe, self.channel, (2025, 1, 15), 2, 1)  # partial month at start of period
+        create_msgs(joe, self.channel, (2025, 2, 3), 1, 4)  # whole month
+        create_msgs(joe, self.channel, (2025, 3, 28), 3, 0)  # whole month
+        create_msgs(joe, self.channel, (2025, 4, 2), 1, 1)  # partial month at end of period
+        create_msgs(joe, self.channel, (2025, 4, 3), 5, 5)  # after period
+        create_msgs(bob, child_channel, (2025, 2, 28), 0, 2)
+        create_msgs(bob, child_channel, (2025, 4, 1), 1, 0)
+
+        ChannelCount.squash()
+
+        self.login(self.admin, choose_org=self.org)
+
+        response = self.client.get(stats_url, {"since": "2025-01-15", "until": "2025-04-02"}).json()
+
+        data = response["data"]
+        self.assertEqual(["Nyaruka", "Child Org"], data["labels"])
+        self.assertEqual([7, 1], data["datasets"][0]["data"])  # incoming
+        self.assertEqual([6, 2], data["datasets"][1]["data"])  # outgoing
+
+        # period within a single month
+        response = self.client.get(stats_url, {"since": "2025-02-01", "until": "2025-02-27"}).json()
+
+        data = response["data"]
+        self.assertEqual(["Nyaruka"], data["labels"])
+        self.assertEqual([1], data["datasets"][0]["data"])
+        self.assertEqual([4], data["datasets"][1]["data"])
+
+        # message history includes child orgs
+        response = self.client.get(
+            reverse("dashboard.dashboard_message_history"), {"since": "2025-02-01", "until": "2025-04-01"}
+        ).json()
+
+        self.assertEqual(["2025-02-03", "2025-02-28", "2025-03-28", "2025-04-01"], response["data"]["labels"])
+        self.assertEqual([1, 0, 3, 1], response["data"]["datasets"][0]["data"])
+        self.assertEqual([4, 2, 0, 0], response["data"]["datasets"][1]["data"])
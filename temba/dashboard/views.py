@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from smartmin.views import SmartTemplateView
@@ -7,7 +8,7 @@ from django.http import JsonResponse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from temba.channels.models import ChannelCount
+from temba.channels.models import ChannelCount, ChannelDailyRollup, ChannelMonthlyRollup
 from temba.orgs.models import Org
 from temba.orgs.views.mixins import OrgPermsMixin
 from temba.utils.views.mixins import ChartViewMixin, SpaMixin
@@ -36,10 +37,11 @@ class MessageHistory(OrgPermsMixin, ChartViewMixin, SmartTemplateView):
         org = self.request.org
         orgs = Org.objects.filter(Q(id=org.id) | Q(parent=org))
 
-        # get all our counts for that period
-        daily_counts = ChannelCount.objects.filter(scope__in=[ChannelCount.SCOPE_TEXT_IN, ChannelCount.SCOPE_TEXT_OUT])
+        # get all our counts for that period from the org-level rollups
+        daily_counts = ChannelDailyRollup.objects.filter(
+            org__in=orgs, scope__in=[ChannelCount.SCOPE_TEXT_IN, ChannelCount.SCOPE_TEXT_OUT]
+        )
         daily_counts = daily_counts.filter(day__gte=since).filter(day__lte=until)
-        daily_counts = daily_counts.filter(channel__org__in=orgs)
 
         daily_counts = list(
             daily_counts.values("day", "scope").order_by("day", "scope").annotate(count_sum=Sum("count"))
@@ -95,44 +97,44 @@ class WorkspaceStats(OrgPermsMixin, SmartTemplateView):
 
         since, until = self.get_period()
 
-        # get all our counts for that period
-        daily_counts = ChannelCount.objects.filter(
-            scope__in=[
-                ChannelCount.SCOPE_TEXT_IN,
-                ChannelCount.SCOPE_TEXT_OUT,
-            ]
-        )
-
-        daily_counts = daily_counts.filter(day__gte=since).filter(day__lte=until)
-        daily_counts = daily_counts.filter(channel__org__in=orgs)
+        # whole months in the period are counted from monthly rollups and the remaining days from daily rollups
+        first_month = since if since.day == 1 else (since.replace(day=1) + timedelta(days=32)).replace(day=1)
+        end_month = (until + timedelta(days=1)).replace(day=1)
+        scopes = [ChannelCount.SCOPE_TEXT_IN, ChannelCount.SCOPE_TEXT_OUT]
 
-        categories = []
-        inbound = []
-        outbound = []
+        daily_counts = ChannelDailyRollup.objects.filter(org__in=orgs, scope__in=scopes)
 
-        for org in orgs:
-            org_daily_counts = list(
-                daily_counts.filter(channel__org_id=org.id)
-                .values("scope")
-                .order_by("scope")
-                .annotate(count_sum=Sum("count"))
+        if first_month < end_month:
+            daily_counts = daily_counts.filter(
+                Q(day__gte=since, day__lt=first_month) | Q(day__gte=end_month, day__lte=until)
             )
+            monthly_counts = ChannelMonthlyRollup.objects.filter(
+                org__in=orgs, scope__in=scopes, month__gte=first_month, month__lt=end_month
+            )
+        else:
+            daily_counts = daily_counts.filter(day__gte=since, day__lte=until)
+            monthly_counts = ChannelMonthlyRollup.objects.none()
 
-            # ignore orgs with no activity in this period
-            if not org_daily_counts:
-                continue
+        # fetch both as a single query
+        rows = daily_counts.values_list("org_id", "org__name", "scope", "count").union(
+            monthly_counts.values_list("org_id", "org__name", "scope", "count"), all=True
+        )
 
-            inbound_count, outbound_count = 0, 0
+        totals = defaultdict(lambda: {ChannelCount.SCOPE_TEXT_IN: 0, ChannelCount.SCOPE_TEXT_OUT: 0})
+        names = {}
+        for org_id, org_name, scope, count in rows:
+            totals[org_id][scope] += count
+            names[org_id] = org_name
 
-            for count in org_daily_counts:
-                if count["scope"] == ChannelCount.SCOPE_TEXT_IN:
-                    inbound_count = count["count_sum"]
-                elif count["scope"] == ChannelCount.SCOPE_TEXT_OUT:
-                    outbound_count = count["count_sum"]
+        categories = []
+        inbound = []
+        outbound = []
 
-            categories.append(org.name)
-            inbound.append(inbound_count)
-            outbound.append(outbound_count)
+        # orgs with no activity in this period won't have any rows
+        for org_id in sorted(totals.keys()):
+            categories.append(names[org_id])
+            inbound.append(totals[org_id][ChannelCount.SCOPE_TEXT_IN])
+            outbound.append(totals[org_id][ChannelCount.SCOPE_TEXT_OUT])
 
         return JsonResponse(
             {
@@ -1,13 +1,13 @@
-from django.db.models import Q, Sum, Value
+from django.db.models import F, Value
 from django.db.models.functions import Coalesce, Lower
 
 from temba.api.internal.serializers import ModelAsJsonSerializer
 from temba.api.internal.views import BaseEndpoint
-from temba.api.support import ListPagination, NameCursorPagination, SearchLengthMixin
+from temba.api.support import KeysetListPagination, NameCursorPagination, SearchLengthMixin
 from temba.api.views import ListAPIMixin
 from temba.utils.uuid import is_uuid
 
-from .models import Flow, FlowLabel, FlowRun
+from .models import Flow, FlowLabel
 
 
 class FlowsEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
@@ -15,18 +15,16 @@ class FlowsEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
     Flows for the current org, used by the flow list component. A folder is selected with the `folder` query param
     (`active` (default) or `archived`) — alternatively pass `label=<uuid>` to filter by a flow label. An optional
     `search` param filters by name, and `sort` can be `name`, `runs` or `ongoing` (prefix with `-` to reverse). Each
-    item is serialized via Flow.as_json() (name, type, labels, run counts, completion, activity sparkline).
+    item is serialized via Flow.as_json() (name, type, labels, run counts, completion, activity sparkline). Pass
+    `cursor` (empty for the first page) to navigate with keyset cursors rather than page numbers.
     """
 
     model = Flow
     serializer_class = ModelAsJsonSerializer
-    pagination_class = ListPagination
+    pagination_class = KeysetListPagination
 
-    # the run statuses summed for each sortable count column ("status:" scopes on FlowActivityCount)
-    SORT_STATUSES = {
-        "runs": None,  # all statuses
-        "ongoing": (FlowRun.STATUS_ACTIVE, FlowRun.STATUS_WAITING),
-    }
+    # the sortable count columns, read from each flow's materialized run totals
+    SORT_COUNTS = ("runs", "ongoing")
 
     def derive_queryset(self):
         # Build from Flow.objects rather than the org.flows related manager — a related manager would seed each
@@ -64,15 +62,9 @@ class FlowsEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
 
         if key == "name":
             order = Lower("name").desc() if desc else Lower("name").asc()
-        elif key in self.SORT_STATUSES:
-            # runs/ongoing are sums of the per-status run counts — annotate so the database can order by them
-            statuses = self.SORT_STATUSES[key]
-            scopes = (
-                Q(counts__scope__in=[f"status:{s}" for s in statuses])
-                if statuses
-                else Q(counts__scope__startswith="status:")
-            )
-            qs = qs.annotate(sort_count=Coalesce(Sum("counts__count", filter=scopes), Value(0)))
+        elif key in self.SORT_COUNTS:
+            # runs/ongoing come from the one row of totals per flow (see FlowRunTotals) rather than summing count rows
+            qs = qs.annotate(sort_count=Coalesce(F(f"run_totals__{key}"), Value(0)))
             order = "-sort_count" if desc else "sort_count"
         else:
             order = default_order
@@ -127,3 +127,90 @@ def _tag_node_diff(old: dict, new: dict, tags: set) -> None:
         if old_exits[uuid].get("destination_uuid") != new_exits[uuid].get("destination_uuid"):
             tags.add("routing")
             break
+
+
+def compute_delta(old: dict, new: dict) -> dict:
+    """
+    Computes a structural delta which transforms the old definition into the new one, i.e. such that
+    apply_delta(old, compute_delta(old, new)) == new. Objects are diffed recursively by key and lists of objects with
+    UUIDs (nodes, actions, exits etc) are diffed by UUID, so a delta only records the parts of nodes which changed:
+        {"set": {key: value}, "unset": [key], "dicts": {key: delta}, "lists": {key: list_delta}}
+
+    List deltas record the new order of UUIDs if it changed, items which are new, and deltas of items which changed:
+        {"uuids": [uuid], "set": {uuid: item}, "dicts": {uuid: delta}}
+    """
+    delta = {}
+
+    for key, value in new.items():
+        if key not in old:
+            delta.setdefault("set", {})[key] = value
+        elif old[key] != value:
+            if isinstance(old[key], dict) and isinstance(value, dict):
+                delta.setdefault("dicts", {})[key] = compute_delta(old[key], value)
+            elif _is_uuid_list(old[key]) and _is_uuid_list(value):
+                delta.setdefault("lists", {})[key] = _compute_list_delta(old[key], value)
+            else:
+                delta.setdefault("set", {})[key] = value
+
+    removed = [k for k in old if k not in new]
+    if removed:
+        delta["unset"] = removed
+
+    return delta
+
+
+def apply_delta(old: dict, delta: dict) -> dict:
+    """
+    Applies a delta from compute_delta to the old definition to get the new one. The old definition isn't modified
+    but unchanged parts of it are shared with the result.
+    """
+    unset = set(delta.get("unset", ()))
+    new = {k: v for k, v in old.items() if k not in unset}
+
+    for key, sub_delta in delta.get("dicts", {}).items():
+        new[key] = apply_delta(old[key], sub_delta)
+    for key, list_delta in delta.get("lists", {}).items():
+        new[key] = _apply_list_delta(old[key], list_delta)
+
+    new.update(delta.get("set", {}))
+    return new
+
+
+def _is_uuid_list(value) -> bool:
+    if not isinstance(value, list) or not all(isinstance(i, dict) and isinstance(i.get("uuid"), str) for i in value):
+        return False
+
+    return len({i["uuid"] for i in value}) == len(value)
+
+
+def _compute_list_delta(old: list, new: list) -> dict:
+    old_items = {i["uuid"]: i for i in old}
+    delta = {}
+
+    new_uuids = [i["uuid"] for i in new]
+    if new_uuids != [i["uuid"] for i in old]:
+        delta["uuids"] = new_uuids
+
+    for item in new:
+        old_item = old_items.get(item["uuid"])
+        if old_item is None:
+            delta.setdefault("set", {})[item["uuid"]] = item
+        elif old_item != item:
+            delta.setdefault("dicts", {})[item["uuid"]] = compute_delta(old_item, item)
+
+    return delta
+
+
+def _apply_list_delta(old: list, delta: dict) -> list:
+    old_items = {i["uuid"]: i for i in old}
+    added, changed = delta.get("set", {}), delta.get("dicts", {})
+
+    new = []
+    for uuid in delta["uuids"] if "uuids" in delta else old_items.keys():
+        if uuid in added:
+            new.append(added[uuid])
+        elif uuid in changed:
+            new.append(apply_delta(old_items[uuid], changed[uuid]))
+        else:
+            new.append(old_items[uuid])
+    return new
@@ -0,0 +1,31 @@
+from django_valkey import get_valkey_connection
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from temba.flows.models import FlowRunTotals
+
+
+class Command(BaseCommand):
+    """
+    Totals are only updated by squashes which run the current code, so squashes by workers still running the previous
+    release lose their deltas. Run this once the release adding run totals has been deployed to all workers. It holds
+    the squash task's lock so that no squash can add deltas while the totals are rebuilt.
+    """
+
+    help = "Rebuilds the per-flow run totals from squashed flow activity counts"
+
+    # the lock held by the squash_flow_counts cron task
+    SQUASH_LOCK_KEY = "celery-task-lock:squash_flow_counts"
+    SQUASH_LOCK_TIMEOUT = 7200
+
+    def handle(self, *args, **options):
+        r = get_valkey_connection()
+
+        self.stdout.write("Waiting for any running squash of flow counts to finish...")
+
+        with r.lock(self.SQUASH_LOCK_KEY, timeout=self.SQUASH_LOCK_TIMEOUT):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(FlowRunTotals.get_rebuild_sql())
+
+        self.stdout.write(f"Rebuilt run totals for {FlowRunTotals.objects.count()} flows")
@@ -0,0 +1,42 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.migrations.operations.models import AddIndex
+
+import temba.utils.models.fields
+
+
+class AddIndexConcurrentlyPlainReverse(AddIndexConcurrently):
+    """
+    Adds the index concurrently but reverses with a plain drop, so that migration tests - which roll the graph
+    backwards inside a transaction - can unapply it.
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # existing revisions are all stored in full and stay that way, only revisions superseded from now on are stored
+    # as deltas
+    atomic = False
+
+    dependencies = [
+        ("flows", "0410_remove_flowrun_active_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="flowrevision",
+            name="definition",
+            field=temba.utils.models.fields.JSONAsTextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="flowrevision",
+            name="delta",
+            field=temba.utils.models.fields.JSONAsTextField(null=True),
+        ),
+        AddIndexConcurrentlyPlainReverse(
+            model_name="flowrevision",
+            index=models.Index(fields=["flow", "-revision"], name="flowrevision_flow_revision"),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 6.1 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# populate from squashed status counts in the same transaction as creating the table, since unsquashed counts are
+# added to the totals when they are squashed. Workers still running the previous release squash without updating the
+# totals, so once this release is deployed to all workers, run the rebuild_flow_run_totals command to recalculate them.
+BACKFILL_SQL = """
+INSERT INTO flows_flowruntotals(
+    "flow_id", "org_id", "active", "waiting", "completed", "interrupted", "expired", "failed", "runs", "ongoing"
+)
+SELECT fc."flow_id", f."org_id",
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" = 'status:A'), 0),
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" = 'status:W'), 0),
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" = 'status:C'), 0),
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" = 'status:I'), 0),
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" = 'status:X'), 0),
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" = 'status:F'), 0),
+    COALESCE(SUM(fc."count") FILTER (
+        WHERE fc."scope" IN ('status:A', 'status:W', 'status:C', 'status:I', 'status:X', 'status:F')
+    ), 0),
+    COALESCE(SUM(fc."count") FILTER (WHERE fc."scope" IN ('status:A', 'status:W')), 0)
+FROM flows_flowactivitycount fc
+INNER JOIN flows_flow f ON f."id" = fc."flow_id"
+WHERE fc."is_squashed" AND starts_with(fc."scope", 'status:') GROUP BY 1, 2;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("flows", "0411_flowrevision_delta"),
+        ("orgs", "0188_reset_dropped_languages"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlowRunTotals",
+            fields=[
+                (
+                    "flow",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        primary_key=True,
+                        related_name="run_totals",
+                        serialize=False,
+                        to="flows.flow",
+                    ),
+                ),
+                ("active", models.BigIntegerField(default=0)),
+                ("waiting", models.BigIntegerField(default=0)),
+                ("completed", models.BigIntegerField(default=0)),
+                ("interrupted", models.BigIntegerField(default=0)),
+                ("expired", models.BigIntegerField(default=0)),
+                ("failed", models.BigIntegerField(default=0)),
+                ("runs", models.BigIntegerField(default=0)),
+                ("ongoing", models.BigIntegerField(default=0)),
+                (
+                    "org",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="flow_run_totals",
+                        to="orgs.org",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["org", "-runs"], name="flowruntotals_org_runs"),
+                    models.Index(fields=["org", "-ongoing"], name="flowruntotals_org_ongoing"),
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
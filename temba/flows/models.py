@@ -15,7 +15,7 @@ from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.indexes import OpClass
 from django.db import models, transaction
-from django.db.models import Prefetch, Q, Sum
+from django.db.models import Prefetch, Q, Subquery, Sum
 from django.db.models.functions import Lower
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -31,13 +31,14 @@ from temba.orgs.realtime import AssetNameMixin
 from temba.templates.models import Template
 from temba.tickets.models import Topic
 from temba.users.models import User
+from temba.utils import json
 from temba.utils.export.models import MultiSheetExporter
 from temba.utils.models import JSONAsTextField, LegacyIDMixin, TembaModel, delete_in_batches
 from temba.utils.models.counts import BaseScopedCount, BaseSquashableCount
 from temba.utils.uuid import uuid4
 
 from . import legacy
-from .changes import compute_changes
+from .changes import apply_delta, compute_changes, compute_delta
 
 logger = logging.getLogger(__name__)
 
@@ -368,6 +369,18 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         return {"icon": self.TYPE_ICONS.get(self.flow_type, "flow"), "type": self.flow_type, "uuid": self.uuid}
 
     def get_category_counts(self, result_key=None):
+        return self.get_category_counts_by_flow([self], result_key)[self]
+
+    @classmethod
+    def get_category_counts_by_flow(cls, flows, result_key=None) -> dict:
+        """
+        Gets summaries of category counts for each of the given flows, with the totals for all flows fetched at once
+        """
+        totals_by_flow = FlowResultCount.get_totals([f.id for f in flows])
+
+        return {f: f._summarize_category_counts(totals_by_flow.get(f.id, {}), result_key) for f in flows}
+
+    def _summarize_category_counts(self, counts_by_key: dict, result_key=None) -> list[dict]:
         # get the possible results from the flow metadata
         results_by_key = {r["key"]: r for r in self.info["results"]}
 
@@ -375,17 +388,6 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         if result_key:
             results_by_key = {result_key: results_by_key[result_key]} if result_key in results_by_key else {}
 
-        counts = (
-            self.result_counts.filter(result__in=results_by_key)
-            .values("result", "category")
-            .annotate(total=Sum("count"))
-        )
-
-        # organize into dict of results keys to dicts of category names to counts
-        counts_by_key = defaultdict(dict)
-        for count in counts:
-            counts_by_key[count["result"]][count["category"]] = count["total"]
-
         results = []
         for result_key, result in results_by_key.items():
             category_counts = counts_by_key.get(result_key, {})
@@ -624,33 +626,20 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         }
 
     def get_recent_contacts(self, exit_uuid: str, dest_uuid: str) -> list[dict]:
-        r = get_valkey_connection()
-        key = f"recent_contacts:{exit_uuid}:{dest_uuid}"
-
-        # fetch members of the sorted set from valkey and save as tuples of (contact_id, operand, time)
-        contact_ids = set()
-        raw = []
-        for member, score in r.zrange(key, start=0, end=-1, desc=True, withscores=True):
-            rand, contact_id, operand = member.decode().split("|", maxsplit=2)
-            contact_ids.add(int(contact_id))
-            raw.append((int(contact_id), operand, datetime.fromtimestamp(score, tzone.utc)))
-
-        # lookup all the referenced contacts
-        contacts_by_id = {c.id: c for c in self.org.contacts.filter(id__in=contact_ids, is_active=True)}
-
-        # if contact still exists, include in results
-        recent = []
-        for r in raw:
-            if contact := contacts_by_id.get(r[0]):
-                recent.append(
-                    {
-                        "contact": {"uuid": str(contact.uuid), "name": contact.get_display(org=self.org)},
-                        "operand": r[1],
-                        "time": r[2].isoformat(),
-                    }
-                )
+        return self.get_recent_contacts_by_segment([(exit_uuid, dest_uuid)])[(exit_uuid, dest_uuid)]
+
+    def get_recent_contacts_by_segment(self, segments: list[tuple[str, str]]) -> dict[tuple[str, str], list[dict]]:
+        """
+        Gets the recent contacts for each of the given segments (exit UUID and destination node UUID pairs) in a
+        single round trip to valkey and a single contacts query
+        """
+        keys = {seg: f"recent_contacts:{seg[0]}:{seg[1]}" for seg in segments}
+        recent = Contact.get_recent(self.org, list(keys.values()))
 
-        return recent
+        return {
+            seg: [{"contact": r["contact"], "operand": r["extra"], "time": r["time"].isoformat()} for r in recent[key]]
+            for seg, key in keys.items()
+        }
 
     def start(self, user, groups, contacts, query=None, exclude=None):
         """
@@ -717,7 +706,7 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         assert rev, "can't get definition of flow with no revisions"
 
         # update metadata in definition from database object as it may be out of date
-        definition = rev.definition
+        definition = rev.get_definition()
 
         if self.is_legacy():
             if "metadata" not in definition:
@@ -735,7 +724,7 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
 
     def get_current_revision(self):
         """
-        Returns the last saved revision for this flow if any
+        Returns the last saved revision for this flow if any, which is always stored with its full definition
         """
         return self.revisions.order_by("revision").last()
 
@@ -747,10 +736,10 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
             raise FlowVersionConflictException(definition.get(Flow.DEFINITION_SPEC_VERSION))
 
         current_revision = self.get_current_revision()
+        definition_revision = definition.get(Flow.DEFINITION_REVISION)
 
         if current_revision:
             # check we aren't walking over someone else
-            definition_revision = definition.get(Flow.DEFINITION_REVISION)
             if definition_revision is not None and definition_revision < current_revision.revision:
                 raise FlowUserConflictException(self.saved_by, self.saved_on)
 
@@ -773,7 +762,7 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         # holding row locks
         changes = None
         if current_revision:
-            prior_def = current_revision.definition
+            prior_def = current_revision.get_definition()
             if current_revision.spec_version != Flow.CURRENT_SPEC_VERSION:
                 # migrate the prior forward so the schemas align; accepting that name/expire
                 # then come from the live flow (get_migrated_definition rewrites them) — fine
@@ -805,6 +794,19 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
             is_system_rev = False
 
         with transaction.atomic():
+            # lock the flow row so concurrent saves are serialized, and if another revision was saved since we read
+            # the current one, build on and supersede that instead
+            locked = Flow.objects.select_for_update().only("saved_by", "saved_on").get(id=self.id)
+            latest_revision = self.get_current_revision()
+
+            if latest_revision and (not current_revision or latest_revision.id != current_revision.id):
+                if definition_revision is not None and definition_revision < latest_revision.revision:
+                    raise FlowUserConflictException(locked.saved_by, locked.saved_on)
+
+                current_revision = latest_revision
+                revision = latest_revision.revision + 1
+                definition[Flow.DEFINITION_REVISION] = revision
+
             # update our flow fields
             self.base_language = definition.get(Flow.DEFINITION_LANGUAGE, None)
             self.version_number = Flow.CURRENT_SPEC_VERSION
@@ -830,6 +832,9 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
                 revision=revision,
             )
 
+            if current_revision:
+                current_revision.supersede(revision)
+
             self.update_dependencies(info["dependencies"])
 
         # cap the revision history inline so it doesn't pile up between cron runs;
@@ -1017,6 +1022,7 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
         self.user_dependencies.clear()
 
         self.counts.all().delete()
+        FlowRunTotals.objects.filter(flow=self).delete()
 
         # call mailroom to interrupt sessions where contact is currently in this flow
         if interrupt_sessions:
@@ -1041,6 +1047,7 @@ class Flow(AssetNameMixin, LegacyIDMixin, TembaModel, DependencyMixin):
 
         delete_in_batches(self.counts.all())
         delete_in_batches(self.result_counts.all())
+        FlowRunTotals.objects.filter(flow=self).delete()
 
         super().delete()
 
@@ -1242,12 +1249,17 @@ class FlowRevision(LegacyIDMixin, models.Model):
 
     LAST_TRIM_KEY = "temba:last_flow_revision_trim"
     MAX_REVISIONS = 500
+    SNAPSHOT_INTERVAL = 20  # every Nth revision keeps its full definition when superseded
 
     flow = models.ForeignKey(Flow, on_delete=models.PROTECT, related_name="revisions")
-    definition = JSONAsTextField(default=dict)
     spec_version = models.CharField(default=Flow.FINAL_LEGACY_VERSION, max_length=8)
     revision = models.IntegerField()
 
+    # the current revision of a flow (which is what mailroom loads) and periodic snapshots are stored in full, and
+    # other revisions are stored as deltas from the definition of the next revision
+    definition = JSONAsTextField(null=True)
+    delta = JSONAsTextField(null=True)
+
     # categorized record of what changed since the previous revision; null for legacy
     # revisions that pre-date this field.
     changes = models.JSONField(null=True, default=None)
@@ -1316,14 +1328,50 @@ class FlowRevision(LegacyIDMixin, models.Model):
             for rule in ruleset["rules"]:
                 validate_localization(rule["category"])
 
+    def get_definition(self) -> dict:
+        """
+        Gets the definition of this revision, reconstructing it if it's stored as a delta by starting from the next
+        revision stored in full and applying each delta back to this revision
+        """
+        if self.definition is not None:
+            return self.definition
+
+        newer = self.flow.revisions.filter(revision__gt=self.revision)
+        snapshot = newer.filter(definition__isnull=False).order_by("revision").values("revision")[:1]
+        chain = list(
+            newer.filter(revision__lte=Subquery(snapshot)).order_by("-revision").only("revision", "definition", "delta")
+        )
+
+        definition = chain[0].definition
+        for rev in chain[1:]:
+            definition = apply_delta(definition, rev.delta)
+
+        return apply_delta(definition, self.delta)
+
+    def supersede(self, new):
+        """
+        Called on the previously current revision when a new revision is saved, to store it as a delta from the new
+        revision unless it's due to be kept as a snapshot
+        """
+        if self.revision % self.SNAPSHOT_INTERVAL == 0 or self.definition is None:
+            return
+
+        # definitions of older spec versions may have been migrated in place when diffing so aren't safe to use
+        if self.spec_version != Flow.CURRENT_SPEC_VERSION:
+            return
+
+        self.delta = compute_delta(new.definition, self.definition)
+        self.definition = None
+        self.save(update_fields=("definition", "delta"))
+
     def get_migrated_definition(self, to_version: str = Flow.CURRENT_SPEC_VERSION) -> dict:
-        definition = self.definition
+        definition = self.get_definition()
 
         # if it's previous to version 6, wrap the definition to
         # mirror our exports for those versions
         if Version(self.spec_version) < Version("6"):
             definition = dict(
-                definition=self.definition,
+                definition=definition,
                 flow_type=self.flow.flow_type,
                 expires=self.flow.expires_after_minutes,
                 id=self.flow.pk,
@@ -1362,6 +1410,12 @@ class FlowRevision(LegacyIDMixin, models.Model):
             "changes": self.changes or {},
         }
 
+    class Meta:
+        indexes = [
+            # for getting the current revision of a flow
+            models.Index(name="flowrevision_flow_revision", fields=("flow", "-revision")),
+        ]
+
 
 class FlowActivityCount(BaseScopedCount):
     """
@@ -1372,6 +1426,10 @@ class FlowActivityCount(BaseScopedCount):
 
     flow = models.ForeignKey(Flow, on_delete=models.PROTECT, related_name="counts", db_index=False)  # indexed below
 
+    @classmethod
+    def get_squash_rollups(cls) -> list[str]:
+        return [FlowRunTotals.get_rollup_sql()]
+
     @classmethod
     def prefetch_by_scope(cls, flows, *, prefix: str, to_attr: str, using: str, scope_gte: str = None):
         counts = cls.objects.using(using).filter(flow__in=flows).prefix(prefix)
@@ -1393,6 +1451,91 @@ class FlowActivityCount(BaseScopedCount):
         ]
 
 
+class FlowRunTotals(models.Model):
+    """
+    Materialized per-flow totals of runs by status. Rows are upserted with the deltas of unsquashed status counts as
+    those are squashed, so they lag behind by at most one squash but give a single row per flow which can be sorted on.
+    """
+
+    STATUS_COLUMNS = {
+        FlowRun.STATUS_ACTIVE: "active",
+        FlowRun.STATUS_WAITING: "waiting",
+        FlowRun.STATUS_COMPLETED: "completed",
+        FlowRun.STATUS_INTERRUPTED: "interrupted",
+        FlowRun.STATUS_EXPIRED: "expired",
+        FlowRun.STATUS_FAILED: "failed",
+    }
+    ONGOING_STATUSES = (FlowRun.STATUS_ACTIVE, FlowRun.STATUS_WAITING)
+
+    flow = models.OneToOneField(Flow, on_delete=models.PROTECT, primary_key=True, related_name="run_totals")
+    org = models.ForeignKey(Org, on_delete=models.PROTECT, related_name="flow_run_totals", db_index=False)
+    active = models.BigIntegerField(default=0)
+    waiting = models.BigIntegerField(default=0)
+    completed = models.BigIntegerField(default=0)
+    interrupted = models.BigIntegerField(default=0)
+    expired = models.BigIntegerField(default=0)
+    failed = models.BigIntegerField(default=0)
+    runs = models.BigIntegerField(default=0)  # all statuses
+    ongoing = models.BigIntegerField(default=0)  # active + waiting
+
+    @classmethod
+    def get_rollup_sql(cls) -> str:
+        """
+        Gets the statement run during flow activity count squashing which adds the deltas of removed unsquashed
+        status counts.
+        """
+
+        table = cls._meta.db_table
+        updates = ", ".join([f'"{c}" = {table}."{c}" + EXCLUDED."{c}"' for c in cls._get_columns()])
+
+        return f"""
+            {cls._get_insert_sql("removed", 'NOT r."is_squashed"')}
+            ON CONFLICT ("flow_id") DO UPDATE SET {updates}
+        """
+
+    @classmethod
+    def get_rebuild_sql(cls) -> str:
+        """
+        Gets the statements which recalculate all totals from squashed status counts. Unsquashed counts are left to be
+        added when they're squashed, so this mustn't run concurrently with squashing.
+        """
+
+        return f"""
+            DELETE FROM {cls._meta.db_table};
+            {cls._get_insert_sql(FlowActivityCount._meta.db_table, 'r."is_squashed"')};
+        """
+
+    @classmethod
+    def _get_columns(cls) -> list[str]:
+        return [*cls.STATUS_COLUMNS.values(), "runs", "ongoing"]
+
+    @classmethod
+    def _get_insert_sql(cls, source: str, condition: str) -> str:
+        def status_sum(statuses) -> str:
+            scopes = ", ".join([f"'status:{s}'" for s in statuses])
+            return f'COALESCE(SUM(r."count") FILTER (WHERE r."scope" IN ({scopes})), 0)'
+
+        sums = [status_sum([s]) for s in cls.STATUS_COLUMNS] + [
+            status_sum(cls.STATUS_COLUMNS),
+            status_sum(cls.ONGOING_STATUSES),
+        ]
+        insert_cols = ", ".join([f'"{c}"' for c in cls._get_columns()])
+
+        return f"""
+            INSERT INTO {cls._meta.db_table}("flow_id", "org_id", {insert_cols})
+            SELECT r."flow_id", f."org_id", {", ".join(sums)} FROM {source} r
+            INNER JOIN {Flow._meta.db_table} f ON f."id" = r."flow_id"
+            WHERE {condition} AND starts_with(r."scope", 'status:') GROUP BY 1, 2
+        """
+
+    class Meta:
+        indexes = [
+            # for sorting flow lists by run counts
+            models.Index(name="flowruntotals_org_runs", fields=("org", "-runs")),
+            models.Index(name="flowruntotals_org_ongoing", fields=("org", "-ongoing")),
+        ]
+
+
 class FlowResultCount(BaseSquashableCount):
     """
     Maintains counts for categories across results in a flow.
@@ -1404,6 +1547,74 @@ class FlowResultCount(BaseSquashableCount):
     result = models.CharField(max_length=64)
     category = models.CharField(max_length=64)
 
+    squash_tracked = "flow_id"
+
+    @classmethod
+    def _watermark_key(cls, flow_id: int) -> str:
+        return f"flow_result_totals_watermark:{flow_id}"
+
+    @classmethod
+    def on_squashed(cls, tracked: set):
+        ttl = settings.RESULTS_CACHE_TTL
+        if not ttl:
+            return
+
+        # bump the watermarks of squashed flows so that their cached totals are refetched. Watermarks expire no sooner
+        # than any totals cached against them so a watermark restarting from zero can't match stale totals.
+        r = get_valkey_connection()
+        with r.pipeline(transaction=False) as pipe:
+            for flow_id in tracked:
+                pipe.incr(cls._watermark_key(flow_id))
+                pipe.expire(cls._watermark_key(flow_id), ttl)
+            pipe.execute()
+
+    @classmethod
+    def get_totals(cls, flow_ids: list) -> dict[int, dict]:
+        """
+        Gets totals for each of the given flows as dicts of result keys to dicts of category names to counts. These
+        are cached in valkey against each flow's squash watermark, so they're reused until that flow's counts are next
+        squashed (which is when new unsquashed counts are expected to have accumulated) or RESULTS_CACHE_TTL seconds.
+        """
+
+        def fetch(ids: list) -> dict:
+            counts = (
+                cls.objects.filter(flow_id__in=ids)
+                .values("flow_id", "result", "category")
+                .annotate(total=Sum("count"))
+                .order_by("flow_id", "result", "category")
+            )
+
+            fetched = {flow_id: defaultdict(dict) for flow_id in ids}
+            for count in counts:
+                fetched[count["flow_id"]][count["result"]][count["category"]] = count["total"]
+            return fetched
+
+        ttl = settings.RESULTS_CACHE_TTL
+        if not ttl or not flow_ids:
+            return fetch(flow_ids)
+
+        r = get_valkey_connection()
+        watermarks = r.mget([cls._watermark_key(flow_id) for flow_id in flow_ids])
+        keys = {
+            flow_id: f"flow_result_totals:{flow_id}:{int(watermark or 0)}"
+            for flow_id, watermark in zip(flow_ids, watermarks)
+        }
+
+        cached = r.mget(list(keys.values()))
+        totals = {flow_id: json.loads(v) for flow_id, v in zip(keys.keys(), cached) if v is not None}
+        missing = [flow_id for flow_id in flow_ids if flow_id not in totals]
+
+        if missing:
+            fetched = fetch(missing)
+            totals.update(fetched)
+
+            with r.pipeline(transaction=False) as pipe:
+                for flow_id in missing:
+                    pipe.set(keys[flow_id], json.dumps(fetched[flow_id]), ex=ttl)
+                pipe.execute()
+
+        return totals
+
     class Meta:
         indexes = [
             # for squashing task
@@ -1437,6 +1648,7 @@ class ResultsExport(ExportType):
         with_groups=[],
         responded_only=True,
         extra_urns=[],
+        format=MultiSheetExporter.FORMAT_XLSX,
     ):
         export = Export.objects.create(
             org=org,
@@ -1449,6 +1661,7 @@ class ResultsExport(ExportType):
                 "with_groups": [g.id for g in with_groups],
                 "responded_only": responded_only,
                 "extra_urns": extra_urns,
+                "format": format,
             },
             created_by=user,
         )
@@ -1502,7 +1715,7 @@ class ResultsExport(ExportType):
         runs_columns = self.get_runs_columns(export, extra_urn_columns, result_fields)
 
         # create our exporter
-        exporter = MultiSheetExporter("Runs", runs_columns, export.org.timezone)
+        exporter = MultiSheetExporter("Runs", runs_columns, export.org.timezone, format=export.format)
         num_records = 0
 
         for batch in self._get_run_batches(export, start_date, end_date, flows, responded_only):
@@ -1532,7 +1745,12 @@ class ResultsExport(ExportType):
         if responded_only:
             where["responded"] = True
         records = Archive.iter_all_records(
-            export.org, Archive.TYPE_FLOWRUN, after=max(earliest_created_on, start_date), before=end_date, where=where
+            export.org,
+            Archive.TYPE_FLOWRUN,
+            after=max(earliest_created_on, start_date),
+            before=end_date,
+            where=where,
+            prefetch=Archive.PREFETCH_ARCHIVES,
         )
         seen = set()
 
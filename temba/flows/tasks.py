@@ -7,7 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from temba.utils.crons import cron_task
-from temba.utils.models import delete_in_batches
+from temba.utils.models import delete_by_keyset
 
 from .models import FlowActivityCount, FlowResultCount, FlowRevision, FlowSession, FlowStartCount
 
@@ -16,9 +16,11 @@ logger = logging.getLogger(__name__)
 
 @cron_task(lock_timeout=7200)
 def squash_flow_counts():
-    FlowActivityCount.squash()
-    FlowResultCount.squash()
-    FlowStartCount.squash()
+    return {
+        "FlowActivityCount": FlowActivityCount.squash(),
+        "FlowResultCount": FlowResultCount.squash(),
+        "FlowStartCount": FlowStartCount.squash(),
+    }
 
 
 @cron_task()
@@ -45,6 +47,4 @@ def trim_flow_sessions():
 
     trim_before = timezone.now() - settings.RETENTION_PERIODS["flowsession"]
 
-    num_deleted = delete_in_batches(FlowSession.objects.filter(ended_on__lte=trim_before))
-
-    return {"deleted": num_deleted}
+    return delete_by_keyset(FlowSession.objects.filter(ended_on__lte=trim_before))
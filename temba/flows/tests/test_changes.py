@@ -1,4 +1,6 @@
-from temba.flows.changes import compute_changes
+import copy
+
+from temba.flows.changes import apply_delta, compute_changes, compute_delta
 from temba.tests import TembaTest
 
 
@@ -202,3 +204,78 @@ class ComputeChangesTest(TembaTest):
         new = _flow(nodes=[node_a, node_b], ui_nodes=ui_moved, name="Renamed")
 
         self.assertEqual(["layout", "metadata", "nodes"], _tags(old, new))
+
+
+class ComputeDeltaTest(TembaTest):
+    def assertDelta(self, old, new, expected):
+        delta = compute_delta(old, new)
+        self.assertEqual(expected, delta)
+        self.assertEqual(new, apply_delta(old, delta))
+
+    def test_no_changes(self):
+        defn = _flow(nodes=[{"uuid": "a" * 36, "actions": [], "exits": []}])
+        self.assertDelta(defn, defn, {})
+
+    def test_top_level(self):
+        self.assertDelta(_flow(), _flow(name="Renamed"), {"set": {"name": "Renamed"}})
+        self.assertDelta(_flow(), _flow(revision=2), {"set": {"revision": 2}})
+        self.assertDelta(_flow(revision=2), _flow(), {"unset": ["revision"]})
+
+    def test_nodes(self):
+        send = {"uuid": "c" * 36, "type": "send_msg", "text": "Hi"}
+        node_a = {"uuid": "a" * 36, "actions": [send], "exits": [{"uuid": "d" * 36}]}
+        node_b = {"uuid": "b" * 36, "actions": [], "exits": []}
+
+        # only the changed action is recorded
+        edited_a = {**node_a, "actions": [{**send, "text": "Hello"}]}
+        self.assertDelta(
+            _flow(nodes=[node_a, node_b]),
+            _flow(nodes=[edited_a, node_b]),
+            {
+                "lists": {
+                    "nodes": {
+                        "dicts": {"a" * 36: {"lists": {"actions": {"dicts": {"c" * 36: {"set": {"text": "Hello"}}}}}}}
+                    }
+                }
+            },
+        )
+
+        # added nodes are recorded in full, along with the new order
+        self.assertDelta(
+            _flow(nodes=[node_a]),
+            _flow(nodes=[node_b, node_a]),
+            {"lists": {"nodes": {"uuids": ["b" * 36, "a" * 36], "set": {"b" * 36: node_b}}}},
+        )
+
+        # removed nodes just change the order
+        self.assertDelta(
+            _flow(nodes=[node_a, node_b]), _flow(nodes=[node_b]), {"lists": {"nodes": {"uuids": ["b" * 36]}}}
+        )
+        self.assertDelta(_flow(nodes=[node_a]), _flow(nodes=[]), {"lists": {"nodes": {"uuids": []}}})
+
+    def test_layout(self):
+        ui = {"a" * 36: {"position": {"left": 0, "top": 0}}}
+        ui_moved = {"a" * 36: {"position": {"left": 50, "top": 0}}}
+
+        self.assertDelta(
+            _flow(ui_nodes=ui),
+            _flow(ui_nodes=ui_moved),
+            {
+                "dicts": {
+                    "_ui": {"dicts": {"nodes": {"dicts": {"a" * 36: {"dicts": {"position": {"set": {"left": 50}}}}}}}}
+                }
+            },
+        )
+
+    def test_non_uuid_lists(self):
+        # lists without UUIDs or with duplicate UUIDs are replaced
+        self.assertDelta({"a": [1, 2]}, {"a": [2]}, {"set": {"a": [2]}})
+        self.assertDelta({"a": [{"uuid": "x"}, {"uuid": "x"}]}, {"a": [{"uuid": "x"}]}, {"set": {"a": [{"uuid": "x"}]}})
+
+    def test_apply_doesnt_modify(self):
+        old = _flow(nodes=[{"uuid": "a" * 36, "actions": [], "exits": []}])
+        old_copy = copy.deepcopy(old)
+        new = _flow(nodes=[{"uuid": "a" * 36, "actions": [], "exits": [{"uuid": "b" * 36}]}], name="Renamed")
+
+        self.assertEqual(new, apply_delta(old, compute_delta(old, new)))
+        self.assertEqual(old_copy, old)
@@ -1,9 +1,12 @@
 from datetime import date, timezone as tzone
+from io import StringIO
+from unittest.mock import patch
 
+from django.core.management import call_command
 from django.db import connection
 from django.utils import timezone
 
-from temba.flows.models import FlowActivityCount, FlowRun, FlowSession
+from temba.flows.models import Flow, FlowActivityCount, FlowRun, FlowRunTotals, FlowSession
 from temba.flows.tasks import squash_flow_counts
 from temba.tests import TembaTest
 from temba.utils.uuid import uuid4
@@ -247,9 +250,109 @@ class FlowActivityCountTest(TembaTest):
         # flow2/foo:3 should be gone because it squashed to zero
         self.assertEqual({"foo:1"}, set(flow2.counts.values_list("scope", flat=True)))
 
-        # test that model being asked to squash a set that matches no rows doesn't insert anytihng
+        # test that squashing when there are no unsquashed rows doesn't change anything
         with connection.cursor() as cursor:
-            sql, params = FlowActivityCount.get_squash_query({"flow_id": flow1.id, "scope": "foo:9"})
+            sql, params = FlowActivityCount.get_squash_query(100)
             cursor.execute(sql, params)
+            self.assertEqual((0, 0), cursor.fetchone())
 
         self.assertEqual({"foo:1", "foo:2", "foo:3"}, set(flow1.counts.values_list("scope", flat=True)))
+
+    def test_run_totals(self):
+        flow1 = self.create_flow("Test 1")
+        flow1.counts.create(scope="status:C", count=3)
+        flow1.counts.create(scope="status:W", count=2)
+        flow1.counts.create(scope="status:W", count=-1)
+        flow1.counts.create(scope="node:ebb534e1-e2e0-40e9-8652-d195e87d832b", count=4)  # not a status count
+
+        flow2 = self.create_flow("Test 2")
+        flow2.counts.create(scope="status:A", count=5)
+
+        # totals are only created when counts are squashed
+        self.assertFalse(FlowRunTotals.objects.exists())
+
+        # but prefetched run counts still include unsquashed counts
+        Flow.prefetch_run_counts([flow1, flow2])
+        self.assertEqual({"C": 3, "W": 1}, flow1.get_run_counts())
+        self.assertEqual({"A": 5}, flow2.get_run_counts())
+
+        squash_flow_counts()
+
+        def assert_totals(flow, active, waiting, completed, expired, runs, ongoing):
+            totals = FlowRunTotals.objects.get(flow=flow)
+            self.assertEqual(self.org, totals.org)
+            self.assertEqual(
+                (active, waiting, completed, expired, runs, ongoing),
+                (totals.active, totals.waiting, totals.completed, totals.expired, totals.runs, totals.ongoing),
+            )
+
+        assert_totals(flow1, active=0, waiting=1, completed=3, expired=0, runs=4, ongoing=1)
+        assert_totals(flow2, active=5, waiting=0, completed=0, expired=0, runs=5, ongoing=5)
+
+        # new deltas are added to the existing totals, and counts that were already squashed aren't added again
+        flow1.counts.create(scope="status:W", count=-1)
+        flow1.counts.create(scope="status:X", count=1)
+
+        squash_flow_counts()
+
+        assert_totals(flow1, active=0, waiting=0, completed=3, expired=1, runs=4, ongoing=0)
+        assert_totals(flow2, active=5, waiting=0, completed=0, expired=0, runs=5, ongoing=5)
+
+        # prefetched run counts include unsquashed counts
+        flow1.counts.create(scope="status:A", count=2)
+
+        flows = list(Flow.objects.filter(id__in=[flow1.id, flow2.id]).order_by("id"))
+        Flow.prefetch_run_counts(flows)
+        self.assertEqual({"A": 2, "C": 3, "X": 1}, flows[0].get_run_counts())
+        self.assertEqual({"A": 5}, flows[1].get_run_counts())
+
+        # squashes by workers without totals lose their deltas, which the rebuild command recovers
+        with patch.object(FlowActivityCount, "get_squash_rollups", return_value=[]):
+            squash_flow_counts()
+
+        flow2.counts.create(scope="status:A", count=-1)
+        flow2.counts.create(scope="status:C", count=1)
+        FlowRunTotals.objects.filter(flow=flow2).delete()
+
+        call_command("rebuild_flow_run_totals", stdout=StringIO())
+
+        assert_totals(flow1, active=2, waiting=0, completed=3, expired=1, runs=6, ongoing=2)
+        assert_totals(flow2, active=5, waiting=0, completed=0, expired=0, runs=5, ongoing=5)
+
+        # unsquashed counts are left to be added when they're squashed
+        squash_flow_counts()
+
+        assert_totals(flow1, active=2, waiting=0, completed=3, expired=1, runs=6, ongoing=2)
+        assert_totals(flow2, active=4, waiting=0, completed=1, expired=0, runs=5, ongoing=4)
+
+        # releasing a flow clears its totals
+        flow1.release(self.admin, interrupt_sessions=False)
+        self.assertFalse(FlowRunTotals.objects.filter(flow=flow1).exists())
+        self.assertTrue(FlowRunTotals.objects.filter(flow=flow2).exists())
+
+    def test_squashing_in_batches(self):
+        flow = self.create_flow("Test 1")
+        for i in range(7):
+            flow.counts.create(scope=f"foo:{i}", count=1)
+            flow.counts.create(scope=f"foo:{i}", count=i)
+
+        with (
+            patch("temba.flows.models.FlowActivityCount.squash_batch_size", 3),
+            patch("temba.flows.models.FlowActivityCount.squash_max_distinct", 5),
+        ):
+            stats = FlowActivityCount.squash()
+
+        # max distinct is respected across batches
+        self.assertEqual(5, stats["sets"])
+        self.assertEqual(10, stats["removed"])
+        self.assertEqual(4, flow.counts.filter(is_squashed=False).count())
+
+        result = squash_flow_counts()
+
+        self.assertEqual(2, result["FlowActivityCount"]["sets"])
+        self.assertEqual(4, result["FlowActivityCount"]["removed"])
+        self.assertEqual(0, flow.counts.filter(is_squashed=False).count())
+        self.assertEqual(7, flow.counts.count())
+
+        for i in range(7):
+            self.assertEqual(i + 1, flow.counts.filter(scope=f"foo:{i}").sum())
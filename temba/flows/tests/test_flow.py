@@ -1,11 +1,13 @@
 from unittest.mock import call, patch
 
+from django.test import override_settings
 from django.urls import reverse
 
 from temba.campaigns.models import Campaign, CampaignEvent
 from temba.contacts.models import ContactField, ContactGroup
 from temba.flows.models import (
     Flow,
+    FlowResultCount,
     FlowRevision,
     FlowRun,
     FlowStart,
@@ -15,7 +17,7 @@ from temba.flows.models import (
 )
 from temba.flows.tasks import squash_flow_counts
 from temba.globals.models import Global
-from temba.tests import CRUDLTestMixin, TembaTest, matchers, mock_mailroom
+from temba.tests import CRUDLTestMixin, TembaTest, cleanup, matchers, mock_mailroom
 from temba.tests.engine import MockSessionWriter
 from temba.triggers.models import Trigger
 
@@ -498,6 +500,57 @@ class FlowTest(TembaTest, CRUDLTestMixin):
             flow.get_category_counts(),
         )
 
+        # summaries can be fetched for multiple flows at once
+        flow2 = self.create_flow("Empty")
+        flow2.info = {"results": [{"key": "color", "name": "Color", "categories": ["Red", "Other"]}]}
+        flow2.save(update_fields=("info",))
+
+        with self.assertNumQueries(1):
+            counts = Flow.get_category_counts_by_flow([flow, flow2])
+
+        self.assertEqual({flow: flow.get_category_counts(), flow2: []}, counts)
+
+    @cleanup(valkey=True)
+    @override_settings(RESULTS_CACHE_TTL=60)
+    def test_get_category_counts_cached(self):
+        flow = self.create_flow("Favorites")
+        flow.info = {"results": [{"key": "color", "name": "Color", "categories": ["Red", "Blue", "Other"]}]}
+        flow.save(update_fields=("info",))
+
+        flow.result_counts.create(result="color", category="Red", count=3)
+        flow.result_counts.create(result="color", category="Blue", count=1)
+
+        def color_counts():
+            return {c["name"]: c["count"] for c in flow.get_category_counts()[0]["categories"]}
+
+        self.assertEqual({"Red": 3, "Blue": 1}, color_counts())
+
+        flow.result_counts.create(result="color", category="Red", count=2)
+
+        # totals are cached until counts are next squashed
+        with self.assertNumQueries(0):
+            self.assertEqual({"Red": 3, "Blue": 1}, color_counts())
+
+        squash_flow_counts()
+
+        self.assertEqual({"Red": 5, "Blue": 1}, color_counts())
+
+        # nothing to squash so watermark doesn't change and cached totals are still used
+        squash_flow_counts()
+
+        with self.assertNumQueries(0):
+            self.assertEqual({"Red": 5, "Blue": 1}, color_counts())
+
+        # squashing counts of another flow doesn't invalidate this flow's cached totals
+        flow2 = self.create_flow("Other")
+        flow2.result_counts.create(result="color", category="Red", count=1)
+
+        squash_flow_counts()
+
+        with self.assertNumQueries(0):
+            self.assertEqual({"Red": 5, "Blue": 1}, color_counts())
+        self.assertEqual({flow2.id: {"color": {"Red": 1}}}, FlowResultCount.get_totals([flow2.id]))
+
     def test_start_counts(self):
         # create start for 10 contacts
         flow = self.create_flow("Test")
@@ -921,7 +921,7 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
         )
 
         # or save an old version
-        definition = flow.revisions.all().first().definition
+        definition = flow.revisions.all().first().get_definition()
         definition[Flow.DEFINITION_SPEC_VERSION] = "11.12"
         response = self.client.post(revisions_url, definition, content_type="application/json")
         self.assertResponseError(response, "description", "Your flow has been upgraded to the latest version")
@@ -1676,6 +1676,28 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
             response.json(),
         )
 
+        # recent contacts for multiple segments can be fetched at once, ignoring invalid segments
+        node1_exit2_uuid = "ad2d4b0b-8b5c-4d1a-9b55-2b4c8b3e5d8e"
+        add_recent_contact(node1_exit2_uuid, node2_uuid, contact2, "Nope", 1639338562.456789)
+
+        bulk_url = reverse("flows.flow_recent_contacts", args=[flow.uuid])
+        seg1, seg2 = f"{node1_exit1_uuid}:{node2_uuid}", f"{node1_exit2_uuid}:{node2_uuid}"
+
+        self.assertRequestDisallowed(bulk_url, [None, self.agent, self.admin2])
+        response = self.assertReadFetch(f"{bulk_url}?segment={seg1}&segment={seg2}&segment=xyz", [self.editor])
+        self.assertEqual({seg1, seg2}, set(response.json().keys()))
+        self.assertEqual(3, len(response.json()[seg1]))
+        self.assertEqual(
+            [
+                {
+                    "contact": {"uuid": str(contact2.uuid), "name": "0979 222 222"},
+                    "operand": "Nope",
+                    "time": "2021-12-12T19:49:22.456789+00:00",
+                }
+            ],
+            response.json()[seg2],
+        )
+
     def test_result_chart(self):
         flow1 = self.create_flow("Test 1")
 
@@ -2136,6 +2158,7 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
                 "end_date",
                 "with_fields",
                 "with_groups",
+                "format",
                 "flows",
                 "extra_urns",
                 "responded_only",
@@ -2147,7 +2170,7 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
         with self.anonymous(self.org):
             response = self.client.get(export_url)
             self.assertEqual(
-                ["start_date", "end_date", "with_fields", "with_groups", "flows", "responded_only", "loc"],
+                ["start_date", "end_date", "with_fields", "with_groups", "format", "flows", "responded_only", "loc"],
                 list(response.context["form"].fields.keys()),
             )
 
@@ -2199,6 +2222,7 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
                 "with_fields": [gender.id],
                 "extra_urns": [],
                 "responded_only": False,
+                "format": "xlsx",
             },
             export.config,
         )
@@ -2216,13 +2240,13 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
         simulate_url = reverse("flows.flow_simulate", args=[flow.uuid])
 
         with override_settings(MAILROOM_AUTH_TOKEN="sesame", MAILROOM_URL="https://mailroom.temba.io"):
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockJsonResponse(400, {"session": {}})
                 response = self.client.post(simulate_url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(500, response.status_code)
 
             # start a flow
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockJsonResponse(200, {"session": {}})
                 response = self.client.post(simulate_url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(200, response.status_code)
@@ -2250,12 +2274,12 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
                 "flow": {},
             }
 
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockJsonResponse(400, {"session": {}})
                 response = self.client.post(simulate_url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(500, response.status_code)
 
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockJsonResponse(200, {"session": {}})
                 response = self.client.post(simulate_url, json.dumps(payload), content_type="application/json")
                 self.assertEqual(200, response.status_code)
@@ -2278,7 +2302,7 @@ class FlowCRUDLTest(TembaTest, CRUDLTestMixin):
         simulate_url = reverse("flows.flow_simulate", args=[flow.uuid])
 
         with override_settings(MAILROOM_AUTH_TOKEN="sesame", MAILROOM_URL="https://mailroom.temba.io"):
-            with patch("requests.post") as mock_post:
+            with patch("requests.Session.post") as mock_post:
                 mock_post.return_value = MockJsonResponse(200, {"session": {}})
                 response = self.client.post(
                     simulate_url,
@@ -1,8 +1,10 @@
+import copy
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.utils import timezone
 
-from temba.flows.models import FlowRevision
+from temba.flows.models import Flow, FlowRevision, FlowUserConflictException
 from temba.flows.tasks import trim_flow_revisions
 from temba.tests import TembaTest
 
@@ -30,6 +32,81 @@ class FlowRevisionTest(TembaTest):
             self.load_json("test_flows/legacy/invalid/non_localized_ruleset.json"), "non-localized flow definition"
         )
 
+    def test_delta_storage(self):
+        flow = self.create_flow("Test")
+        defs = [flow.get_current_revision().definition]
+
+        # save a series of revisions, each moving the node and editing the message
+        for i in range(2, FlowRevision.SNAPSHOT_INTERVAL + 5):
+            definition = copy.deepcopy(defs[-1])
+            definition["nodes"][0]["actions"][0]["text"] = f"Hello {i}"
+            definition["_ui"] = {"nodes": {definition["nodes"][0]["uuid"]: {"position": {"left": i, "top": 0}}}}
+            flow.save_revision(self.admin, definition)
+            defs.append(flow.get_current_revision().definition)
+
+        revisions = list(flow.revisions.order_by("revision"))
+        self.assertEqual(len(defs), len(revisions))
+
+        # current revision and periodic snapshots are stored in full, everything else as deltas
+        stored_in_full = [r.revision for r in revisions if r.definition is not None]
+        self.assertEqual([FlowRevision.SNAPSHOT_INTERVAL, len(defs)], stored_in_full)
+        self.assertTrue(all(r.delta is not None for r in revisions if r.definition is None))
+        self.assertEqual(defs[-1], flow.get_definition())
+
+        # but any revision can be reconstructed
+        for rev, definition in zip(revisions, defs):
+            self.assertEqual(definition, rev.get_definition())
+
+        # with a single query
+        with self.assertNumQueries(1):
+            revisions[0].get_definition()
+
+        # trimming old revisions doesn't break newer ones
+        FlowRevision.objects.filter(flow=flow, revision__lte=5).delete()
+        for rev, definition in zip(revisions[5:], defs[5:]):
+            self.assertEqual(definition, FlowRevision.objects.get(id=rev.id).get_definition())
+
+    def test_concurrent_saves(self):
+        flow = self.create_flow("Test")
+        rev1 = flow.get_current_revision()
+
+        def edit(text: str) -> dict:
+            definition = copy.deepcopy(rev1.definition)
+            definition["nodes"][0]["actions"][0]["text"] = text
+            return definition
+
+        # another save lands after the current revision has been read by this one
+        flow.save_revision(self.admin, edit("Hello 2"))
+        rev2 = flow.get_current_revision()
+
+        get_current_revision = Flow.get_current_revision
+        stale = iter([rev1])
+
+        def read_stale(f):
+            return next(stale, None) or get_current_revision(f)
+
+        # a save based on the revision that was overwritten is a conflict
+        with patch.object(Flow, "get_current_revision", autospec=True, side_effect=read_stale):
+            with self.assertRaises(FlowUserConflictException):
+                flow.save_revision(self.admin, edit("Hello 3"))
+
+        self.assertEqual(2, flow.revisions.count())
+
+        # a save without a revision builds on and supersedes the latest revision
+        stale = iter([rev1])
+        definition = edit("Hello 3")
+        del definition[Flow.DEFINITION_REVISION]
+
+        with patch.object(Flow, "get_current_revision", autospec=True, side_effect=read_stale):
+            flow.save_revision(None, definition)
+
+        self.assertEqual([1, 2, 3], list(flow.revisions.order_by("revision").values_list("revision", flat=True)))
+        self.assertEqual("Hello 3", flow.get_definition()["nodes"][0]["actions"][0]["text"])
+
+        rev2.refresh_from_db()
+        self.assertIsNone(rev2.definition)
+        self.assertEqual("Hello 2", rev2.get_definition()["nodes"][0]["actions"][0]["text"])
+
     def test_trim_revisions(self):
         start = timezone.now()
 
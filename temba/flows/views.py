@@ -54,6 +54,7 @@ from temba.utils.fields import (
     SelectWidget,
     TembaChoiceField,
 )
+from temba.utils.uuid import is_uuid
 from temba.utils.views.mixins import ContextMenuMixin, ModalFormMixin, SpaMixin
 
 from .models import (
@@ -212,19 +213,36 @@ class FlowCRUDL(SmartCRUDL):
 
     class RecentContacts(BaseReadView):
         """
-        Used by the editor for the rollover of recent contacts coming out of a split
+        Used by the editor for the rollover of recent contacts coming out of a split. Without a segment in the path,
+        returns recent contacts for all segments given as segment=<exit_uuid>:<dest_uuid> params so that the editor
+        can preload every visible segment at once.
         """
 
         permission = "flows.flow_editor"
+        max_segments = 100
 
         @classmethod
         def derive_url_pattern(cls, path, action):
-            return rf"^{path}/{action}/(?P<uuid>[0-9a-f-]+)/(?P<exit_uuid>[0-9a-f-]+)/(?P<dest_uuid>[0-9a-f-]+)/$"
+            return (
+                rf"^{path}/{action}/(?P<uuid>[0-9a-f-]+)/"
+                r"((?P<exit_uuid>[0-9a-f-]+)/(?P<dest_uuid>[0-9a-f-]+)/)?$"
+            )
 
         def render_to_response(self, context, **response_kwargs):
-            exit_uuid, dest_uuid = self.kwargs["exit_uuid"], self.kwargs["dest_uuid"]
+            exit_uuid, dest_uuid = self.kwargs.get("exit_uuid"), self.kwargs.get("dest_uuid")
+
+            if exit_uuid and dest_uuid:
+                return JsonResponse(self.object.get_recent_contacts(exit_uuid, dest_uuid), safe=False)
+
+            segments = []
+            for param in self.request.GET.getlist("segment")[: self.max_segments]:
+                exit_uuid, _, dest_uuid = param.partition(":")
+                if is_uuid(exit_uuid) and is_uuid(dest_uuid):
+                    segments.append((exit_uuid, dest_uuid))
 
-            return JsonResponse(self.object.get_recent_contacts(exit_uuid, dest_uuid), safe=False)
+            recent = self.object.get_recent_contacts_by_segment(segments)
+
+            return JsonResponse({f"{e}:{d}": contacts for (e, d), contacts in recent.items()})
 
     class Revisions(BaseReadView):
         """
@@ -266,9 +284,10 @@ class FlowCRUDL(SmartCRUDL):
                 )
 
             # orderwise return summaries of the latest 100
-            return JsonResponse(
-                {"results": [rev.as_json() for rev in flow.revisions.all().order_by("-revision")[:100]]}
+            revisions = (
+                flow.revisions.order_by("-revision").defer("definition", "delta").select_related("created_by")[:100]
             )
+            return JsonResponse({"results": [rev.as_json() for rev in revisions]})
 
         def post(self, request, *args, **kwargs):
             # try to parse our body
@@ -932,6 +951,7 @@ class FlowCRUDL(SmartCRUDL):
                 with_groups=form.cleaned_data["with_groups"],
                 responded_only=form.cleaned_data["responded_only"],
                 extra_urns=form.cleaned_data.get("extra_urns", []),
+                format=form.cleaned_data["format"],
             )
 
     class BaseResultsView(BaseReadView):
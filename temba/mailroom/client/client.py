@@ -1,10 +1,18 @@
+import itertools
 import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 
 import requests
 from packaging.version import Version
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from django.conf import settings
+from django.db import connections
 
 from temba.contacts.models import Contact
 from temba.flows.models import FlowStart
@@ -33,6 +41,148 @@ from .types import (
 
 logger = logging.getLogger(__name__)
 
+# endpoints which don't change any state and so can be retried if mailroom is unavailable or times out
+IDEMPOTENT_ENDPOINTS = {
+    "contact/export",
+    "contact/export_preview",
+    "contact/inspect",
+    "contact/parse_query",
+    "contact/search",
+    "contact/urns",
+    "flow/change_language",
+    "flow/clone",
+    "flow/inspect",
+    "flow/migrate",
+    "flow/start_preview",
+    "msg/broadcast_preview",
+    "msg/search",
+}
+
+# endpoints which can legitimately take longer than the read timeout of MAILROOM_TIMEOUT because they work through large
+# numbers of contacts or wait on an LLM, and so are only given its connect timeout. Interactive endpoints like searches
+# keep the read timeout since the web request would have timed out anyway.
+SLOW_ENDPOINTS = {
+    "contact/deindex",
+    "contact/export",
+    "contact/modify",
+    "llm/translate",
+    "org/deindex",
+}
+RETRY_STATUSES = {502, 503, 504}
+RETRY_BACKOFF = 0.1  # seconds, doubled for each retry
+
+# upper bounds in milliseconds of the buckets of our per-endpoint latency histograms
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_session = None
+_session_lock = threading.Lock()
+_batch_executor = None
+_latencies = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+_latencies_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    Adapter which applies a default timeout to requests that don't specify one
+    """
+
+    def __init__(self, *, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout or self.timeout, **kwargs)
+
+
+def get_session() -> requests.Session:
+    """
+    Gets the HTTP session shared by all clients in this process, so that connections to mailroom are pooled and kept
+    alive between requests. Failures to connect are retried here for every endpoint since the request never reached
+    mailroom, read timeouts and gateway errors are only retried for idempotent endpoints by the client.
+    """
+    global _session
+
+    if not _session:
+        with _session_lock:
+            if not _session:
+                adapter = TimeoutHTTPAdapter(
+                    timeout=settings.MAILROOM_TIMEOUT,
+                    pool_connections=1,
+                    pool_maxsize=settings.MAILROOM_POOL_SIZE,
+                    max_retries=Retry(total=None, connect=settings.MAILROOM_RETRIES, read=0, status=0, other=0),
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+
+    return _session
+
+
+def get_latency_histograms() -> dict[str, list[int]]:
+    """
+    Gets request counts by endpoint for each of LATENCY_BUCKETS (plus a final bucket for anything slower) for requests
+    made by this process.
+    """
+    with _latencies_lock:
+        return {endpoint: list(counts) for endpoint, counts in _latencies.items()}
+
+
+def _record_latency(endpoint: str, seconds: float):
+    ms = seconds * 1000
+    bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if ms <= bound), len(LATENCY_BUCKETS))
+
+    with _latencies_lock:
+        _latencies[endpoint][bucket] += 1
+
+
+class RequestBatch:
+    """
+    Sends requests to mailroom concurrently over the pooled session. Calls on the batch are forwarded to the client
+    and return futures. Leaving the batch waits for all requests to complete and raises the first error if any.
+    """
+
+    def __init__(self, client):
+        global _batch_executor
+
+        if not _batch_executor:
+            with _session_lock:
+                if not _batch_executor:
+                    _batch_executor = ThreadPoolExecutor(
+                        max_workers=settings.MAILROOM_POOL_SIZE, thread_name_prefix="mailroom"
+                    )
+
+        self.client = client
+        self.futures = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                # pool threads outlive requests so close any database connections opened by the call
+                connections.close_all()
+
+        def submit(*args, **kwargs):
+            future = _batch_executor.submit(call, *args, **kwargs)
+            self.futures.append(future)
+            return future
+
+        return submit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for future in self.futures:
+            future.exception()  # wait for everything even if something failed
+
+        if not exc_type:
+            for future in self.futures:
+                future.result()
+
 
 class MailroomClient:
     """
@@ -47,6 +197,15 @@ class MailroomClient:
         if auth_token:
             self.headers["Authorization"] = "Token " + auth_token
 
+    def batch(self) -> RequestBatch:
+        """
+        Creates a batch for sending multiple requests concurrently, e.g.
+
+            with client.batch() as batch:
+                results = [batch.contact_inspect(org, chunk) for chunk in chunks]
+        """
+        return RequestBatch(self)
+
     def android_event(self, org, channel, phone: str, event_type: str, extra: dict, occurred_on):
         return self._request(
             "android/event",
@@ -111,6 +270,26 @@ class MailroomClient:
 
         return resp["contact_uuids"]
 
+    def contact_export_batches(self, org, group, query: str, batch_size: int = 1000):
+        """
+        Generates batches of the UUIDs of contacts matching the given query, paging through the results with the cursor
+        returned by mailroom so that we never have to hold every UUID at once. Versions of mailroom which don't page
+        return all UUIDs and no cursor.
+        """
+        cursor = None
+        while True:
+            payload = {"org_id": org.id, "group_id": group.id, "query": query, "limit": batch_size}
+            if cursor:
+                payload["cursor"] = cursor
+
+            resp = self._request("contact/export", payload)
+
+            yield from itertools.batched(resp["contact_uuids"], batch_size)
+
+            cursor = resp.get("cursor")
+            if not cursor:
+                break
+
     def contact_export_preview(self, org, group, query: str) -> int:
         resp = self._request("contact/export_preview", {"org_id": org.id, "group_id": group.id, "query": query})
 
@@ -464,8 +643,27 @@ class MailroomClient:
         else:
             kwargs = dict(json=payload)
 
-        req_fn = requests.post if post else requests.get
-        response = req_fn("%s/mi/%s" % (self.base_url, endpoint), headers=headers, **kwargs)
+        if endpoint in SLOW_ENDPOINTS:
+            kwargs["timeout"] = (settings.MAILROOM_TIMEOUT[0], None)
+
+        session = get_session()
+        req_fn = session.post if post else session.get
+        retries = settings.MAILROOM_RETRIES if endpoint in IDEMPOTENT_ENDPOINTS else 0
+
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                response = req_fn("%s/mi/%s" % (self.base_url, endpoint), headers=headers, **kwargs)
+            except requests.ReadTimeout:
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    break
+            finally:
+                _record_latency(endpoint, time.perf_counter() - start)
+
+            time.sleep(RETRY_BACKOFF * 2**attempt)
 
         if response.headers.get("Content-Type") == "application/json":
             resp_body = response.json()
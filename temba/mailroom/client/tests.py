@@ -1,6 +1,10 @@
+import threading
 from datetime import datetime, timezone as tzone
 from decimal import Decimal
-from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import call, patch
+
+import requests
 
 from django.test import override_settings
 
@@ -11,11 +15,12 @@ from temba.contacts.models import ContactField, ContactImport
 from temba.flows.models import Flow, FlowStart
 from temba.schedules.models import Schedule
 from temba.tests import MockJsonResponse, MockResponse, TembaTest
+from temba.tests.mailroom import _real_mailroom_request
 from temba.tickets.models import Topic
 from temba.utils import json
 
 from .. import modifiers
-from .client import MailroomClient
+from .client import MailroomClient, get_latency_histograms
 from .exceptions import (
     AIServiceException,
     FlowValidationException,
@@ -32,7 +37,7 @@ class MailroomClientTest(TembaTest):
 
         self.client = MailroomClient("http://localhost:8090", "sesame")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_android_event(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {"id": 12345})
         response = self.client.android_event(
@@ -59,7 +64,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_android_message(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {"id": 12345})
         response = self.client.android_message(
@@ -84,7 +89,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_android_sync(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {"id": 12345})
         response = self.client.android_sync(self.channel)
@@ -97,7 +102,7 @@ class MailroomClientTest(TembaTest):
             json={"channel_id": self.channel.id},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_campaign_schedule(self, mock_post):
         farmers = self.create_group("Farmers", [])
         campaign = Campaign.create(self.org, self.admin, "Reminders", farmers)
@@ -118,7 +123,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "point_id": event.id},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_channel_interrupt(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {})
         response = self.client.channel_interrupt(self.org, self.channel)
@@ -131,7 +136,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "channel_id": self.channel.id},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_create(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -190,7 +195,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_deindex(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -202,13 +207,14 @@ class MailroomClientTest(TembaTest):
         mock_post.assert_called_once_with(
             "http://localhost:8090/mi/contact/deindex",
             headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+            timeout=(5, None),
             json={
                 "org_id": self.org.id,
                 "contact_uuids": [str(ann.uuid), str(bob.uuid)],
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_reindex(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -226,7 +232,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_export(self, mock_post):
         group = self.create_group("Doctors", contacts=[])
         ann = self.create_contact("Ann", phone="+1234567001")
@@ -240,10 +246,55 @@ class MailroomClientTest(TembaTest):
         mock_post.assert_called_once_with(
             "http://localhost:8090/mi/contact/export",
             headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+            timeout=(5, None),
             json={"org_id": self.org.id, "group_id": group.id, "query": "age = 42"},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
+    def test_contact_export_batches(self, mock_post):
+        group = self.create_group("Doctors", contacts=[])
+        mock_post.side_effect = [
+            MockJsonResponse(200, {"contact_uuids": ["a", "b"], "cursor": "abc123"}),
+            MockJsonResponse(200, {"contact_uuids": ["c"], "cursor": None}),
+        ]
+
+        batches = list(self.client.contact_export_batches(self.org, group, "age = 42", batch_size=2))
+
+        self.assertEqual([("a", "b"), ("c",)], batches)
+        self.assertEqual(
+            [
+                call(
+                    "http://localhost:8090/mi/contact/export",
+                    headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+                    timeout=(5, None),
+                    json={"org_id": self.org.id, "group_id": group.id, "query": "age = 42", "limit": 2},
+                ),
+                call(
+                    "http://localhost:8090/mi/contact/export",
+                    headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+                    timeout=(5, None),
+                    json={
+                        "org_id": self.org.id,
+                        "group_id": group.id,
+                        "query": "age = 42",
+                        "limit": 2,
+                        "cursor": "abc123",
+                    },
+                ),
+            ],
+            mock_post.call_args_list,
+        )
+
+        # older mailroom versions return everything at once without a cursor
+        mock_post.reset_mock()
+        mock_post.side_effect = [MockJsonResponse(200, {"contact_uuids": ["a", "b", "c"]})]
+
+        batches = list(self.client.contact_export_batches(self.org, group, "age = 42", batch_size=2))
+
+        self.assertEqual([("a", "b"), ("c",)], batches)
+        self.assertEqual(1, mock_post.call_count)
+
+    @patch("requests.Session.post")
     def test_contact_export_preview(self, mock_post):
         group = self.create_group("Doctors", contacts=[])
         mock_post.return_value = MockJsonResponse(200, {"total": 123})
@@ -257,7 +308,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "group_id": group.id, "query": "age = 42"},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_import(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {"batches": 2})
 
@@ -270,7 +321,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "import_id": 1234},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_inspect(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -285,7 +336,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "contact_ids": [ann.id, bob.id]},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_interrupt(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -299,7 +350,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "user_id": self.admin.id, "contact_ids": [ann.id, bob.id]},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_modify(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         mock_post.return_value = MockJsonResponse(
@@ -345,6 +396,7 @@ class MailroomClientTest(TembaTest):
         mock_post.assert_called_once_with(
             "http://localhost:8090/mi/contact/modify",
             headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+            timeout=(5, None),
             json={
                 "org_id": self.org.id,
                 "user_id": self.admin.id,
@@ -365,7 +417,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_parse_query(self, mock_post):
         mock_post.return_value = MockJsonResponse(
             200, {"query": 'name ~ "frank"', "metadata": {"attributes": ["name"]}}
@@ -385,7 +437,7 @@ class MailroomClientTest(TembaTest):
         with self.assertRaises(RequestException):
             self.client.contact_parse_query(self.org, "age > 10")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_populate_group(self, mock_post):
         group = self.create_group("Doctors", contacts=[])
 
@@ -398,7 +450,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "group_id": group.id},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_search(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -449,7 +501,7 @@ class MailroomClientTest(TembaTest):
         self.assertEqual([], response.contact_uuids)
         self.assertEqual(0, response.total)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_contact_urns(self, mock_post):
         mock_post.return_value = MockJsonResponse(
             200, {"urns": [{"normalized": "tel:+1234", "contact_id": 345}, {"normalized": "webchat:3a2ef3"}]}
@@ -469,7 +521,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_change_language(self):
         flow_def = {"nodes": [{"val": Decimal("1.23")}]}
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockJsonResponse(200, {"language": "spa"})
             migrated = self.client.flow_change_language(flow_def, language="spa")
 
@@ -488,7 +540,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_inspect(self):
         flow_def = {"nodes": [{"val": Decimal("1.23")}]}
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockJsonResponse(200, {"dependencies": []})
             info = self.client.flow_inspect(self.org, flow_def)
 
@@ -503,7 +555,7 @@ class MailroomClientTest(TembaTest):
         )
         self.assertEqual({"org_id": self.org.id, "flow": flow_def, "is_import": False}, json.loads(call[1]["data"]))
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_flow_interrupt(self, mock_post):
         flow = Flow.create(self.org, self.admin, "Flow")
 
@@ -519,7 +571,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_migrate(self):
         flow_def = {"nodes": [{"val": Decimal("1.23")}]}
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_post.return_value = MockJsonResponse(200, {"name": "Migrated!"})
             migrated = self.client.flow_migrate(flow_def, to_version="13.1.0")
 
@@ -534,7 +586,7 @@ class MailroomClientTest(TembaTest):
         )
         self.assertEqual({"flow": flow_def, "to_version": "13.1.0"}, json.loads(call[1]["data"]))
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_flow_start(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -583,7 +635,7 @@ class MailroomClientTest(TembaTest):
     def test_flow_start_preview(self):
         flow = self.create_flow("Test Flow")
 
-        with patch("requests.post") as mock_post:
+        with patch("requests.Session.post") as mock_post:
             mock_resp = {"query": 'group = "Farmers" AND status = "active"', "total": 2345}
             mock_post.return_value = MockJsonResponse(200, mock_resp)
             preview = self.client.flow_start_preview(
@@ -618,7 +670,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_llm_translate(self, mock_post):
         llm = LLM.create(self.org, self.admin, OpenAIType(), "gpt-4o", "GPT-4", {})
 
@@ -639,6 +691,7 @@ class MailroomClientTest(TembaTest):
         mock_post.assert_called_once_with(
             "http://localhost:8090/mi/llm/translate",
             headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+            timeout=(5, None),
             json={
                 "org_id": self.org.id,
                 "llm_id": llm.id,
@@ -663,7 +716,7 @@ class MailroomClientTest(TembaTest):
         self.assertEqual("rate limit exceeded", e.exception.error)
         self.assertEqual("unknown", e.exception.code)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_broadcast(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -715,7 +768,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_broadcast_preview(self, mock_post):
         mock_resp = {"query": 'group = "Farmers" AND status = "active"', "total": 2345}
         mock_post.return_value = MockJsonResponse(200, mock_resp)
@@ -749,7 +802,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_delete(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         msg1 = self.create_incoming_msg(ann, "Hi")
@@ -765,7 +818,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "user_id": self.admin.id, "msg_uuids": [str(msg1.uuid), str(msg2.uuid)]},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_handle(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         msg1 = self.create_incoming_msg(ann, "Hi")
@@ -781,7 +834,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "msg_uuids": [str(msg1.uuid), str(msg2.uuid)]},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_resend(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         msg1 = self.create_outgoing_msg(ann, "Hi")
@@ -797,7 +850,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "user_id": self.admin.id, "msg_uuids": [str(msg1.uuid), str(msg2.uuid)]},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_search(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -893,7 +946,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "text": "hello", "contact_uuid": str(bob.uuid), "in_ticket": True},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_msg_send(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         ticket = self.create_ticket(ann)
@@ -927,7 +980,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_notification_publish(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {})
         notifications = [{"user_uuid": str(self.admin.uuid), "data": {"type": "export:finished"}}]
@@ -941,7 +994,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "notifications": notifications},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_org_publish(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {})
         event = {
@@ -958,7 +1011,7 @@ class MailroomClientTest(TembaTest):
             json={"org_id": self.org.id, "event": event},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_org_deindex(self, mock_post):
         mock_post.return_value = MockJsonResponse(200, {})
         response = self.client.org_deindex(self.org)
@@ -968,10 +1021,11 @@ class MailroomClientTest(TembaTest):
         mock_post.assert_called_once_with(
             "http://localhost:8090/mi/org/deindex",
             headers={"User-Agent": "Temba", "Authorization": "Token sesame"},
+            timeout=(5, None),
             json={"org_id": self.org.id},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_ticket_add_note(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -994,7 +1048,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_ticket_change_assignee(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -1017,7 +1071,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_ticket_change_topic(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -1041,7 +1095,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_ticket_close(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -1063,7 +1117,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_ticket_reopen(self, mock_post):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])
         bob = self.create_contact("Bob", urns=["tel:+12340000002"])
@@ -1085,7 +1139,7 @@ class MailroomClientTest(TembaTest):
             },
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_errors(self, mock_post):
         group = self.create_group("Doctors", contacts=[])
 
@@ -1140,6 +1194,125 @@ class MailroomClientTest(TembaTest):
 
         self.assertEqual("Bad Gateway", e.exception.error)
 
+    @override_settings(MAILROOM_RETRIES=2)
+    @patch("temba.mailroom.client.client.RETRY_BACKOFF", 0)
+    @patch("requests.Session.post")
+    def test_read_timeouts(self, mock_post):
+        group = self.create_group("Doctors", contacts=[])
+
+        # idempotent endpoints are retried on read timeouts
+        mock_post.side_effect = [requests.ReadTimeout(), MockJsonResponse(200, {"total": 123})]
+
+        self.assertEqual(123, self.client.contact_export_preview(self.org, group, "age > 10"))
+        self.assertEqual(2, mock_post.call_count)
+
+        # but only up to the limit
+        mock_post.reset_mock()
+        mock_post.side_effect = requests.ReadTimeout()
+
+        with self.assertRaises(requests.ReadTimeout):
+            self.client.contact_export_preview(self.org, group, "age > 10")
+
+        self.assertEqual(3, mock_post.call_count)
+
+        # other endpoints aren't retried
+        mock_post.reset_mock()
+
+        with self.assertRaises(requests.ReadTimeout):
+            self.client.contact_interrupt(self.org, self.admin, [])
+
+        self.assertEqual(1, mock_post.call_count)
+
+
+class MailroomTransportTest(TembaTest):
+    def setUp(self):
+        super().setUp()
+
+        self.received = []  # (path, client port) of each request
+        self.fail_next = {}  # path -> number of 503s to respond with
+
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # so connections are kept alive
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                test.received.append((self.path, self.client_address[1]))
+
+                if test.fail_next.get(self.path):
+                    test.fail_next[self.path] -= 1
+                    status, body = 503, b"Service Unavailable"
+                else:
+                    status, body = 200, b'{"total": 123}'
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json" if status == 200 else "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        # let requests through the live mailroom guard since they're going to our stub server
+        patcher = patch.object(MailroomClient, "_request", _real_mailroom_request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = MailroomClient(f"http://127.0.0.1:{self.server.server_port}", "sesame")
+
+    @override_settings(MAILROOM_RETRIES=2)
+    @patch("temba.mailroom.client.client.RETRY_BACKOFF", 0)
+    def test_requests(self):
+        group = self.create_group("Doctors", contacts=[])
+        before = sum(get_latency_histograms().get("contact/export_preview", []))
+
+        # idempotent endpoints are retried on gateway errors
+        self.fail_next["/mi/contact/export_preview"] = 1
+        self.assertEqual(123, self.client.contact_export_preview(self.org, group, "age > 10"))
+        self.assertEqual(["/mi/contact/export_preview"] * 2, [p for p, _ in self.received])
+
+        # but only up to the limit
+        self.fail_next["/mi/contact/export_preview"] = 3
+        with self.assertRaises(RequestException):
+            self.client.contact_export_preview(self.org, group, "age > 10")
+        self.assertEqual(5, len(self.received))
+
+        # other endpoints aren't retried
+        self.fail_next["/mi/contact/interrupt"] = 1
+        with self.assertRaises(RequestException):
+            self.client.contact_interrupt(self.org, self.admin, [])
+        self.assertEqual(6, len(self.received))
+
+        # all requests went over the same kept-alive connection
+        self.assertEqual(1, len({port for _, port in self.received}))
+
+        self.assertEqual(5, sum(get_latency_histograms()["contact/export_preview"]) - before)
+
+    def test_batch(self):
+        group = self.create_group("Doctors", contacts=[])
+
+        with self.client.batch() as batch:
+            results = [batch.contact_export_preview(self.org, group, f"age > {i}") for i in range(5)]
+
+        self.assertEqual([123] * 5, [r.result() for r in results])
+        self.assertEqual(5, len(self.received))
+
+        # errors are raised when the batch exits
+        self.fail_next["/mi/contact/interrupt"] = 1
+        with self.assertRaises(RequestException):
+            with self.client.batch() as batch:
+                batch.contact_interrupt(self.org, self.admin, [])
+                batch.contact_export_preview(self.org, group, "age > 10")
+
+        self.assertEqual(7, len(self.received))
+
 
 class QueryExceptionTest(TembaTest):
     def test_str(self):
@@ -1,8 +1,14 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from uuid import UUID
 
+from django.conf import settings
+from django.core.cache import cache
+
 from temba.users.models import User
 from temba.utils import dynamo
+from temba.utils.uuid import uuid4
 
 
 @dataclass
@@ -49,6 +55,12 @@ class Event:
     # lifecycle events (opened/closed/reopened) which are shown everywhere
     ticket_detail_types = {TYPE_TICKET_ASSIGNED, TYPE_TICKET_NOTE_ADDED, TYPE_TICKET_TOPIC_CHANGED}
 
+    # max number of items we'll request in a single history query, as we grow the limit to account for tags
+    HISTORY_MAX_FETCH_LIMIT = 1000
+
+    # pool used to prefetch the next page of history in the background (threads are only started as needed)
+    _prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="history")
+
     @classmethod
     def _from_item(cls, contact, item: dict) -> dict:
         assert item["OrgID"] == contact.org_id, "org ID mismatch for contact event"
@@ -69,16 +81,80 @@ class Event:
     @classmethod
     def get_by_contact(cls, contact, user, *, before: UUID, after: UUID, ticket: UUID, limit: int) -> list[dict]:
         """
-        Fetches events for the given contact either before or after the given event UUID.
+        Fetches events for the given contact either before or after the given event UUID. Callers are expected to
+        request one more event than they display, as the last event may not have all its tags.
         """
         assert (before or after) and not (before and after), "must provide either before or after"
 
+        if before:
+            events, tags = cls._get_history_page(contact, before=before, ticket=ticket, limit=limit)
+        else:
+            events, tags = cls._fetch_history(
+                contact, after_sk=f"evt#{after}", before_sk=None, ticket=ticket, limit=limit
+            )
+
+            # if there are new events then any pages we've cached for this contact may have stale tags
+            if events:
+                cls._invalidate_history_cache(contact)
+
+        cls._postprocess_events(contact.org, user, events, tags)
+
+        return events
+
+    @classmethod
+    def _get_history_page(cls, contact, *, before: UUID, ticket: UUID, limit: int) -> tuple[list, list]:
+        """
+        Gets a page of history before the given event, using pages cached for the contact if available, and
+        prefetching the next page in the background so that scrolling back doesn't wait on DynamoDB.
+        """
+        if not settings.HISTORY_CACHE_TTL:
+            return cls._fetch_history(contact, after_sk=None, before_sk=f"evt#{before}", ticket=ticket, limit=limit)
+
+        cache_prefix = cls._history_cache_prefix(contact)
+        page_key = f"{cache_prefix}:{before}:{ticket or ''}:{limit}"
+        page = cache.get(page_key)
+
+        if page:
+            events, tags = page
+        else:
+            events, tags = cls._fetch_history(
+                contact, after_sk=None, before_sk=f"evt#{before}", ticket=ticket, limit=limit
+            )
+            cache.set(page_key, (events, tags), timeout=settings.HISTORY_CACHE_TTL)
+
+        # if this page is full, the next page will be fetched with the last event the caller displays
+        if len(events) == limit and limit > 1:
+            next_before = events[-2]["uuid"]
+            next_key = f"{cache_prefix}:{next_before}:{ticket or ''}:{limit}"
+            if next_key not in cache:
+                cls._prefetch_executor.submit(cls._prefetch_history_page, contact, next_key, next_before, ticket, limit)
+
+        return events, tags
+
+    @classmethod
+    def _prefetch_history_page(cls, contact, page_key: str, before: str, ticket: UUID, limit: int):
+        events, tags = cls._fetch_history(contact, after_sk=None, before_sk=f"evt#{before}", ticket=ticket, limit=limit)
+        cache.set(page_key, (events, tags), timeout=settings.HISTORY_CACHE_TTL)
+
+    @classmethod
+    def _history_cache_prefix(cls, contact) -> str:
+        """
+        Pages are cached under their own keys, prefixed with a version for the contact which is replaced to invalidate
+        them all, so that the prefetch thread never has to read-modify-write a shared value.
+        """
+        version = cache.get_or_set(f"contact_history:{contact.uuid}", uuid4().hex, timeout=settings.HISTORY_CACHE_TTL)
+        return f"contact_history:{contact.uuid}:{version}"
+
+    @classmethod
+    def _invalidate_history_cache(cls, contact):
+        cache.delete(f"contact_history:{contact.uuid}")
+
+    @classmethod
+    def _fetch_history(cls, contact, *, after_sk: str, before_sk: str, ticket: UUID, limit: int) -> tuple[list, list]:
         pk = f"con#{contact.uuid}"
-        before_sk = f"evt#{before}" if before else None
-        after_sk = f"evt#{after}" if after else None
         events, tags = [], []
 
-        def _item(item: dict) -> bool:
+        def _item(item: dict) -> int:
             if item["SK"].count("#") == 1:  # item is an event rather than a tag
                 event = cls._from_item(contact, item)
 
@@ -90,18 +166,23 @@ class Event:
             # Keep going until we reach the limit. Note that because tags are interspersed with events, the last fetched
             # event might not have all its tags yet.. but we always fetch one more event than what we return so the
             # possibly incomplete event will be discarded anyway.
-            return len(events) < limit
+            return limit - len(events)
 
         cls._query_history(pk, after_sk=after_sk, before_sk=before_sk, limit=limit, callback=_item)
-        cls._postprocess_events(contact.org, user, events, tags)
 
-        return events
+        return events, tags
 
     @classmethod
     def _query_history(cls, pk: str, *, after_sk: str, before_sk: str, limit: int, callback):
+        """
+        Queries history items for the given partition, passing each to the callback which should return how many more
+        items it needs. Tags and excluded events mean we need to fetch more items than that, so after each fetch we
+        grow the fetch limit according to the ratio of items fetched to items needed so far.
+        """
         num_fetches = 0
+        num_fetched = 0
         next_start_sk = None
-        query = dict(Limit=limit, Select="ALL_ATTRIBUTES")
+        query = dict(TableName=dynamo.HISTORY.name, Limit=limit, Select="ALL_ATTRIBUTES")
 
         if after_sk:
             query.update(
@@ -116,23 +197,33 @@ class Event:
                 ScanIndexForward=False,
             )
 
+        # use the table's client rather than the table itself because unlike resources, clients are thread safe
+        client = dynamo.HISTORY.meta.client
+
         while True:
             assert num_fetches < 100, "too many fetches for history"
 
-            if next_start_sk:  # pragma: no cover
+            if next_start_sk:
                 query["ExclusiveStartKey"] = {"PK": pk, "SK": next_start_sk}
 
-            response = dynamo.HISTORY.query(**query)
+            response = client.query(**query)
             num_fetches += 1
+            remaining = limit
 
             for item in response.get("Items", []):
-                if not callback(item):
+                num_fetched += 1
+                remaining = callback(item)
+                if remaining <= 0:
                     return
 
             next_start_sk = response.get("LastEvaluatedKey", {}).get("SK")
             if not next_start_sk:
                 return
 
+            # estimate how many items we'll need to fetch to get the remaining items the callback wants
+            num_used = max(limit - remaining, 1)
+            query["Limit"] = min(math.ceil(remaining * num_fetched / num_used) + 1, cls.HISTORY_MAX_FETCH_LIMIT)
+
     @classmethod
     def _include_event(cls, event, ticket_uuid) -> bool:
         if event["type"] in cls.ticket_detail_types:
@@ -1,5 +1,6 @@
 import base64
 from datetime import timedelta
+from unittest.mock import patch
 from uuid import UUID
 
 from boto3.dynamodb.types import Binary
@@ -469,6 +470,79 @@ class EventTest(TembaTest):
         self.assertEqual("session_triggered", event["type"])
         self.assertEqual({"uuid": "b7cf0d83-f1c9-411c-96fd-c511a4cfa86d", "name": "Registration Flow"}, event["flow"])
 
+    @cleanup(dynamodb=True, valkey=True)
+    def test_get_by_contact_paging(self):
+        contact = self.create_contact("Jim", phone="+593979111111", uuid="7e8ff9aa-4b60-49e2-81a6-e79c92635c1e")
+        pk = f"con#{contact.uuid}"
+
+        # 20 events which each have 4 tags
+        event_uuids = [f"019880eb-e422-7d67-993f-cdec646360{i:02}" for i in range(20)]
+        with dynamo.HISTORY.batch_writer() as writer:
+            for i, event_uuid in enumerate(event_uuids):
+                data = {"type": "contact_name_changed", "created_on": "2025-08-06T19:46:39Z", "name": f"Bob {i}"}
+                writer.put_item({"PK": pk, "SK": f"evt#{event_uuid}", "OrgID": self.org.id, "Data": data})
+
+                for t in range(4):
+                    writer.put_item(
+                        {"PK": pk, "SK": f"evt#{event_uuid}#ta{t}", "OrgID": self.org.id, "Data": {"status": "sent"}}
+                    )
+
+        client = dynamo.HISTORY.meta.client
+        real_query = client.query
+        query_limits = []
+
+        def query(**kwargs):
+            query_limits.append(kwargs["Limit"])
+            return real_query(**kwargs)
+
+        before = UUID("019880eb-e422-7d67-993f-cdec64636099")
+
+        with patch.object(client, "query", side_effect=query):
+            events = Event.get_by_contact(contact, self.admin, before=before, after=None, ticket=None, limit=6)
+
+        self.assertEqual(list(reversed(event_uuids))[:6], [e["uuid"] for e in events])
+
+        # first fetch only gets 1 event (6 items with tags) so limit grows to fetch the remaining 5 events in one go
+        self.assertEqual([6, 31], query_limits)
+
+        class SyncExecutor:
+            def submit(self, fn, *args):
+                fn(*args)
+
+        # with caching enabled, the next page is prefetched and then served from the cache
+        with override_settings(HISTORY_CACHE_TTL=60), patch.object(Event, "_prefetch_executor", SyncExecutor()):
+            with patch.object(client, "query", side_effect=query):
+                query_limits = []
+                page1 = Event.get_by_contact(contact, self.admin, before=before, after=None, ticket=None, limit=6)
+
+                self.assertEqual(4, len(query_limits))  # this page and the next page
+
+                query_limits = []
+                page2 = Event.get_by_contact(
+                    contact, self.admin, before=UUID(page1[-2]["uuid"]), after=None, ticket=None, limit=6
+                )
+
+                self.assertEqual(list(reversed(event_uuids))[5:11], [e["uuid"] for e in page2])
+                self.assertEqual(2, len(query_limits))  # only prefetching page 3
+
+                # polling for new events finds none so cache isn't touched
+                Event.get_by_contact(
+                    contact, self.admin, before=None, after=UUID(event_uuids[-1]), ticket=None, limit=6
+                )
+
+                query_limits = []
+                Event.get_by_contact(contact, self.admin, before=before, after=None, ticket=None, limit=6)
+                self.assertEqual(0, len(query_limits))
+
+                # but if polling finds new events, the contact's cached pages are invalidated
+                Event.get_by_contact(
+                    contact, self.admin, before=None, after=UUID(event_uuids[-2]), ticket=None, limit=6
+                )
+
+                query_limits = []
+                Event.get_by_contact(contact, self.admin, before=before, after=None, ticket=None, limit=6)
+                self.assertEqual(4, len(query_limits))
+
     def assert_get_by_contact(self, contact, user, *, after=None, before=None, limit=50, ticket=None, expected: list):
         fetched = Event.get_by_contact(contact, user, after=after, before=before, ticket=ticket, limit=limit)
 
@@ -10,12 +10,13 @@ from temba.api.internal.serializers import ModelAsJsonSerializer
 from temba.api.internal.views import BaseEndpoint
 from temba.api.support import (
     CreatedOnCursorPagination,
-    ListPagination,
+    KeysetListPagination,
     SearchCountMixin,
     SearchLengthMixin,
     SentOnCursorPagination,
 )
 from temba.api.views import ListAPIMixin
+from temba.contacts.models import Contact
 from temba.utils.uuid import is_uuid
 
 from .models import Broadcast, BroadcastMsgCount, Msg, MsgFolder
@@ -26,12 +27,13 @@ class BroadcastsEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
     Broadcasts for the current org, used by the broadcast list component. A folder is selected with the `folder`
     query param — `sent` (the default: broadcasts without a schedule) or `scheduled` (broadcasts waiting on one).
     An optional `search` param filters by message text, and `sort` can be `created_on` or `next_fire`
-    (scheduled only), prefixed with `-` to reverse. Each item is serialized via Broadcast.as_json().
+    (scheduled only), prefixed with `-` to reverse. Each item is serialized via Broadcast.as_json(). Pass `cursor`
+    (empty for the first page) to navigate with keyset cursors rather than page numbers.
     """
 
     model = Broadcast
     serializer_class = ModelAsJsonSerializer
-    pagination_class = ListPagination
+    pagination_class = KeysetListPagination
 
     def derive_queryset(self):
         # Build from Broadcast.objects rather than the org.broadcasts related manager — a related manager would seed
@@ -112,6 +114,9 @@ class MessagesEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
 
         ordering = ("-uuid",)
 
+        # a common word can match millions of messages, so stop counting there
+        search_count_limit = 10_000
+
         def get_ordering(self, request, queryset, view=None):
             if request.query_params.get("folder", "").lower() == "sent":
                 return SentOnCursorPagination.ordering
@@ -123,12 +128,26 @@ class MessagesEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
             # pre-calculated count so the list always has a total to show.
             if getattr(self, "_search_count", None) is None and view is not None:
                 self._search_count = view.get_total_count()
+            self._search_contacts_capped = getattr(view, "search_contacts_capped", False)
             return page
 
+        def get_paginated_response(self, data):
+            response = super().get_paginated_response(data)
+            if self._search_contacts_capped:
+                response.data["contacts_capped"] = True
+            return response
+
     # A search is restricted to messages from the last 90 days so an unbounded `text__icontains` scan (compounded by
     # the SearchCountMixin COUNT(*)) can't be triggered by a session-authenticated client.
     SEARCH_WINDOW = timedelta(days=90)
 
+    # trigram indexes can't be used for shorter searches which would then scan every message in the window
+    search_min_length = 3
+
+    # max number of contacts matched by name that a search will include the messages of, beyond which the response
+    # carries `contacts_capped` so the UI can say that not all matches are shown
+    SEARCH_MAX_CONTACTS = 1_000
+
     FOLDERS = {
         "inbox": MsgFolder.INBOX,
         "handled": MsgFolder.HANDLED,
@@ -195,9 +214,20 @@ class MessagesEndpoint(SearchLengthMixin, ListAPIMixin, BaseEndpoint):
     def filter_queryset(self, queryset):
         search = self.request.query_params.get("search")
         if search:
+            # Text matches are served by the msgs_text_search trigram index. Contacts matched by name (via the
+            # contacts_name_search trigram index) are resolved up front to a list of ids, because Postgres can't use
+            # an index for an IN subquery inside an OR. With a list, the OR is a BitmapOr of msgs_text_search and
+            # msgs_by_contact rather than a check of every message in the window.
+            contact_ids = list(
+                Contact.objects.filter(org=self.request.org, is_active=True, name__icontains=search).values_list(
+                    "id", flat=True
+                )[: self.SEARCH_MAX_CONTACTS + 1]
+            )
+            self.search_contacts_capped = len(contact_ids) > self.SEARCH_MAX_CONTACTS
+
             queryset = queryset.filter(
                 Q(created_on__gte=timezone.now() - self.SEARCH_WINDOW)
-                & (Q(text__icontains=search) | Q(contact__name__icontains=search))
+                & (Q(text__icontains=search) | Q(contact_id__in=contact_ids[: self.SEARCH_MAX_CONTACTS]))
             )
 
         return queryset
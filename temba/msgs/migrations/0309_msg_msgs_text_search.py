@@ -0,0 +1,39 @@
+# Generated by Django 6.1 on 2026-10-18 10:12
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.migrations.operations.models import AddIndex
+
+
+class AddIndexConcurrentlyPlainReverse(AddIndexConcurrently):
+    """
+    Adds the index concurrently but reverses with a plain drop, so that migration tests - which roll the graph
+    backwards inside a transaction - can unapply it.
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("contacts", "0219_contact_contacts_name_search"),  # creates the pg_trgm extension
+        ("msgs", "0308_remove_optin_unique_optin_names_remove_msg_optin_and_more"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyPlainReverse(
+            model_name="msg",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("text"), name="gin_trgm_ops"
+                ),
+                condition=models.Q(("visibility__in", ("V", "A"))),
+                name="msgs_text_search",
+            ),
+        ),
+    ]
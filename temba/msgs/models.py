@@ -13,10 +13,11 @@ import iso8601
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.files.storage import default_storage
 from django.db import models
 from django.db.models import Prefetch, Q, Sum
-from django.db.models.functions import Lower
+from django.db.models.functions import Lower, Upper
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -29,7 +30,7 @@ from temba.schedules.models import Schedule
 from temba.utils import languages, on_transaction_commit
 from temba.utils.export.models import MultiSheetExporter
 from temba.utils.models import LegacyIDMixin, TembaModel
-from temba.utils.models.counts import BaseSquashableCount
+from temba.utils.models.counts import BaseSquashableCount, CountsCache
 from temba.utils.s3 import public_file_storage
 from temba.utils.uuid import uuid4
 
@@ -757,21 +758,46 @@ class Msg(models.Model):
         for msg in msgs:
             msg.archive()
 
+        cls._invalidate_counts(msgs)
+
     @classmethod
     def apply_action_restore(cls, user, msgs):
         for msg in msgs:
             msg.restore()
 
+        cls._invalidate_counts(msgs)
+
     @classmethod
     def apply_action_delete(cls, user, msgs):
         if msgs := list(msgs):
             cls.bulk_soft_delete(msgs[0].org, user, msgs)
 
+        cls._invalidate_counts(msgs)
+
     @classmethod
     def apply_action_resend(cls, user, msgs):
         if msgs := list(msgs):
             mailroom.get_client().msg_resend(msgs[0].org, user, msgs)
 
+    @classmethod
+    def _invalidate_counts(cls, msgs):
+        """
+        Invalidates cached folder and label counts which may have been changed by an action on the given messages
+        """
+        for org_id in {m.org_id for m in msgs}:
+            folder_counts_cache.invalidate(org_id)
+            LabelCount.totals_cache.invalidate(org_id)
+
+    @classmethod
+    def invalidate_history(cls, contact_ids):
+        """
+        Invalidates cached history pages of the given contacts which may have stale deletion or status tags
+        """
+        from temba.mailroom.events import Event
+
+        for contact in Contact.objects.filter(id__in=contact_ids).only("id", "uuid"):
+            Event._invalidate_history_cache(contact)
+
     @classmethod
     def bulk_soft_delete(cls, org, user, msgs: list):
         """
@@ -789,6 +815,9 @@ class Msg(models.Model):
 
         mailroom.get_client().msg_delete(org, user, list(msgs))
 
+        # mailroom tags the deleted messages' events so any cached pages of their contacts' history are now stale
+        cls.invalidate_history({m.contact_id for m in msgs})
+
     @classmethod
     def bulk_delete(cls, msgs: list):
         """
@@ -813,6 +842,12 @@ class Msg(models.Model):
             # used by API messages endpoint hence the ordering, and general fetching by org or contact
             models.Index(name="msgs_by_org", fields=["org", "-created_on", "-id"]),
             models.Index(name="msgs_by_contact", fields=["contact", "-created_on", "-id"]),
+            # used for substring searches of message text (icontains queries compare uppercased values)
+            GinIndex(
+                OpClass(Upper("text"), name="gin_trgm_ops"),
+                name="msgs_text_search",
+                condition=Q(visibility__in=("V", "A")),
+            ),
             # used for finding errored messages to retry
             models.Index(
                 name="msgs_outgoing_to_retry",
@@ -985,7 +1020,8 @@ class MsgFolder(Enum):
 
     @classmethod
     def get_counts(cls, org) -> dict:
-        counts = org.counts.prefix("msgs:folder:").scope_totals()
+        scopes = [folder._count_scope for folder in cls] + ["msgs:folder:E", "msgs:folder:C"]
+        counts = folder_counts_cache.get(org.id, scopes, lambda s: org.counts.filter(scope__in=s).scope_totals())
         by_folder = {folder: counts.get(folder._count_scope, 0) for folder in cls}
 
         # TODO stuff counts for scheduled broadcasts and calls until we figure out what to do with them
@@ -998,6 +1034,10 @@ class MsgFolder(Enum):
         return f"<MsgFolder.{self.name} code={self.code}>"
 
 
+# MsgFolder is an enum so its cache of counts lives outside of it
+folder_counts_cache = CountsCache("folders")
+
+
 class Label(TembaModel, DependencyMixin):
     """
     Labels represent both user defined labels and folders of labels. User defined labels that can be applied to messages
@@ -1056,6 +1096,9 @@ class Label(TembaModel, DependencyMixin):
         # update modified on all our changed msgs
         Msg.objects.filter(id__in=changed).update(modified_on=timezone.now())
 
+        if changed:
+            LabelCount.totals_cache.invalidate(self.org_id)
+
         return changed
 
     def release(self, user):
@@ -1065,6 +1108,7 @@ class Label(TembaModel, DependencyMixin):
         Msg.labels.through.objects.filter(label=self).delete()
 
         self.counts.all().delete()
+        LabelCount.totals_cache.invalidate(self.org_id)
 
         self.name = self._deleted_name()
         self.is_active = False
@@ -1084,6 +1128,7 @@ class LabelCount(BaseSquashableCount):
     """
 
     squash_over = ("label_id", "is_archived")
+    totals_cache = CountsCache("labels")
 
     label = models.ForeignKey(Label, on_delete=models.PROTECT, related_name="counts")
     is_archived = models.BooleanField(default=False)
@@ -1093,12 +1138,19 @@ class LabelCount(BaseSquashableCount):
         """
         Gets total counts for all the given labels
         """
-        counts = (
-            cls.objects.filter(label__in=labels, is_archived=False)
-            .values_list("label_id")
-            .annotate(count_sum=Sum("count"))
-        )
-        counts_by_label_id = {c[0]: c[1] for c in counts}
+
+        def fetch(label_ids: list) -> dict:
+            counts = (
+                cls.objects.filter(label_id__in=label_ids, is_archived=False)
+                .values_list("label_id")
+                .annotate(count_sum=Sum("count"))
+            )
+            return {c[0]: c[1] for c in counts}
+
+        counts_by_label_id = {}
+        for org_id, org_labels in itertools.groupby(sorted(labels, key=lambda lb: lb.org_id), lambda lb: lb.org_id):
+            counts_by_label_id.update(cls.totals_cache.get(org_id, [lb.id for lb in org_labels], fetch))
+
         return {lb: counts_by_label_id.get(lb.id, 0) for lb in labels}
 
 
@@ -1148,7 +1200,18 @@ class MessageExport(ExportType):
     download_template = "msgs/export_download.html"
 
     @classmethod
-    def create(cls, org, user, start_date, end_date, folder=None, label=None, with_fields=(), with_groups=()):
+    def create(
+        cls,
+        org,
+        user,
+        start_date,
+        end_date,
+        folder=None,
+        label=None,
+        with_fields=(),
+        with_groups=(),
+        format=MultiSheetExporter.FORMAT_XLSX,
+    ):
         export = Export.objects.create(
             org=org,
             export_type=cls.slug,
@@ -1159,6 +1222,7 @@ class MessageExport(ExportType):
                 "label_uuid": str(label.uuid) if label else None,
                 "with_fields": [f.id for f in with_fields],
                 "with_groups": [g.id for g in with_groups],
+                "format": format,
             },
             created_by=user,
         )
@@ -1185,6 +1249,7 @@ class MessageExport(ExportType):
             + export.get_contact_headers()
             + ["Flow", "Direction", "Text", "Attachments", "Status", "Channel", "Labels"],
             export.org.timezone,
+            format=export.format,
         )
         num_records = 0
         logger.info(f"starting msgs export #{export.id} for org #{export.org.id}")
@@ -1212,7 +1277,9 @@ class MessageExport(ExportType):
         else:
             where = {"visibility": "visible"}
 
-        records = Archive.iter_all_records(export.org, Archive.TYPE_MSG, start_date, end_date, where=where)
+        records = Archive.iter_all_records(
+            export.org, Archive.TYPE_MSG, start_date, end_date, where=where, prefetch=Archive.PREFETCH_ARCHIVES
+        )
         last_created_on = None
 
         for record_batch in itertools.batched(records, 1000):
@@ -25,15 +25,17 @@ def fail_old_android_messages():
         is_android=True,
         status__in=(Msg.STATUS_INITIALIZING, Msg.STATUS_QUEUED, Msg.STATUS_ERRORED),
     )
+    contact_ids = set(too_old.values_list("contact_id", flat=True))
     num_failed = too_old.update(status=Msg.STATUS_FAILED, failed_reason=Msg.FAILED_TOO_OLD, modified_on=timezone.now())
 
+    Msg.invalidate_history(contact_ids)
+
     return {"failed": num_failed}
 
 
 @cron_task(lock_timeout=7200)
 def squash_msg_counts():
-    LabelCount.squash()
-    BroadcastMsgCount.squash()
+    return {"LabelCount": LabelCount.squash(), "BroadcastMsgCount": BroadcastMsgCount.squash()}
 
 
 @shared_task
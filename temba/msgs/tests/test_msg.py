@@ -119,13 +119,17 @@ class MsgTest(TembaTest, CRUDLTestMixin):
         with self.assertRaises(AssertionError):
             Msg.bulk_soft_delete(self.org, self.admin, [out1])
 
-        Msg.bulk_soft_delete(self.org, self.admin, [msg1, msg2])
+        with patch("temba.mailroom.events.Event._invalidate_history_cache") as mock_invalidate:
+            Msg.bulk_soft_delete(self.org, self.admin, [msg1, msg2])
 
         mock_storage_delete.assert_any_call("/attachments/1/a/b.jpg")
         mock_storage_delete.assert_any_call("/attachments/1/c/d e.jpg")
 
         self.assertEqual([call(self.org, self.admin, [msg1, msg2])], mr_mocks.calls["msg_delete"])
 
+        # cached history of both contacts is invalidated
+        self.assertEqual({self.joe, self.frank}, {c.args[0] for c in mock_invalidate.call_args_list})
+
     @patch("django.core.files.storage.default_storage.delete")
     def test_bulk_delete(self, mock_storage_delete):
         # create some messages
@@ -215,7 +219,13 @@ class MsgTest(TembaTest, CRUDLTestMixin):
             self.joe, "Hello", status=Msg.STATUS_SENT, created_on=timezone.now() - timedelta(days=8)
         )
 
-        fail_old_android_messages()
+        msg5 = self.create_outgoing_msg(self.frank, "Hello", status=Msg.STATUS_SENT)
+
+        with patch("temba.mailroom.events.Event._invalidate_history_cache") as mock_invalidate:
+            fail_old_android_messages()
+
+        # only Joe has messages which were failed so only his cached history is invalidated
+        self.assertEqual([call(self.joe)], mock_invalidate.call_args_list)
 
         def assert_status(msg, status):
             msg.refresh_from_db()
@@ -225,6 +235,7 @@ class MsgTest(TembaTest, CRUDLTestMixin):
         assert_status(msg2, Msg.STATUS_FAILED)
         assert_status(msg3, Msg.STATUS_FAILED)
         assert_status(msg4, Msg.STATUS_SENT)
+        assert_status(msg5, Msg.STATUS_SENT)
 
     def test_big_ids(self):
         # create an incoming message with big id
@@ -663,6 +663,7 @@ class MsgCRUDL(SmartCRUDL):
                 label=label,
                 with_fields=with_fields,
                 with_groups=with_groups,
+                format=form.cleaned_data["format"],
             )
 
     class LegacyInbox(RedirectView):
@@ -0,0 +1,21 @@
+# Generated by Django 6.1 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0035_squashed"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="email_status",
+            field=models.CharField(
+                choices=[("P", "Pending"), ("S", "Sent"), ("E", "Errored"), ("N", "None"), ("U", "Unverified")],
+                default="N",
+                max_length=1,
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 import logging
+import smtplib
 from abc import abstractmethod
+from collections import defaultdict
 
 from django.conf import settings
 from django.db import models, transaction
@@ -157,15 +159,23 @@ class Notification(models.Model):
 
     EMAIL_STATUS_PENDING = "P"
     EMAIL_STATUS_SENT = "S"
+    EMAIL_STATUS_ERRORED = "E"
     EMAIL_STATUS_NONE = "N"
     EMAIL_STATUS_UNVERIFIED = "U"
     EMAIL_STATUS_CHOICES = (
         (EMAIL_STATUS_PENDING, "Pending"),
         (EMAIL_STATUS_SENT, "Sent"),
+        (EMAIL_STATUS_ERRORED, "Errored"),
         (EMAIL_STATUS_NONE, "None"),
         (EMAIL_STATUS_UNVERIFIED, "Unverified"),
     )
 
+    EMAIL_BATCH_SIZE = 100  # pending emails fetched and sent per batch
+    EMAIL_MAX_PER_RUN = 2000  # max pending emails sent per run of the sending task
+
+    # errors which mean we've lost the connection, rather than that a particular email can't be sent
+    EMAIL_CONNECTION_ERRORS = (ConnectionError, TimeoutError, smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected)
+
     id = models.BigAutoField(primary_key=True)
     org = models.ForeignKey(Org, on_delete=models.PROTECT, related_name="notifications")
     notification_type = models.CharField(max_length=32)
@@ -242,20 +252,58 @@ class Notification(models.Model):
         except Exception:
             logger.exception("error publishing notifications to mailroom")
 
-    def send_email(self):
+    @classmethod
+    def send_emails(cls, notifications) -> tuple[int, int]:
+        """
+        Sends emails for the given pending notifications, using one sender and connection for each branding, and
+        updates their email statuses after each branding. Notifications whose email can't be sent are marked as
+        errored so they don't block the queue, but if a branding's connection can't be opened (e.g. bad credentials or
+        host) or fails, the rest of that branding's notifications are left pending to be retried and we move on to the
+        next branding. Returns the number sent and the number which errored, which doesn't include those left pending.
+        """
+        by_sender = defaultdict(list)
+        for notification in notifications:
+            branding = notification.org.branding
+            by_sender[(branding["name"], branding.get("emails", {}).get("notifications"))].append(notification)
+
+        num_sent, num_errored = 0, 0
+
+        for batch in by_sender.values():
+            sender = EmailSender.from_email_type(batch[0].org.branding, "notifications")
+            sent_ids, errored_ids = [], []
+
+            try:
+                with sender.open():
+                    for notification in batch:
+                        try:
+                            notification._send_email(sender)
+                            sent_ids.append(notification.id)
+                        except cls.EMAIL_CONNECTION_ERRORS:
+                            raise
+                        except Exception:
+                            logger.error("error sending notification email", exc_info=True)
+                            errored_ids.append(notification.id)
+            except Exception:
+                logger.error("error connecting to send notification emails", exc_info=True)
+            finally:
+                cls.objects.filter(id__in=sent_ids).update(email_status=cls.EMAIL_STATUS_SENT)
+                cls.objects.filter(id__in=errored_ids).update(email_status=cls.EMAIL_STATUS_ERRORED)
+
+            num_sent += len(sent_ids)
+            num_errored += len(errored_ids)
+
+        return num_sent, num_errored
+
+    def _send_email(self, sender):
         subject = self.type.get_email_subject(self)
         template = self.type.get_email_template(self)
-        context = self.type.get_email_context(self, self.org.branding)
 
         if subject and template:
-            sender = EmailSender.from_email_type(self.org.branding, "notifications")
+            context = self.type.get_email_context(self, self.org.branding)
             sender.send([self.email_address or self.user.email], template, context, f"[{self.org.name}] {subject}")
         else:  # pragma: no cover
             logger.error(f"pending emails for notification type {self.type.slug} not configured for email")
 
-        self.email_status = Notification.EMAIL_STATUS_SENT
-        self.save(update_fields=("email_status",))
-
     def get_target_url(self) -> str:
         return self.type.get_target_url(self)
 
@@ -1,10 +1,11 @@
 import logging
 
 from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 
 from temba.utils.crons import cron_task
-from temba.utils.models import delete_in_batches
+from temba.utils.models import delete_by_keyset
 
 from .models import Notification
 
@@ -13,21 +14,33 @@ logger = logging.getLogger(__name__)
 
 @cron_task(lock_timeout=1800)
 def send_notification_emails():
-    pending = list(
+    pending = (
         Notification.objects.filter(email_status=Notification.EMAIL_STATUS_PENDING)
         .select_related("org", "user")
-        .order_by("created_on")
+        .order_by("created_on", "id")
     )
 
     num_sent, num_errored = 0, 0
+    last = None
 
-    for notification in pending:
-        try:
-            notification.send_email()
-            num_sent += 1
-        except Exception:  # pragma: no cover
-            logger.error("error sending notification email", exc_info=True)
-            num_errored += 1
+    # send in batches, paging by created_on + id so that notifications which error aren't retried in the same run
+    while num_sent + num_errored < Notification.EMAIL_MAX_PER_RUN:
+        batch = pending
+        if last:
+            batch = batch.filter(Q(created_on__gt=last.created_on) | Q(created_on=last.created_on, id__gt=last.id))
+
+        batch_size = min(Notification.EMAIL_BATCH_SIZE, Notification.EMAIL_MAX_PER_RUN - num_sent - num_errored)
+        batch = list(batch[:batch_size])
+        if not batch:
+            break
+
+        batch_sent, batch_errored = Notification.send_emails(batch)
+        num_sent += batch_sent
+        num_errored += batch_errored
+        last = batch[-1]
+
+        if len(batch) < batch_size:
+            break
 
     return {"sent": num_sent, "errored": num_errored}
 
@@ -36,6 +49,4 @@ def send_notification_emails():
 def trim_notifications():
     trim_before = timezone.now() - settings.RETENTION_PERIODS["notification"]
 
-    num_deleted = delete_in_batches(Notification.objects.filter(created_on__lt=trim_before))
-
-    return {"deleted": num_deleted}
+    return delete_by_keyset(Notification.objects.filter(created_on__lt=trim_before))
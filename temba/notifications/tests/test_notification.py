@@ -1,7 +1,12 @@
+import smtplib
+import socketserver
+import threading
 from datetime import date, timedelta
-from unittest.mock import call
+from unittest.mock import call, patch
 
+from django.conf import settings
 from django.core import mail
+from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -16,10 +21,11 @@ from temba.notifications.incidents.builtin import (
 from temba.notifications.models import Notification
 from temba.notifications.tasks import send_notification_emails, trim_notifications
 from temba.notifications.types.builtin import ExportFinishedNotificationType, InvitationAcceptedNotificationType
-from temba.orgs.models import Invitation, ItemCount, OrgRole
+from temba.orgs.models import Invitation, ItemCount, Org, OrgRole
 from temba.tests import TembaTest, matchers
 from temba.tests.mailroom import mock_mailroom
 from temba.tickets.models import TicketExport
+from temba.utils.email import EmailSender
 
 
 class NotificationTest(TembaTest):
@@ -491,6 +497,120 @@ class NotificationTest(TembaTest):
         self.assertEqual(2, self.admin.notifications.filter(is_seen=False).count())
         self.assertEqual(0, self.admin.notifications.filter(is_seen=True).count())
 
+    def test_send_emails_in_batches(self):
+        exports = []
+        for i in range(5):
+            export = ContactExport.create(self.org, self.editor)
+            ExportFinishedNotificationType.create(export)
+            exports.append(export)
+
+        sink = SMTPSink()
+        self.addCleanup(sink.stop)
+
+        with (
+            override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST="127.0.0.1",
+                EMAIL_PORT=sink.port,
+                EMAIL_HOST_USER="",
+                EMAIL_HOST_PASSWORD="",
+                EMAIL_USE_TLS=False,
+            ),
+            patch("temba.notifications.models.Notification.EMAIL_BATCH_SIZE", 2),
+            patch("temba.notifications.models.Notification.EMAIL_MAX_PER_RUN", 3),
+        ):
+            # first run is limited to 3 emails, sent in batches of 2 and 1, each over a single connection
+            self.assertEqual({"sent": 3, "errored": 0}, send_notification_emails())
+            self.assertEqual(3, len(sink.messages))
+            self.assertEqual(2, sink.num_connections)
+            self.assertEqual(
+                3, Notification.objects.filter(export__in=exports, email_status=Notification.EMAIL_STATUS_SENT).count()
+            )
+
+            # second run sends the rest
+            self.assertEqual({"sent": 2, "errored": 0}, send_notification_emails())
+            self.assertEqual(5, len(sink.messages))
+            self.assertEqual(3, sink.num_connections)
+            self.assertEqual(
+                5, Notification.objects.filter(export__in=exports, email_status=Notification.EMAIL_STATUS_SENT).count()
+            )
+
+            self.assertEqual({"sent": 0, "errored": 0}, send_notification_emails())
+            self.assertEqual(3, sink.num_connections)
+
+        self.assertIn(b"Subject: [Nyaruka] Your contact export is ready", sink.messages[0])
+        self.assertIn(b"To: editor@textit.com", sink.messages[0])
+
+    def test_send_emails_with_errors(self):
+        exports = []
+        for i in range(3):
+            export = ContactExport.create(self.org, self.editor)
+            ExportFinishedNotificationType.create(export)
+            exports.append(export)
+
+        def get_statuses():
+            return [n.email_status for n in Notification.objects.filter(export__in=exports).order_by("id")]
+
+        real_send_email = Notification._send_email
+
+        # an email which can't be sent is marked as errored so it doesn't stay at the head of the queue
+        def send_email(notification, sender):
+            if notification.export == exports[1]:
+                raise ValueError("boom")
+            return real_send_email(notification, sender)
+
+        with patch.object(Notification, "_send_email", autospec=True, side_effect=send_email):
+            with self.assertLogs("temba.notifications.models", level="ERROR"):
+                self.assertEqual({"sent": 2, "errored": 1}, send_notification_emails())
+
+        self.assertEqual(["S", "E", "S"], get_statuses())
+        self.assertEqual(2, len(mail.outbox))
+
+        # but if we lose the connection, notifications already sent are marked as sent and the rest are left pending
+        Notification.objects.filter(export__in=exports).update(email_status=Notification.EMAIL_STATUS_PENDING)
+
+        def send_email(notification, sender):
+            if notification.export == exports[1]:
+                raise smtplib.SMTPServerDisconnected("gone")
+            return real_send_email(notification, sender)
+
+        with patch.object(Notification, "_send_email", autospec=True, side_effect=send_email):
+            with self.assertLogs("temba.notifications.models", level="ERROR"):
+                self.assertEqual({"sent": 1, "errored": 0}, send_notification_emails())
+
+        self.assertEqual(["S", "P", "P"], get_statuses())
+        self.assertEqual(3, len(mail.outbox))
+
+        self.assertEqual({"sent": 2, "errored": 0}, send_notification_emails())
+        self.assertEqual(["S", "S", "S"], get_statuses())
+
+    def test_send_emails_with_bad_connection(self):
+        # an export in another org with its own branding, whose SMTP credentials are wrong
+        other_export = ContactExport.create(self.org2, self.admin2)
+        ExportFinishedNotificationType.create(other_export)
+        export = ContactExport.create(self.org, self.editor)
+        ExportFinishedNotificationType.create(export)
+
+        def get_brand(org):
+            return {**settings.BRAND, "name": "Other"} if org.id == self.org2.id else settings.BRAND
+
+        real_open = EmailSender.open
+
+        def open_sender(sender):
+            if sender.branding["name"] == "Other":
+                raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+            return real_open(sender)
+
+        # the other branding's notifications are left pending and we move on to the next branding
+        with patch.object(Org, "get_brand", autospec=True, side_effect=get_brand):
+            with patch.object(EmailSender, "open", autospec=True, side_effect=open_sender):
+                with self.assertLogs("temba.notifications.models", level="ERROR"):
+                    self.assertEqual({"sent": 1, "errored": 0}, send_notification_emails())
+
+        self.assertEqual(Notification.EMAIL_STATUS_PENDING, Notification.objects.get(export=other_export).email_status)
+        self.assertEqual(Notification.EMAIL_STATUS_SENT, Notification.objects.get(export=export).email_status)
+        self.assertEqual(1, len(mail.outbox))
+
     def test_counts(self):
         imp = ContactImport.objects.create(
             org=self.org, mappings={}, num_records=5, created_by=self.editor, modified_by=self.editor
@@ -559,3 +679,44 @@ class NotificationTest(TembaTest):
 
         self.assertFalse(Notification.objects.filter(id=notification1.id).exists())
         self.assertTrue(Notification.objects.filter(id=notification2.id).exists())
+
+
+class SMTPSink:
+    """
+    Minimal local SMTP server which accepts and records all messages.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.server.sink.num_connections += 1
+            self.wfile.write(b"220 sink\r\n")
+
+            while line := self.rfile.readline():
+                command = line.strip().upper()
+                if command == b"DATA":
+                    self.wfile.write(b"354 go ahead\r\n")
+                    data = []
+                    while (line := self.rfile.readline()) not in (b".\r\n", b""):
+                        data.append(line)
+                    self.server.sink.messages.append(b"".join(data))
+                    self.wfile.write(b"250 ok\r\n")
+                elif command == b"QUIT":
+                    self.wfile.write(b"221 bye\r\n")
+                    return
+                else:
+                    self.wfile.write(b"250 ok\r\n")
+
+    def __init__(self):
+        self.messages = []
+        self.num_connections = 0
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self.Handler)
+        self.server.daemon_threads = True
+        self.server.sink = self
+        self.port = self.server.server_address[1]
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,6 +1,7 @@
 import itertools
 import logging
 import os
+import time
 from abc import ABCMeta
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -35,9 +36,10 @@ from temba import mailroom
 from temba.archives.models import Archive
 from temba.locations.models import AdminBoundary
 from temba.users.models import User
-from temba.utils import json, languages, on_transaction_commit
+from temba.utils import dynamo, json, languages, on_transaction_commit
 from temba.utils.dates import datetime_to_str
 from temba.utils.email import EmailSender
+from temba.utils.export import MultiSheetExporter
 from temba.utils.models import LegacyIDMixin, TembaUUIDMixin, delete_in_batches
 from temba.utils.models.counts import BaseDailyCount, BaseScopedCount
 from temba.utils.text import generate_secret
@@ -233,6 +235,7 @@ class Org(LegacyIDMixin, SmartModel):
     CONFIG_TWILIO_TOKEN = "ACCOUNT_TOKEN"
     CONFIG_VONAGE_KEY = "NEXMO_KEY"
     CONFIG_VONAGE_SECRET = "NEXMO_SECRET"
+    CONFIG_DELETION_STEPS = "deletion_steps"
 
     EARLIEST_IMPORT_VERSION = "3"
     CURRENT_EXPORT_VERSION = "13"
@@ -268,6 +271,7 @@ class Org(LegacyIDMixin, SmartModel):
     LIMIT_TRIGGERS = "triggers"
 
     DELETE_DELAY_DAYS = 7  # how many days after releasing that an org is deleted
+    DELETE_BATCH_SIZE = 1000  # how many contacts or messages are deleted per batch when deleting an org
     OUTBOX_WARNING_THRESHOLD = 10_000
 
     BLOCKER_SUSPENDED = _(
@@ -946,7 +950,6 @@ class Org(LegacyIDMixin, SmartModel):
         Generates a dict of all exportable flows and campaigns for this org with each object's immediate dependencies
         """
         from temba.campaigns.models import Campaign, CampaignEvent
-        from temba.contacts.models import ContactField, ContactGroup
         from temba.flows.models import Flow
 
         campaign_prefetches = (
@@ -971,29 +974,35 @@ class Org(LegacyIDMixin, SmartModel):
             all_flows = all_flows.filter(is_archived=False)
             all_campaigns = all_campaigns.filter(is_archived=False)
 
-        # build dependency graph for all flows and campaigns
-        dependencies = defaultdict(set)
-        for flow in all_flows:
-            dependencies[flow] = flow.get_export_dependencies()
+        # build dependency graph for all flows and campaigns from the flow dependency tables which are maintained by
+        # Flow.update_dependencies, rather than loading the dependencies of each flow separately
+        flows_by_id = {f.id: f for f in all_flows}
+        dependencies = defaultdict(set, {f: set() for f in flows_by_id.values()})
+
+        flow_deps = Flow.flow_dependencies.through.objects.filter(from_flow_id__in=flows_by_id.keys())
+        flow_deps = list(flow_deps.values_list("from_flow_id", "to_flow_id"))
+        group_deps = Flow.group_dependencies.through.objects.filter(flow_id__in=flows_by_id.keys())
+        group_deps = list(group_deps.values_list("flow_id", "contactgroup_id"))
+
+        # dependencies can include flows that aren't exportable themselves, e.g. archived flows
+        missing_ids = {to_id for _, to_id in flow_deps if to_id not in flows_by_id}
+        if missing_ids:
+            flows_by_id.update(Flow.objects.in_bulk(missing_ids))
+
+        for from_id, to_id in flow_deps:
+            dependencies[flows_by_id[from_id]].add(flows_by_id[to_id])
         for campaign in all_campaigns:
             dependencies[campaign] = set([e.flow for e in campaign.flow_events])
 
-        # replace any dependency on a group with that group's associated campaigns - we're not actually interested
-        # in flow-group-flow relationships - only relationships that go through a campaign
-        campaigns_by_group = defaultdict(list)
+        # add each flow's dependencies on groups as dependencies on that group's associated campaigns - we're not
+        # actually interested in flow-group-flow relationships - only relationships that go through a campaign
         if include_campaigns:
+            campaigns_by_group = defaultdict(list)
             for campaign in self.campaigns.filter(is_active=True).select_related("group"):
-                campaigns_by_group[campaign.group].append(campaign)
-
-        for c, deps in dependencies.items():
-            if isinstance(c, Flow):
-                for d in list(deps):
-                    # not interested in groups or fields for now
-                    if isinstance(d, ContactField):
-                        deps.remove(d)
-                    if isinstance(d, ContactGroup):
-                        deps.remove(d)
-                        deps.update(campaigns_by_group[d])
+                campaigns_by_group[campaign.group_id].append(campaign)
+
+            for flow_id, group_id in group_deps:
+                dependencies[flows_by_id[flow_id]].update(campaigns_by_group[group_id])
 
         if include_triggers:
             all_triggers = self.triggers.filter(is_archived=False, is_active=True).select_related("flow")
@@ -1017,23 +1026,15 @@ class Org(LegacyIDMixin, SmartModel):
             include_campaigns=include_campaigns, include_triggers=include_triggers, include_archived=include_archived
         )
 
-        primary_components = set(itertools.chain(flows, campaigns))
+        # walk the graph iteratively as chains of dependencies can be longer than the recursion limit
         all_components = set()
+        to_visit = list(itertools.chain(flows, campaigns))
 
-        def add_component(c):
-            if c in all_components:
-                return
-
-            all_components.add(c)
-            if c in primary_components:
-                primary_components.remove(c)
-
-            for d in dependencies[c]:
-                add_component(d)
-
-        while primary_components:
-            component = next(iter(primary_components))
-            add_component(component)
+        while to_visit:
+            component = to_visit.pop()
+            if component not in all_components:
+                all_components.add(component)
+                to_visit.extend(dependencies[component])
 
         return all_components
 
@@ -1091,127 +1092,166 @@ class Org(LegacyIDMixin, SmartModel):
 
     def delete(self) -> dict:
         """
-        Does an actual delete of this org, returning counts of what was deleted.
+        Does an actual delete of this org, returning counts of what was deleted. Deletion is done as an ordered list of
+        steps which each delete everything of a kind, and completed steps are checkpointed in the org's config so that
+        if deletion is interrupted, it can be resumed from the step where it stopped.
         """
 
-        from temba.msgs.models import Msg
-
         assert not self.is_active and self.released_on, "can't delete org which hasn't been released"
         assert self.released_on < timezone.now() - timedelta(days=7), "can't delete org which was released recently"
         assert not self.deleted_on, "can't delete org twice"
 
-        user = self.modified_by
         counts = defaultdict(int)
+        completed = self.config.get(self.CONFIG_DELETION_STEPS, [])
 
-        delete_in_batches(self.notifications.all())
-        delete_in_batches(self.incidents.all())
-        delete_in_batches(self.invitations.all())
-        delete_in_batches(self.flow_labels.all())
+        for name, step in self._get_deletion_steps(self.modified_by):
+            if name in completed:
+                continue
 
-        for exp in self.exports.all():
-            exp.delete()
+            start = time.perf_counter()
+            step_counts = step() or {}
+            elapsed = time.perf_counter() - start
 
-        for imp in self.contact_imports.all():
-            imp.delete()
+            for table, num in step_counts.items():
+                counts[table] += num
+                logger.info(f"deleted {num} {table} for org #{self.id} in {elapsed:.3f}s ({num / elapsed:.1f}/s)")
 
-        for label in self.msgs_labels.all():
-            label.release(user)
-            label.delete()
+            completed.append(name)
+            self.config[self.CONFIG_DELETION_STEPS] = completed
+            self.save(update_fields=("config",))
 
-        while True:
-            msg_batch = list(self.msgs.all()[:1000])
-            if not msg_batch:
-                break
-            Msg.bulk_delete(msg_batch)
-            counts["messages"] += len(msg_batch)
-
-        # delete all our campaigns and associated events
-        for c in self.campaigns.all():
-            c.delete()
-
-        # release flows (actual deletion occurs later after contacts and tickets are gone)
-        # we want to manually release runs so we don't fire a mailroom task to do it
-        for flow in self.flows.all():
-            flow.release(user, interrupt_sessions=False)
-
-        # delete runs and keep the count
-        counts["runs"] = delete_in_batches(self.runs.all())
-
-        # delete contact-related data
-        delete_in_batches(self.http_logs.all())
-        for kb in self.knowledge.all():
-            kb.delete()  # batched purge of chunks, items, articles, images + their storage objects
-        delete_in_batches(self.shortcuts.all())
-        delete_in_batches(self.tickets.all())
-        delete_in_batches(self.topics.all())
-        delete_in_batches(self.teams.all())
-        delete_in_batches(self.airtime_transfers.all())
-
-        # delete our contacts
-        for contact in self.contacts.all():
-            # release synchronously and don't deindex as that will happen for the whole org, or interrupt as we don't
-            # want to fire mailroom tasks for flows we've already released
-            counts_for_contact = contact.release(user, immediately=True, deindex=False, interrupt=False)
-            contact.delete()
-
-            counts.update(counts_for_contact)
-            counts["contacts"] += 1
-
-        # delete any remaining orphaned URNs
-        self.urns.all().delete()
-
-        # delete our fields
-        for field in self.fields.all():
-            field.delete()
-
-        # delete our groups
-        for group in self.groups.all():
+        # now that contacts are no longer in the database, we can start de-indexing them from search
+        mailroom.get_client().org_deindex(self)
+
+        # save when we were actually deleted
+        self.modified_on = timezone.now()
+        self.deleted_on = timezone.now()
+        self.config = {}
+        self.save()
+
+        return counts
+
+    def _get_deletion_steps(self, user) -> list:
+        """
+        Gets the steps of deleting this org in the order they must be run, as tuples of name and a function which does
+        the deletion and returns counts of what was deleted by table.
+        """
+
+        def batched(name, qs, **kwargs):
+            return name, lambda: {name: delete_in_batches(qs, **kwargs)}
+
+        def each(name, objs, func):
+            def step():
+                for obj in objs:
+                    func(obj)
+
+            return name, step
+
+        def release_and_delete(obj):
+            obj.release(user)
+            obj.delete()
+
+        def release_and_delete_group(group):
             group.release(user, immediate=True)
             group.delete()
 
-        # delete our channels
-        for channel in self.channels.all():
-            channel.delete()
+        return [
+            batched("notifications", self.notifications.all()),
+            batched("incidents", self.incidents.all()),
+            batched("invitations", self.invitations.all()),
+            batched("flow_labels", self.flow_labels.all()),
+            each("exports", self.exports.all(), lambda e: e.delete()),
+            each("contact_imports", self.contact_imports.all(), lambda i: i.delete()),
+            each("labels", self.msgs_labels.all(), release_and_delete),
+            ("messages", self._delete_messages),
+            # delete all our campaigns and associated events
+            each("campaigns", self.campaigns.all(), lambda c: c.delete()),
+            # release flows (actual deletion occurs later after contacts and tickets are gone), manually releasing runs
+            # so we don't fire a mailroom task to do it
+            each("flow_releases", self.flows.all(), lambda f: f.release(user, interrupt_sessions=False)),
+            batched("runs", self.runs.all()),
+            # delete contact-related data
+            batched("http_logs", self.http_logs.all()),
+            each("knowledge", self.knowledge.all(), lambda k: k.delete()),
+            batched("shortcuts", self.shortcuts.all()),
+            batched("tickets", self.tickets.all()),
+            batched("topics", self.topics.all()),
+            batched("teams", self.teams.all()),
+            batched("airtime_transfers", self.airtime_transfers.all()),
+            ("contacts", self._delete_contacts),
+            # delete any remaining orphaned URNs
+            batched("urns", self.urns.all()),
+            each("fields", self.fields.all(), lambda f: f.delete()),
+            each("groups", self.groups.all(), release_and_delete_group),
+            each("channels", self.channels.all(), lambda c: c.delete()),
+            each("globals", self.globals.all(), lambda g: g.delete()),
+            each("llms", self.llms.all(), lambda m: m.delete()),
+            each("flows", self.flows.all(), lambda f: f.delete()),
+            batched("webhook_events", self.webhookevent_set.all()),
+            each("resthooks", self.resthooks.all(), release_and_delete),
+            # release our broadcasts
+            each("broadcasts", self.broadcasts.filter(parent=None), lambda b: b.delete(user, soft=False)),
+            ("archives", lambda: Archive.delete_for_org(self)),
+            # delete other related objects
+            batched("api_tokens", self.api_tokens.all(), pk="key"),
+            batched("schedules", self.schedules.all()),
+            batched("boundary_aliases", self.boundaryalias_set.all()),
+            batched("templates", self.templates.all()),
+            # needs to come after deletion of other things as those insert new negative counts
+            batched("counts", self.counts.all()),
+            batched("daily_counts", self.daily_counts.all()),
+            batched("channel_daily_rollups", self.channel_daily_rollups.all()),
+            batched("channel_monthly_rollups", self.channel_monthly_rollups.all()),
+        ]
 
-        for glob in self.globals.all():
-            glob.delete()
+    def _delete_messages(self) -> dict:
+        from temba.msgs.models import Msg
 
-        for llm in self.llms.all():
-            llm.delete()
+        num_deleted = 0
 
-        for flow in self.flows.all():
-            flow.delete()
+        while True:
+            batch = list(self.msgs.only("id", "direction", "attachments")[: self.DELETE_BATCH_SIZE])
+            if not batch:
+                break
 
-        delete_in_batches(self.webhookevent_set.all())
+            Msg.bulk_delete(batch)
+            num_deleted += len(batch)
 
-        for resthook in self.resthooks.all():
-            resthook.release(user)
-            resthook.delete()
+        return {"messages": num_deleted}
 
-        # release our broadcasts
-        for bcast in self.broadcasts.filter(parent=None):
-            bcast.delete(user, soft=False)
+    def _delete_contacts(self) -> dict:
+        """
+        Deletes all contacts and what they own, with a statement per table for each batch of contacts rather than
+        releasing them one at a time. Messages, runs and tickets have already been deleted for the whole org.
+        """
 
-        Archive.delete_for_org(self)
+        from temba.channels.models import ChannelEvent
+        from temba.contacts.models import Contact, ContactFire, ContactNote, ContactURN
+        from temba.ivr.models import Call
 
-        # delete other related objects
-        delete_in_batches(self.api_tokens.all(), pk="key")
-        delete_in_batches(self.schedules.all())
-        delete_in_batches(self.boundaryalias_set.all())
-        delete_in_batches(self.templates.all())
+        counts = defaultdict(int)
 
-        # needs to come after deletion of other things as those insert new negative counts
-        delete_in_batches(self.counts.all())
-        delete_in_batches(self.daily_counts.all())
+        while True:
+            batch = list(self.contacts.values_list("id", "uuid")[: self.DELETE_BATCH_SIZE])
+            if not batch:
+                break
 
-        # now that contacts are no longer in the database, we can start de-indexing them from search
-        mailroom.get_client().org_deindex(self)
+            contact_ids = [c[0] for c in batch]
 
-        # save when we were actually deleted
-        self.modified_on = timezone.now()
-        self.deleted_on = timezone.now()
-        self.config = {}
-        self.save()
+            for contact_id, contact_uuid in batch:
+                counts["events"] += dynamo.delete_partition(dynamo.HISTORY, f"con#{contact_uuid}")
+
+            counts["channel_events"] += ChannelEvent.objects.filter(contact_id__in=contact_ids).delete()[0]
+            counts["calls"] += Call.objects.filter(contact_id__in=contact_ids).delete()[0]
+            ContactFire.objects.filter(contact_id__in=contact_ids).delete()
+            ContactNote.objects.filter(contact_id__in=contact_ids).delete()
+
+            # nothing references these URNs anymore so they can be deleted rather than detached
+            counts["urns"] += ContactURN.objects.filter(contact_id__in=contact_ids).delete()[0]
+
+            # deleting contacts also deletes their group, broadcast, trigger and flow start memberships
+            Contact.objects.filter(id__in=contact_ids).delete()
+            counts["contacts"] += len(batch)
 
         return counts
 
@@ -1539,6 +1579,20 @@ class Export(TembaUUIDMixin, models.Model):
             org=org, export_type=export_type, status__in=(cls.STATUS_PENDING, cls.STATUS_PROCESSING)
         )
 
+    @property
+    def format(self) -> str:
+        """
+        Gets the file format this export should be written in
+        """
+        return self.config.get("format", MultiSheetExporter.FORMAT_XLSX)
+
+    @property
+    def extension(self) -> str:
+        """
+        Gets the extension of the saved file, e.g. xlsx or csv.gz
+        """
+        return "".join(Path(self.path).suffixes).removeprefix(".")
+
     def get_date_range(self) -> tuple:
         """
         Gets the since > until datetimes of items to export.
@@ -1633,9 +1687,8 @@ class Export(TembaUUIDMixin, models.Model):
         """
         Create a more user friendly filename for download
         """
-        _, extension = self.path.rsplit(".", 1)
         date_str = datetime.today().strftime(r"%Y%m%d")
-        return f"{self.type.download_prefix}_{date_str}.{extension}"
+        return f"{self.type.download_prefix}_{date_str}.{self.extension}"
 
     @property
     def notification_export_type(self):
@@ -113,5 +113,4 @@ def delete_released_orgs():
 
 @cron_task(lock_timeout=7200)
 def squash_item_counts():
-    ItemCount.squash()
-    DailyCount.squash()
+    return {"ItemCount": ItemCount.squash(), "DailyCount": DailyCount.squash()}
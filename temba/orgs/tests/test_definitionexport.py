@@ -202,6 +202,46 @@ class DefinitionExportTest(TembaTest, CRUDLTestMixin):
         self.assertEqual(dep_graph[child], {parent})
         self.assertEqual(dep_graph[parent], {child})
 
+    def test_dependency_graph(self):
+        joined = self.create_field("joined", "Joined", value_type=ContactField.TYPE_DATETIME)
+        farmers = self.create_group("Farmers", contacts=[])
+
+        # a long chain of flows, the last of which depends on a group used by a campaign
+        chain = [Flow.create(self.org, self.admin, f"Chain {i}") for i in range(20)]
+        for parent, child in zip(chain, chain[1:]):
+            parent.flow_dependencies.add(child)
+        chain[-1].group_dependencies.add(farmers)
+        chain[-1].field_dependencies.add(joined)
+
+        campaign = Campaign.create(self.org, self.admin, "Reminders", farmers)
+        reminder = Flow.create(self.org, self.admin, "Reminder")
+        CampaignEvent.create_flow_event(self.org, self.admin, campaign, joined, offset=1, unit="D", flow=reminder)
+
+        # an archived flow which is still a dependency
+        archived = Flow.create(self.org, self.admin, "Archived")
+        archived.is_archived = True
+        archived.save(update_fields=("is_archived",))
+        chain[0].flow_dependencies.add(archived)
+
+        other = Flow.create(self.org, self.admin, "Other")
+
+        graph = self.org.generate_dependency_graph()
+        self.assertEqual({chain[1], archived}, graph[chain[0]])
+        self.assertEqual({chain[18], campaign}, graph[chain[19]])
+        self.assertEqual({chain[19], reminder}, graph[campaign])
+        self.assertEqual({chain[0]}, graph[archived])
+        self.assertEqual(set(), graph[other])
+
+        # without campaigns, group dependencies are ignored
+        graph = self.org.generate_dependency_graph(include_campaigns=False)
+        self.assertEqual({chain[18]}, graph[chain[19]])
+        self.assertNotIn(campaign, graph)
+
+        # resolving walks the whole chain in both directions
+        self.assertEqual({*chain, archived, campaign, reminder}, self.org.resolve_dependencies([chain[10]], []))
+        self.assertEqual({*chain, archived}, self.org.resolve_dependencies([chain[10]], [], include_campaigns=False))
+        self.assertEqual({other}, self.org.resolve_dependencies([other], []))
+
     def test_import_dependency_types(self):
         self.import_file("test_flows/all_dependency_types.json")
 
@@ -34,3 +34,17 @@ class ExportTest(TembaTest):
 
         self.assertFalse(default_storage.exists(export1.path))
         self.assertTrue(default_storage.exists(export2.path))
+
+    def test_extension(self):
+        export = TicketExport.create(
+            self.org, self.admin, start_date=date.today() - timedelta(days=7), end_date=date.today()
+        )
+
+        export.path = "orgs/1/ticket_exports/6a3a8a93-8e2f-4b5a-9d0c-2e3c0f4b1a7e.xlsx"
+        self.assertEqual("xlsx", export.extension)
+
+        export.path = "orgs/1/ticket_exports/6a3a8a93-8e2f-4b5a-9d0c-2e3c0f4b1a7e.csv.gz"
+        self.assertEqual("csv.gz", export.extension)
+
+        export.path = "orgs/1/ticket_exports/6a3a8a93-8e2f-4b5a-9d0c-2e3c0f4b1a7e"
+        self.assertEqual("", export.extension)
@@ -13,7 +13,7 @@ from temba.ai.types.openai.type import OpenAIType
 from temba.api.models import Resthook, WebHookEvent
 from temba.archives.models import Archive
 from temba.campaigns.models import Campaign, CampaignEvent
-from temba.channels.models import SyncEvent
+from temba.channels.models import ChannelCount, SyncEvent
 from temba.contacts.models import ContactExport, ContactField, ContactFire, ContactImport, ContactImportBatch
 from temba.flows.models import FlowLabel, FlowRun, FlowSession, FlowStart, FlowStartCount, ResultsExport
 from temba.globals.models import Global
@@ -643,6 +643,11 @@ class OrgDeleteTest(TembaTest):
         add(self.create_outgoing_msg(contact=contacts[0], text="cool story", channel=channels[0]))
         add(self.create_outgoing_msg(contact=contacts[0], text="synced", channel=channels[1]))
 
+        # squash channel counts to populate the org-level rollups
+        ChannelCount.squash()
+        add(org.channel_daily_rollups.get(scope="text:in"))
+        add(org.channel_monthly_rollups.get(scope="text:out"))
+
         add(self.create_broadcast(user, {"eng": {"text": "Announcement"}}, contacts=contacts, groups=groups, org=org))
 
         scheduled = add(
@@ -899,6 +904,42 @@ class OrgDeleteTest(TembaTest):
         self.org.release(self.customer_support)
         self.assertEqual(prev_released_on, self.org.released_on)
 
+    @mock_mailroom
+    def test_delete_resumes(self, mr_mocks):
+        contact = self.create_contact("Bob", phone="+1234567890")
+        self.create_incoming_msg(contact, "Hi")
+        self.create_outgoing_msg(contact, "Hello")
+
+        self.org.release(self.customer_support)
+        Org.objects.filter(id=self.org.id).update(released_on=F("released_on") - timedelta(days=8))
+        self.org.refresh_from_db()
+
+        # simulate deletion being interrupted part way through
+        with patch("temba.orgs.models.Org._delete_contacts", side_effect=ValueError("boom")):
+            with self.assertRaises(ValueError):
+                self.org.delete()
+
+        self.org.refresh_from_db()
+        self.assertIsNone(self.org.deleted_on)
+        self.assertIn("messages", self.org.config[Org.CONFIG_DELETION_STEPS])
+        self.assertIn("airtime_transfers", self.org.config[Org.CONFIG_DELETION_STEPS])
+        self.assertNotIn("contacts", self.org.config[Org.CONFIG_DELETION_STEPS])
+        self.assertFalse(self.org.msgs.exists())
+        self.assertTrue(self.org.contacts.exists())
+
+        # resuming skips completed steps
+        with patch("temba.orgs.models.Org._delete_messages") as mock_delete_messages:
+            counts = self.org.delete()
+
+        mock_delete_messages.assert_not_called()
+        self.assertFalse(self.org.contacts.exists())
+        self.assertGreaterEqual(counts["contacts"], 1)
+        self.assertGreaterEqual(counts["urns"], 1)
+
+        self.org.refresh_from_db()
+        self.assertIsNotNone(self.org.deleted_on)
+        self.assertEqual({}, self.org.config)
+
 
 class AnonOrgTest(TembaTest):
     """
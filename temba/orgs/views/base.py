@@ -22,7 +22,8 @@ from django.utils.translation import gettext_lazy as _
 
 from temba.contacts.models import ContactField, ContactGroup
 from temba.utils import on_transaction_commit
-from temba.utils.fields import SelectMultipleWidget, TembaDateField
+from temba.utils.export import MultiSheetExporter
+from temba.utils.fields import SelectMultipleWidget, SelectWidget, TembaDateField
 from temba.utils.views.mixins import ComponentFormMixin, ContextMenuMixin, ModalFormMixin, SpaMixin
 
 from .mixins import BulkActionMixin, DependencyMixin, OrgObjPermsMixin, OrgPermsMixin
@@ -379,6 +380,16 @@ class BaseExportModal(ModalFormMixin, OrgPermsMixin, SmartFormView):
                 }
             ),
         )
+        format = forms.ChoiceField(
+            choices=(
+                (MultiSheetExporter.FORMAT_XLSX, _("Excel (.xlsx)")),
+                (MultiSheetExporter.FORMAT_CSV_GZ, _("Compressed CSV (.csv.gz)")),
+            ),
+            required=False,
+            initial=MultiSheetExporter.FORMAT_XLSX,
+            label=_("Format"),
+            widget=SelectWidget(),
+        )
 
         def __init__(self, org, *args, **kwargs):
             super().__init__(*args, **kwargs)
@@ -407,6 +418,9 @@ class BaseExportModal(ModalFormMixin, OrgPermsMixin, SmartFormView):
 
             return data
 
+        def clean_format(self):
+            return self.cleaned_data["format"] or MultiSheetExporter.FORMAT_XLSX
+
         def clean(self):
             cleaned_data = super().clean()
 
@@ -821,25 +821,20 @@ class OrgCRUDL(SmartCRUDL):
             unbucketed = set(dependencies.keys())
             buckets = []
 
-            # helper method to add a component and its dependencies to a bucket
-            def collect_component(c, bucket):
-                if c in bucket:  # pragma: no cover
-                    return
-
-                unbucketed.remove(c)
-                bucket.add(c)
-
-                for d in dependencies[c]:
-                    if d in unbucketed:
-                        collect_component(d, bucket)
-
             while unbucketed:
-                component = next(iter(unbucketed))
+                component = unbucketed.pop()
 
-                bucket = set()
+                bucket = {component}
                 buckets.append(bucket)
 
-                collect_component(component, bucket)
+                # walk the graph from this component, moving everything connected to it into the bucket
+                to_visit = [component]
+                while to_visit:
+                    for d in dependencies[to_visit.pop()]:
+                        if d in unbucketed:
+                            unbucketed.remove(d)
+                            bucket.add(d)
+                            to_visit.append(d)
 
             # collections with only one non-group component should be merged into a single "everything else" collection
             non_single_buckets = []
@@ -1811,6 +1806,6 @@ class ExportCRUDL(SmartCRUDL):
 
         def get_context_data(self, **kwargs):
             context = super().get_context_data(**kwargs)
-            context["extension"] = self.object.path.rsplit(".", 1)[1]
+            context["extension"] = self.object.extension
             context.update(**self.object.type.get_download_context(self.object))
             return context
@@ -2,7 +2,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from temba.utils.crons import cron_task
-from temba.utils.models import delete_in_batches
+from temba.utils.models import delete_by_keyset
 
 from .models import HTTPLog
 
@@ -11,6 +11,4 @@ from .models import HTTPLog
 def trim_http_logs():
     trim_before = timezone.now() - settings.RETENTION_PERIODS["httplog"]
 
-    num_deleted = delete_in_batches(HTTPLog.objects.filter(created_on__lte=trim_before))
-
-    return {"deleted": num_deleted}
+    return delete_by_keyset(HTTPLog.objects.filter(created_on__lte=trim_before))
@@ -1,10 +1,12 @@
 import calendar
 import logging
-from datetime import time, timedelta, timezone as tzone
+from datetime import datetime, time, timedelta
 
 from dateutil.relativedelta import relativedelta
 
+from django.conf import settings
 from django.contrib.humanize.templatetags.humanize import ordinal
+from django.core.cache import cache
 from django.db import models
 from django.db.models import Index, Q
 from django.utils import timezone
@@ -126,8 +128,8 @@ class Schedule(models.Model):
         """
         Projects future fires for this schedule from `next_fire` up to and including `horizon`. A
         one-off schedule returns just `next_fire` (if before the horizon); a repeating schedule
-        iterates `calculate_next_fire` to build successive occurrences while they remain inside the
-        window. A safety cap guards against pathological schedules that fail to advance.
+        takes successive occurrences from `_iter_fires` while they remain inside the window. A
+        safety cap guards against pathological schedules that fail to advance.
         """
 
         if self.next_fire is None or self.next_fire > horizon:
@@ -141,11 +143,40 @@ class Schedule(models.Model):
         # if it's ever hit we silently return the truncated list rather than erroring (no real schedule
         # repeats often enough to produce this many fires within a one-year window)
         safety_cap = 10_000
-        for _i in range(safety_cap - 1):
-            next_fire = self.calculate_next_fire(fires[-1])
-            if not next_fire or next_fire <= fires[-1] or next_fire > horizon:
+        for fire in self._iter_fires(self.next_fire):
+            if fire <= fires[-1]:
+                continue
+            if fire > horizon or len(fires) >= safety_cap:
                 break
-            fires.append(next_fire)
+            fires.append(fire)
+        return fires
+
+    def get_projected_fires(self, horizon) -> list:
+        """
+        Like project_fires but memoized in the cache, so that a schedule shared by many contacts (e.g. a broadcast to
+        a large group) is only expanded once per horizon. The key includes everything the projection depends on so
+        edits to the schedule or it firing naturally give it a new key.
+        """
+
+        if not settings.TIMELINE_CACHE_TTL:
+            return self.project_fires(horizon)
+
+        state = (
+            self.next_fire.timestamp() if self.next_fire else "",
+            self.repeat_period,
+            self.repeat_hour_of_day,
+            self.repeat_minute_of_hour,
+            self.repeat_day_of_month,
+            self.repeat_days_of_week,
+            str(self.org.timezone),
+        )
+        key = f"schedule_fires:{self.id}:{':'.join(str(s) for s in state)}:{int(horizon.timestamp())}"
+
+        fires = cache.get(key)
+        if fires is None:
+            fires = self.project_fires(horizon)
+            cache.set(key, fires, timeout=settings.TIMELINE_CACHE_TTL)
+
         return fires
 
     def calculate_next_fire(self, now):
@@ -154,58 +185,53 @@ class Schedule(models.Model):
         the next scheduled event as it will force the next date to meet the criteria in day_of_month, days_of_week etc..
         """
 
-        tz = self.org.timezone
-        hour = self.repeat_hour_of_day
-        minute = self.repeat_minute_of_hour
-
-        # start from the trigger date
-        next_fire = now.astimezone(tz)
-        next_fire = next_fire.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return next((f for f in self._iter_fires(now) if f > now), None)
 
-        # if monthly, set to the day of the month scheduled and move forward until we are in the future
-        if self.repeat_period == Schedule.REPEAT_MONTHLY:
-            while True:
-                weekday, days = calendar.monthrange(next_fire.year, next_fire.month)
-                day_of_month = min(days, self.repeat_day_of_month)
-                next_fire = next_fire.replace(day=day_of_month, hour=hour, minute=minute)
-                if next_fire > now:
-                    break
+    def _iter_fires(self, start):
+        """
+        Generates the occurrences of this repeating schedule in order, starting on the local date of `start`. Dates
+        are generated directly in the org timezone and combined with the time of day, rather than stepping through UTC
+        and converting back, so each occurrence costs a single datetime construction and occurrences near midnight
+        don't drift across DST transitions. Monthly schedules are clamped to the last day of shorter months.
+        """
 
-                next_fire = (next_fire.astimezone(tzone.utc) + relativedelta(months=1)).astimezone(tz)
+        tz = self.org.timezone
+        time_of_day = time(self.repeat_hour_of_day, self.repeat_minute_of_hour)
+        start_date = start.astimezone(tz).date()
 
-            return next_fire
+        if self.repeat_period == Schedule.REPEAT_DAILY:
+            day = start_date
+            while True:
+                yield datetime.combine(day, time_of_day, tzinfo=tz)
+                day += timedelta(days=1)
 
-        # if weekly, move forward until we're in the future and on an appropriate day of the week
         elif self.repeat_period == Schedule.REPEAT_WEEKLY:
             assert self.repeat_days_of_week != "" and self.repeat_days_of_week is not None
 
-            while next_fire <= now or self._day_of_week(next_fire) not in self.repeat_days_of_week:
-                next_fire = (
-                    (next_fire.astimezone(tzone.utc) + timedelta(days=1))
-                    .astimezone(tz)
-                    .replace(hour=hour, minute=minute)
-                )
-
-            return next_fire
+            # offsets from the start date of each matching weekday in the first week, then repeat those each week
+            offsets = sorted(
+                (self.DAYS_OF_WEEK_OFFSET.index(d) - start_date.weekday()) % 7 for d in set(self.repeat_days_of_week)
+            )
+            week = start_date
+            while True:
+                for offset in offsets:
+                    yield datetime.combine(week + timedelta(days=offset), time_of_day, tzinfo=tz)
+                week += timedelta(days=7)
 
-        elif self.repeat_period == Schedule.REPEAT_DAILY:
-            while next_fire <= now:
-                next_fire = (
-                    (next_fire.astimezone(tzone.utc) + timedelta(days=1))
-                    .astimezone(tz)
-                    .replace(hour=hour, minute=minute)
-                )
+        elif self.repeat_period == Schedule.REPEAT_MONTHLY:
+            year, month = start_date.year, start_date.month
+            while True:
+                day = min(calendar.monthrange(year, month)[1], self.repeat_day_of_month)
+                yield datetime.combine(start_date.replace(year=year, month=month, day=day), time_of_day, tzinfo=tz)
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
 
-            return next_fire
         elif self.repeat_period == Schedule.REPEAT_YEARLY:
-            while next_fire <= now:
-                next_fire = (
-                    (next_fire.astimezone(tzone.utc) + relativedelta(years=1))
-                    .astimezone(tz)
-                    .replace(hour=hour, minute=minute)
-                )
-
-            return next_fire
+            # step from the previous date rather than the start so a Feb 29th start stays on Feb 28th after the first
+            # non-leap year, same as it always has
+            day = start_date
+            while True:
+                yield datetime.combine(day, time_of_day, tzinfo=tz)
+                day += relativedelta(years=1)
 
     def get_repeat_days_display(self):
         return [Schedule.DAYS_OF_WEEK_DISPLAY[d] for d in self.repeat_days_of_week] if self.repeat_days_of_week else []
@@ -1,6 +1,10 @@
-from datetime import datetime, timezone as tzone
+import calendar
+import random
+from datetime import datetime, timedelta, timezone as tzone
 from zoneinfo import ZoneInfo
 
+from dateutil.relativedelta import relativedelta
+
 from django.conf import settings
 from django.utils import timezone
 
@@ -11,6 +15,32 @@ from temba.utils.compose import compose_deserialize_attachments
 from .models import Schedule
 
 
+def stepped_next_fire(sched, now):
+    """
+    The original implementation of Schedule.calculate_next_fire which stepped through UTC a day at a time, used as a
+    reference for the closed-form projection.
+    """
+    tz = sched.org.timezone
+    hour, minute = sched.repeat_hour_of_day, sched.repeat_minute_of_hour
+    next_fire = now.astimezone(tz).replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    if sched.repeat_period == Schedule.REPEAT_MONTHLY:
+        while True:
+            day_of_month = min(calendar.monthrange(next_fire.year, next_fire.month)[1], sched.repeat_day_of_month)
+            next_fire = next_fire.replace(day=day_of_month, hour=hour, minute=minute)
+            if next_fire > now:
+                return next_fire
+            next_fire = (next_fire.astimezone(tzone.utc) + relativedelta(months=1)).astimezone(tz)
+
+    step = relativedelta(years=1) if sched.repeat_period == Schedule.REPEAT_YEARLY else timedelta(days=1)
+    while next_fire <= now or (
+        sched.repeat_period == Schedule.REPEAT_WEEKLY
+        and Schedule._day_of_week(next_fire) not in sched.repeat_days_of_week
+    ):
+        next_fire = (next_fire.astimezone(tzone.utc) + step).astimezone(tz).replace(hour=hour, minute=minute)
+    return next_fire
+
+
 class ScheduleTest(TembaTest):
     def setUp(self):
         super().setUp()
@@ -266,3 +296,81 @@ class ScheduleTest(TembaTest):
 
         # next fire should fall at the right hour and minute
         self.assertIn("04:45:00+00:00", str(sched.next_fire))
+
+    def test_project_fires_matches_stepping(self):
+        rand = random.Random(1234)
+        zones = ["UTC", "Africa/Kigali", "America/New_York", "America/Los_Angeles", "Europe/London", "Australia/Sydney"]
+
+        # stepping through UTC misbehaves for fires within an hour of midnight on DST changes, and monthly fires whose
+        # UTC time falls in a different month, so stick to schedules where the old algorithm was well defined
+        for _ in range(500):
+            self.org.timezone = ZoneInfo(rand.choice(zones))
+            period = rand.choice(
+                [Schedule.REPEAT_DAILY, Schedule.REPEAT_WEEKLY, Schedule.REPEAT_MONTHLY, Schedule.REPEAT_YEARLY]
+            )
+            sched = Schedule(
+                org=self.org,
+                repeat_period=period,
+                repeat_hour_of_day=rand.randint(1, 22),
+                repeat_minute_of_hour=rand.choice([0, 15, 30, 59]),
+                repeat_day_of_month=rand.randint(2, 27) if period == Schedule.REPEAT_MONTHLY else None,
+                repeat_days_of_week=(
+                    "".join(rand.sample("MTWRFSU", rand.randint(1, 7))) if period == Schedule.REPEAT_WEEKLY else None
+                ),
+            )
+            now = datetime(2024, 1, 1, tzinfo=tzone.utc) + timedelta(seconds=rand.randint(0, 3 * 365 * 86400))
+            sched.next_fire = sched.calculate_next_fire(now)
+            self.assertEqual(
+                stepped_next_fire(sched, now), sched.next_fire, f"mismatch for {period} in {self.org.timezone}"
+            )
+
+            expected = [sched.next_fire]
+            while (fire := stepped_next_fire(sched, expected[-1])) <= now + timedelta(days=365):
+                expected.append(fire)
+
+            self.assertEqual(
+                expected,
+                sched.project_fires(now + timedelta(days=365)),
+                f"mismatch for {period} in {self.org.timezone}",
+            )
+
+    def test_project_fires_near_midnight_across_dst(self):
+        # daily at 00:30 on the day DST ends in New York, which used to step back onto the same day
+        self.org.timezone = ZoneInfo("America/New_York")
+        sched = Schedule(
+            org=self.org, repeat_period=Schedule.REPEAT_DAILY, repeat_hour_of_day=0, repeat_minute_of_hour=30
+        )
+        sched.next_fire = datetime(2025, 11, 2, 0, 30, tzinfo=self.org.timezone)
+
+        self.assertEqual(
+            ["2025-11-02T00:30:00-04:00", "2025-11-03T00:30:00-05:00", "2025-11-04T00:30:00-05:00"],
+            [f.isoformat() for f in sched.project_fires(datetime(2025, 11, 4, 12, 0, tzinfo=tzone.utc))],
+        )
+
+        # daily at 23:30 the day before DST starts in London, which used to skip a day
+        self.org.timezone = ZoneInfo("Europe/London")
+        sched = Schedule(
+            org=self.org, repeat_period=Schedule.REPEAT_DAILY, repeat_hour_of_day=23, repeat_minute_of_hour=30
+        )
+        sched.next_fire = datetime(2025, 3, 29, 23, 30, tzinfo=self.org.timezone)
+
+        self.assertEqual(
+            ["2025-03-29T23:30:00+00:00", "2025-03-30T23:30:00+01:00", "2025-03-31T23:30:00+01:00"],
+            [f.isoformat() for f in sched.project_fires(datetime(2025, 4, 1, tzinfo=tzone.utc))],
+        )
+
+        # monthly on the 1st at 6am in Sydney, which is the previous day in UTC and used to never advance
+        self.org.timezone = ZoneInfo("Australia/Sydney")
+        sched = Schedule(
+            org=self.org,
+            repeat_period=Schedule.REPEAT_MONTHLY,
+            repeat_hour_of_day=6,
+            repeat_minute_of_hour=0,
+            repeat_day_of_month=1,
+        )
+        sched.next_fire = sched.calculate_next_fire(datetime(2025, 6, 24, 12, 0, tzinfo=tzone.utc))
+
+        self.assertEqual(
+            ["2025-07-01T06:00:00+10:00", "2025-08-01T06:00:00+10:00", "2025-09-01T06:00:00+10:00"],
+            [f.isoformat() for f in sched.project_fires(datetime(2025, 9, 30, tzinfo=tzone.utc))],
+        )
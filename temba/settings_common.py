@@ -671,6 +671,21 @@ CACHES = {
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 SESSION_CACHE_ALIAS = "default"
 
+# how long in seconds totals from count tables are cached in valkey, zero to disable
+COUNTS_CACHE_TTL = 0 if TESTING else 30
+
+# how long in seconds pages of contact history are cached, zero to disable
+HISTORY_CACHE_TTL = 0 if TESTING else 60
+
+# how long in seconds projected contact timelines and schedule fires are cached, zero to disable
+TIMELINE_CACHE_TTL = 0 if TESTING else 300
+
+# how long in seconds flow result totals are cached, though they're also refetched whenever counts are squashed
+RESULTS_CACHE_TTL = 0 if TESTING else 300
+
+# how long in seconds display names of recent contacts shown in the flow editor and on campaign events are cached
+RECENT_CONTACTS_CACHE_TTL = 0 if TESTING else 30
+
 # -----------------------------------------------------------------------------------
 # Celery
 # -----------------------------------------------------------------------------------
@@ -868,6 +883,9 @@ NON_ISO6391_LANGUAGES = {"mul", "und"}
 
 MAILROOM_URL = None
 MAILROOM_AUTH_TOKEN = None
+MAILROOM_POOL_SIZE = 10  # max connections kept open to mailroom per process
+MAILROOM_TIMEOUT = (5, 60)  # connect and read timeouts in seconds
+MAILROOM_RETRIES = 0 if TESTING else 2  # retries of failed connections and idempotent requests
 
 # -----------------------------------------------------------------------------------
 # WebSockets (realtime messaging server)
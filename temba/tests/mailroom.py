@@ -1,5 +1,6 @@
 import copy
 import functools
+import itertools
 import re
 from collections import defaultdict
 from dataclasses import asdict
@@ -197,11 +198,11 @@ class LiveMailroomError(BaseException):
 
 
 def _guarded_mailroom_request(self, endpoint, payload=None, post=True, encode_json=False):
-    # a patched transport (e.g. patch("requests.post")) means no real network call happens - that's how the
+    # a patched transport (e.g. patch("requests.Session.post")) means no real network call happens - that's how the
     # MailroomClient's own request-construction tests work, so let those through to the real _request. this only
-    # detects Mock-based patches; patch("requests.post", new=<plain callable>) would slip past, but that form
+    # detects Mock-based patches; patch("requests.Session.post", new=<plain callable>) would slip past, but that form
     # isn't used against requests here.
-    transport = requests.post if post else requests.get
+    transport = requests.Session.post if post else requests.Session.get
     if isinstance(transport, NonCallableMock):
         return _real_mailroom_request(self, endpoint, payload=payload, post=post, encode_json=encode_json)
 
@@ -455,6 +456,10 @@ class TestClient(MailroomClient):
 
         return [str(u) for u in group.contacts.order_by("id").values_list("uuid", flat=True)]
 
+    @_client_method
+    def contact_export_batches(self, org, group, query: str, batch_size: int = 1000):
+        return itertools.batched(self.contact_export(org, group, query), batch_size)
+
     @_client_method
     def contact_export_preview(self, org, group, query: str) -> int:
         if self.mocks._contact_export_preview:
@@ -8,8 +8,8 @@ import openpyxl
 
 from django.conf import settings
 from django.db import models
-from django.db.models import F, Q, Sum, Value
-from django.db.models.functions import Cast, Lower
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -18,9 +18,9 @@ from temba.contacts.models import Contact
 from temba.orgs.models import DependencyMixin, Export, ExportType, Org, OrgMembership
 from temba.users.models import User
 from temba.utils.dates import date_range
-from temba.utils.db.functions import SplitPart
 from temba.utils.export import MultiSheetExporter
 from temba.utils.models import TembaModel
+from temba.utils.models.counts import CountsCache
 from temba.utils.uuid import is_uuid
 
 logger = logging.getLogger(__name__)
@@ -207,6 +207,8 @@ class Ticket(models.Model):
 
     MAX_NOTE_LENGTH = 10_000
 
+    counts_cache = CountsCache("tickets")
+
     uuid = models.UUIDField(unique=True)
     org = models.ForeignKey(Org, on_delete=models.PROTECT, related_name="tickets", db_index=False)  # indexed below
     contact = models.ForeignKey(Contact, on_delete=models.PROTECT, related_name="tickets", db_index=False)
@@ -238,36 +240,43 @@ class Ticket(models.Model):
     @classmethod
     def bulk_assign(cls, org, user: User, tickets: list, assignee: User, *, via_api=False) -> list[str]:
         return cls._bulk_response(
-            mailroom.get_client().ticket_change_assignee(org, user, tickets, assignee, via="api" if via_api else "ui")
+            org,
+            mailroom.get_client().ticket_change_assignee(org, user, tickets, assignee, via="api" if via_api else "ui"),
         )
 
     @classmethod
     def bulk_add_note(cls, org, user: User, tickets: list, note: str, *, via_api=False) -> list[str]:
         return cls._bulk_response(
-            mailroom.get_client().ticket_add_note(org, user, tickets, note, via="api" if via_api else "ui")
+            org,
+            mailroom.get_client().ticket_add_note(org, user, tickets, note, via="api" if via_api else "ui"),
+            counts_changed=False,
         )
 
     @classmethod
     def bulk_change_topic(cls, org, user: User, tickets: list, topic: Topic, *, via_api=False) -> list[str]:
         return cls._bulk_response(
-            mailroom.get_client().ticket_change_topic(org, user, tickets, topic, via="api" if via_api else "ui")
+            org, mailroom.get_client().ticket_change_topic(org, user, tickets, topic, via="api" if via_api else "ui")
         )
 
     @classmethod
     def bulk_close(cls, org, user, tickets, *, via_api=False) -> list[str]:
         return cls._bulk_response(
-            mailroom.get_client().ticket_close(org, user, tickets, via="api" if via_api else "ui")
+            org, mailroom.get_client().ticket_close(org, user, tickets, via="api" if via_api else "ui")
         )
 
     @classmethod
     def bulk_reopen(cls, org, user, tickets, *, via_api=False) -> list[str]:
         return cls._bulk_response(
-            mailroom.get_client().ticket_reopen(org, user, tickets, via="api" if via_api else "ui")
+            org, mailroom.get_client().ticket_reopen(org, user, tickets, via="api" if via_api else "ui")
         )
 
     @classmethod
-    def _bulk_response(cls, resp: dict) -> list[str]:
-        return resp.get("changed_uuids", [])
+    def _bulk_response(cls, org, resp: dict, *, counts_changed: bool = True) -> list[str]:
+        changed_uuids = resp.get("changed_uuids", [])
+        if changed_uuids and counts_changed:
+            cls.counts_cache.invalidate(org.id)
+
+        return changed_uuids
 
     @classmethod
     def get_accessible(cls, org, user):
@@ -288,36 +297,44 @@ class Ticket(models.Model):
 
         return qs
 
+    @classmethod
+    def get_counts(cls, org):
+        """
+        Gets all ticket counts for the given org as a matrix of status x topic x assignee.
+        """
+
+        # count scopes are stored as 'tickets:<status>:<topic-id>:<assignee-id>' so fetch all counts with the prefix
+        # 'tickets:' grouped by scope in a single query and parse them here
+        scope_totals = cls.counts_cache.get_all(org.id, lambda: org.counts.prefix("tickets:").scope_totals())
+
+        totals = {}
+        for scope, count in scope_totals.items():
+            parts = scope.split(":")
+            if len(parts) == 4 and count:
+                totals[(parts[1], int(parts[2]), int(parts[3]))] = count
+
+        return TicketCounts(totals)
+
     @classmethod
     def get_assignee_count(cls, org, user, topics, status: str) -> int:
         """
         Gets the count of tickets assigned to the given user across the given topics and status.
         """
-        return org.counts.filter(scope__in=[f"tickets:{status}:{t.id}:{user.id if user else 0}" for t in topics]).sum()
+        return cls.get_counts(org).get_assignee_count(user, topics, status)
 
     @classmethod
     def get_status_count(cls, org, topics, status: str) -> int:
         """
         Gets the count across the given topics and status.
         """
-        return org.counts.prefix([f"tickets:{status}:{t.id}:" for t in topics]).sum()
+        return cls.get_counts(org).get_status_count(topics, status)
 
     @classmethod
     def get_topic_counts(cls, org, topics, status: str) -> dict[Topic, int]:
         """
         Gets the count for each topic and the given status.
         """
-
-        # count scopes are stored as 'tickets:<status>:<topic-id>:<assignee-id>' so get all counts with the prefix
-        # 'tickets:<status>:' and group by topic-id extracted as the 3rd split part.
-        counts = (
-            org.counts.prefix(f"tickets:{status}:")
-            .annotate(topic_id=Cast(SplitPart(F("scope"), Value(":"), Value(3)), output_field=models.IntegerField()))
-            .values_list("topic_id")
-            .annotate(count_sum=Sum("count"))
-        )
-        by_topic_id = {c[0]: c[1] for c in counts}
-        return {t: by_topic_id.get(t.id, 0) for t in topics}
+        return cls.get_counts(org).get_topic_counts(topics, status)
 
     def __str__(self):
         return f"Ticket[uuid={self.uuid}, topic={self.topic.name}]"
@@ -345,6 +362,34 @@ class Ticket(models.Model):
         ]
 
 
+class TicketCounts:
+    """
+    Ticket counts for an org by status, topic id and assignee id, where unassigned tickets have assignee id 0.
+    """
+
+    def __init__(self, totals: dict[tuple[str, int, int], int]):
+        self.totals = totals
+
+    def get_assignee_count(self, user, topics, status: str) -> int:
+        topic_ids = {t.id for t in topics}
+        assignee_id = user.id if user else 0
+
+        return sum(c for (s, t, a), c in self.totals.items() if s == status and t in topic_ids and a == assignee_id)
+
+    def get_status_count(self, topics, status: str) -> int:
+        topic_ids = {t.id for t in topics}
+
+        return sum(c for (s, t, a), c in self.totals.items() if s == status and t in topic_ids)
+
+    def get_topic_counts(self, topics, status: str) -> dict:
+        by_topic_id = defaultdict(int)
+        for (s, t, a), c in self.totals.items():
+            if s == status:
+                by_topic_id[t] += c
+
+        return {t: by_topic_id[t.id] for t in topics}
+
+
 class TicketFolder(metaclass=ABCMeta):
     slug = None
     name = None
@@ -521,13 +566,19 @@ class TicketExport(ExportType):
     download_prefix = "tickets"
 
     @classmethod
-    def create(cls, org, user, start_date, end_date, with_fields=(), with_groups=()):
+    def create(
+        cls, org, user, start_date, end_date, with_fields=(), with_groups=(), format=MultiSheetExporter.FORMAT_XLSX
+    ):
         return Export.objects.create(
             org=org,
             export_type=cls.slug,
             start_date=start_date,
             end_date=end_date,
-            config={"with_fields": [f.id for f in with_fields], "with_groups": [g.id for g in with_groups]},
+            config={
+                "with_fields": [f.id for f in with_fields],
+                "with_groups": [g.id for g in with_groups],
+                "format": format,
+            },
             created_by=user,
         )
 
@@ -543,7 +594,7 @@ class TicketExport(ExportType):
             .using("readonly")
         )
 
-        exporter = MultiSheetExporter("Tickets", headers, export.org.timezone)
+        exporter = MultiSheetExporter("Tickets", headers, export.org.timezone, format=export.format)
         num_records = 0
 
         # add tickets to the export in batches of 1k to limit memory usage
@@ -1,10 +1,13 @@
 from datetime import date
 from unittest.mock import call
 
+from django.test.utils import override_settings
+from django.utils import timezone
+
 from temba.contacts.models import Contact
 from temba.orgs.models import OrgRole
 from temba.orgs.tasks import squash_item_counts
-from temba.tests import TembaTest, mock_mailroom
+from temba.tests import TembaTest, cleanup, mock_mailroom
 from temba.tickets.models import Team, Ticket, Topic, export_ticket_stats
 from temba.utils.uuid import uuid7
 
@@ -261,6 +264,54 @@ class TicketTest(TembaTest):
             {c["scope"]: c["count"] for c in self.org.counts.order_by("scope").values("scope", "count")},
         )
 
+    @mock_mailroom
+    @cleanup(valkey=True)
+    def test_get_counts(self, mr_mocks):
+        general = self.org.default_topic
+        cats = Topic.create(self.org, self.admin, "Cats")
+        contact = self.create_contact("Bob", urns=["twitter:bobby"])
+
+        t1 = self.create_ticket(contact, topic=general, assignee=self.agent)
+        self.create_ticket(contact, topic=general)
+        self.create_ticket(contact, topic=cats, closed_on=timezone.now())
+        self.create_ticket(self.create_contact("Jim", urns=["twitter:jimmy"], org=self.org2))
+
+        with override_settings(COUNTS_CACHE_TTL=60):
+            with self.assertNumQueries(1):
+                counts = Ticket.get_counts(self.org)
+
+            self.assertEqual(
+                {("O", general.id, self.agent.id): 1, ("O", general.id, 0): 1, ("C", cats.id, 0): 1}, counts.totals
+            )
+            self.assertEqual(1, counts.get_assignee_count(self.agent, [general, cats], Ticket.STATUS_OPEN))
+            self.assertEqual(1, counts.get_assignee_count(None, [general, cats], Ticket.STATUS_OPEN))
+            self.assertEqual(0, counts.get_assignee_count(None, [cats], Ticket.STATUS_OPEN))
+            self.assertEqual(2, counts.get_status_count([general, cats], Ticket.STATUS_OPEN))
+            self.assertEqual(1, counts.get_status_count([general, cats], Ticket.STATUS_CLOSED))
+            self.assertEqual({general: 2, cats: 0}, counts.get_topic_counts([general, cats], Ticket.STATUS_OPEN))
+
+            # second call is served from the cache
+            with self.assertNumQueries(0):
+                self.assertEqual(counts.totals, Ticket.get_counts(self.org).totals)
+
+            # changes we don't know about are stale until the cache expires
+            self.create_ticket(contact, topic=cats)
+
+            self.assertEqual(counts.totals, Ticket.get_counts(self.org).totals)
+
+            # but ticket actions invalidate the cache
+            Ticket.bulk_close(self.org, self.admin, [t1])
+
+            self.assertEqual(
+                {
+                    ("O", general.id, 0): 1,
+                    ("O", cats.id, 0): 1,
+                    ("C", general.id, self.agent.id): 1,
+                    ("C", cats.id, 0): 1,
+                },
+                Ticket.get_counts(self.org).totals,
+            )
+
     def test_export_ticket_stats(self):
         sales = Team.create(self.org, self.admin, "Sales")
         self.org.add_user(self.agent, OrgRole.AGENT, team=sales)
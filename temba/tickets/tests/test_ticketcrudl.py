@@ -1018,7 +1018,7 @@ class TicketCRUDLTest(TembaTest, CRUDLTestMixin):
         response = self.assertUpdateFetch(
             export_url,
             [self.editor, self.admin],
-            form_fields=("start_date", "end_date", "with_fields", "with_groups"),
+            form_fields=("start_date", "end_date", "with_fields", "with_groups", "format"),
         )
         self.assertNotContains(response, "already an export in progress")
 
@@ -1078,6 +1078,7 @@ class TicketCRUDLTest(TembaTest, CRUDLTestMixin):
                 "end_date": "2022-09-28",
                 "with_groups": [testers.id],
                 "with_fields": [gender.id],
+                "format": "csv.gz",
             },
         )
         self.assertEqual(200, response.status_code)
@@ -1087,6 +1088,6 @@ class TicketCRUDLTest(TembaTest, CRUDLTestMixin):
         self.assertEqual(date(2022, 6, 28), export.start_date)
         self.assertEqual(date(2022, 9, 28), export.end_date)
         self.assertEqual(
-            {"with_groups": [testers.id], "with_fields": [gender.id]},
+            {"with_groups": [testers.id], "with_fields": [gender.id], "format": "csv.gz"},
             export.config,
         )
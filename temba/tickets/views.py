@@ -209,10 +209,11 @@ class TicketCRUDL(SmartCRUDL):
             org = self.request.org
             user = self.request.user
             topics = Topic.get_accessible(org, user).order_by("-is_system", "name")
+            ticket_counts = Ticket.get_counts(org)
             counts = {
-                MineFolder.slug: Ticket.get_assignee_count(org, user, topics, Ticket.STATUS_OPEN),
-                UnassignedFolder.slug: Ticket.get_assignee_count(org, None, topics, Ticket.STATUS_OPEN),
-                AllFolder.slug: Ticket.get_status_count(org, topics, Ticket.STATUS_OPEN),
+                MineFolder.slug: ticket_counts.get_assignee_count(user, topics, Ticket.STATUS_OPEN),
+                UnassignedFolder.slug: ticket_counts.get_assignee_count(None, topics, Ticket.STATUS_OPEN),
+                AllFolder.slug: ticket_counts.get_status_count(topics, Ticket.STATUS_OPEN),
             }
 
             menu = []
@@ -229,7 +230,7 @@ class TicketCRUDL(SmartCRUDL):
 
             menu.append(self.create_divider())
 
-            counts = Ticket.get_topic_counts(org, topics, Ticket.STATUS_OPEN)
+            counts = ticket_counts.get_topic_counts(topics, Ticket.STATUS_OPEN)
             topic_items = [
                 {
                     "id": topic.uuid,
@@ -857,5 +858,11 @@ class TicketCRUDL(SmartCRUDL):
             with_fields = form.cleaned_data["with_fields"]
             with_groups = form.cleaned_data["with_groups"]
             return TicketExport.create(
-                org, user, start_date, end_date, with_fields=with_fields, with_groups=with_groups
+                org,
+                user,
+                start_date,
+                end_date,
+                with_fields=with_fields,
+                with_groups=with_groups,
+                format=form.cleaned_data["format"],
             )
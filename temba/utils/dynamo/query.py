@@ -1,32 +1,81 @@
+import heapq
 import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+logger = logging.getLogger(__name__)
 
-def batch_get(table, keys: list[tuple]) -> list:
+# shared pool for querying partitions concurrently
+QUERY_MAX_WORKERS = 16
+_executor = None
+
+# how many times to retry unprocessed keys in a batch get
+BATCH_GET_MAX_RETRIES = 5
+BATCH_GET_RETRY_DELAY = 0.05  # doubled on each retry
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if not _executor:
+        _executor = ThreadPoolExecutor(max_workers=QUERY_MAX_WORKERS, thread_name_prefix="dynamo")
+
+    return _executor
+
+
+def _map(func, args: list, concurrent: bool) -> list:
+    """
+    Maps the given function over the given args, using our shared pool if concurrent and there's more than one
+    """
+    if concurrent and len(args) > 1:
+        return list(_get_executor().map(func, args))
+
+    return [func(a) for a in args]
+
+
+def batch_get(table, keys: list[tuple], *, concurrent=True) -> list:
     """
     Performs a batch get item operation on the given table for the provided keys.
     """
     if not keys:
         return []
 
-    items = []
+    # uses the table's client rather than the table itself because unlike resources, clients are thread safe
+    client = table.meta.client
+
+    def get_batch(key_batch) -> list:
+        request = {table.name: {"Keys": [{"PK": pk, "SK": sk} for pk, sk in key_batch]}}
+        items = []
 
-    for key_batch in itertools.batched(keys, 100):
-        key_attrs = [{"PK": pk, "SK": sk} for pk, sk in key_batch]
-        response = table.meta.client.batch_get_item(RequestItems={table.name: {"Keys": key_attrs}})
+        for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+            if attempt > 0:
+                time.sleep(BATCH_GET_RETRY_DELAY * (2 ** (attempt - 1)))
 
-        items.extend(response.get("Responses", {}).get(table.name, []))
+            response = client.batch_get_item(RequestItems=request)
+            items.extend(response.get("Responses", {}).get(table.name, []))
+
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+        else:
+            logger.warning(f"giving up on {len(request[table.name]['Keys'])} unprocessed keys from {table.name}")
 
-    return items
+        return items
 
+    return list(itertools.chain(*_map(get_batch, list(itertools.batched(keys, 100)), concurrent)))
 
-def merged_page_query(table, pks: list, *, desc=False, limit=50, after_sk=None) -> tuple[list, str | None, str | None]:
+
+def merged_page_query(
+    table, pks: list, *, desc=False, limit=50, after_sk=None, concurrent=True
+) -> tuple[list, str | None, str | None]:
     """
     Performs a paginated query across multiple partition keys merging the results into a single page. Returns a tuple
     of the results for the page, the previous page's after SK (if any), and the next page's after SK (if any).
     """
 
     # fetch this page +1 from all partitions
-    merged = _merged_partition_query(table, pks, limit=limit + 1, desc=desc, after_sk=after_sk)
+    merged = _merged_partition_query(table, pks, limit=limit + 1, desc=desc, after_sk=after_sk, concurrent=concurrent)
 
     has_next_after = len(merged) > limit  # if we got +1 then there's a next page
 
@@ -36,18 +85,23 @@ def merged_page_query(table, pks: list, *, desc=False, limit=50, after_sk=None)
 
     if after_sk:
         # if we're not on the first page, query backwards to find the after for the previous page
-        merged = _merged_partition_query(table, pks, limit=limit, desc=not desc, after_sk=after_sk, sks_only=True)
+        merged = _merged_partition_query(
+            table, pks, limit=limit, desc=not desc, after_sk=after_sk, sks_only=True, concurrent=concurrent
+        )
         if len(merged) >= limit:
             prev_after_sk = merged[-1]["SK"]
 
     return page, prev_after_sk, next_after_sk
 
 
-def _merged_partition_query(table, pks: list, *, limit: int, desc: bool, after_sk: str | None, sks_only=False):
-    merged = []
+def _merged_partition_query(
+    table, pks: list, *, limit: int, desc: bool, after_sk: str | None, sks_only=False, concurrent=True
+):
+    client = table.meta.client
 
-    for pk in pks:
+    def query_partition(pk) -> list:
         kwargs = dict(
+            TableName=table.name,
             KeyConditionExpression="PK = :pk",
             ExpressionAttributeValues={":pk": pk},
             ScanIndexForward=not desc,
@@ -62,11 +116,13 @@ def _merged_partition_query(table, pks: list, *, limit: int, desc: bool, after_s
         if after_sk:
             kwargs["ExclusiveStartKey"] = {"PK": pk, "SK": after_sk}
 
-        response = table.query(**kwargs)
-        merged.extend(response["Items"])
+        return client.query(**kwargs)["Items"]
+
+    # each partition's items are already sorted so we can do a k-way merge of them
+    partitions = _map(query_partition, pks, concurrent)
+    merged = heapq.merge(*partitions, key=lambda x: x["SK"], reverse=desc)
 
-    merged.sort(key=lambda x: x["SK"], reverse=desc)
-    return merged[:limit]
+    return list(itertools.islice(merged, limit))
 
 
 def delete_partition(table, pk: str) -> int:
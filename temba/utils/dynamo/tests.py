@@ -1,4 +1,5 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.conf import settings
 
@@ -132,3 +133,69 @@ class DynamoTest(TembaTest):
         self.assertEqual([items[1], items[0]], page)
         self.assertEqual("bar#106", prev_after_sk)
         self.assertIsNone(next_after_sk)  # no next page
+
+        # same results if partitions are queried one after another
+        page, prev_after_sk, next_after_sk = dynamo.merged_page_query(
+            dynamo.MAIN, pks, desc=True, limit=4, after_sk="bar#106", concurrent=False
+        )
+        self.assertEqual([items[5], items[4], items[3], items[2]], page)
+        self.assertIsNone(prev_after_sk)
+        self.assertEqual("bar#102", next_after_sk)
+
+    @cleanup(dynamodb=True)
+    def test_batch_get_batches_and_retries(self):
+        with dynamo.MAIN.batch_writer() as batch:
+            for x in range(250):
+                batch.put_item(Item={"PK": f"foo#{x % 3}", "SK": f"bar#{x:03}", "OrgID": Decimal(1), "Data": {}})
+
+        keys = [(f"foo#{x % 3}", f"bar#{x:03}") for x in range(250)]
+
+        # keys are fetched in 3 concurrent batches of up to 100
+        items = dynamo.batch_get(dynamo.MAIN, keys)
+        self.assertEqual(250, len(items))
+        self.assertEqual({k for k in keys}, {(i["PK"], i["SK"]) for i in items})
+
+        client = dynamo.MAIN.meta.client
+        real_batch_get_item = client.batch_get_item
+        calls = []
+
+        def batch_get_item(RequestItems):
+            calls.append(len(RequestItems[dynamo.MAIN.name]["Keys"]))
+
+            # first call only returns the first key and reports the others as unprocessed
+            if len(calls) == 1:
+                table_keys = RequestItems[dynamo.MAIN.name]["Keys"]
+                response = real_batch_get_item(RequestItems={dynamo.MAIN.name: {"Keys": table_keys[:1]}})
+                response["UnprocessedKeys"] = {dynamo.MAIN.name: {"Keys": table_keys[1:]}}
+                return response
+
+            return real_batch_get_item(RequestItems=RequestItems)
+
+        with patch.object(client, "batch_get_item", side_effect=batch_get_item):
+            with patch("temba.utils.dynamo.query.BATCH_GET_RETRY_DELAY", 0):
+                items = dynamo.batch_get(dynamo.MAIN, keys[:5], concurrent=False)
+
+        self.assertEqual([5, 4], calls)
+        self.assertEqual({k for k in keys[:5]}, {(i["PK"], i["SK"]) for i in items})
+
+        # if keys are still unprocessed after all retries, we give up on them and return what we got
+        calls = []
+
+        def batch_get_item_throttled(RequestItems):
+            calls.append(len(RequestItems[dynamo.MAIN.name]["Keys"]))
+
+            table_keys = RequestItems[dynamo.MAIN.name]["Keys"]
+            response = real_batch_get_item(RequestItems={dynamo.MAIN.name: {"Keys": table_keys[:1]}})
+            response["UnprocessedKeys"] = {dynamo.MAIN.name: {"Keys": table_keys[1:]}}
+            return response
+
+        with patch.object(client, "batch_get_item", side_effect=batch_get_item_throttled):
+            with patch("temba.utils.dynamo.query.BATCH_GET_RETRY_DELAY", 0):
+                with self.assertLogs("temba.utils.dynamo.query", level="WARNING") as logs:
+                    items = dynamo.batch_get(dynamo.MAIN, keys[:10], concurrent=False)
+
+        self.assertEqual([10, 9, 8, 7, 6, 5], calls)  # initial call + BATCH_GET_MAX_RETRIES
+        self.assertEqual({k for k in keys[:6]}, {(i["PK"], i["SK"]) for i in items})
+        self.assertEqual(
+            [f"WARNING:temba.utils.dynamo.query:giving up on 4 unprocessed keys from {dynamo.MAIN.name}"], logs.output
+        )
@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template import loader
@@ -15,6 +17,7 @@ class EmailSender:
         self.branding = branding
         self.connection = connection  # can be none to use default Django email connection
         self.from_email = from_email if from_email else getattr(settings, "DEFAULT_FROM_EMAIL", "website@rapidpro.io")
+        self._templates = {}  # resolved templates by path, reused across sends
 
     @classmethod
     def from_email_type(cls, branding: dict, email_type: str):
@@ -46,13 +49,33 @@ class EmailSender:
 
         return cls(branding, connection, from_email)
 
+    @contextmanager
+    def open(self):
+        """
+        Keeps a single connection open for all emails sent by this sender inside the context.
+        """
+        original = self.connection
+        if not self.connection:
+            self.connection = get_connection()
+
+        self.connection.open()
+        try:
+            yield self
+        finally:
+            self.connection.close()
+            self.connection = original
+
     def render_template(self, template_path: str, postfixes, context: dict):
         for postfix in postfixes:
-            try:
-                template = loader.get_template(f"{template_path}{postfix}")
-                return template.render(context)
-            except loader.TemplateDoesNotExist:
-                pass
+            path = f"{template_path}{postfix}"
+            if path not in self._templates:
+                try:
+                    self._templates[path] = loader.get_template(path)
+                except loader.TemplateDoesNotExist:
+                    self._templates[path] = None
+
+            if self._templates[path]:
+                return self._templates[path].render(context)
         return None
 
     def send(self, recipients: list, template: str, context: dict, subject: str = None):
@@ -1,4 +1,7 @@
+import csv
 import gc
+import gzip
+import io
 import logging
 from datetime import datetime
 
@@ -30,22 +33,17 @@ def prepare_value(value, tz=None):
     raise ValueError(f"Unsupported type for excel export: {type(value)}")
 
 
-class MultiSheetExporter:
+class XLSXWriter:
     """
-    Utility to aid writing a stream of rows which may exceed the 1048576 limit on rows per sheet, and require adding
-    new sheets.
+    Streaming writer which writes rows into a write-only XLSX workbook, adding new sheets when a sheet is full
     """
 
-    MAX_EXCEL_ROWS = 1_048_576
-    MAX_EXCEL_COLS = 16384
+    extension = "xlsx"
 
-    def __init__(self, base_sheet_name: str, headers: list, tz):
+    def __init__(self, base_sheet_name: str, headers: list, max_rows: int):
         self.base_sheet_name = base_sheet_name
         self.headers = headers
-        self.tz = tz
-
-        self.current_sheet = 0
-        self.current_row = 0
+        self.max_rows = max_rows
 
         self.workbook = XLSXBook()
         self.sheet_number = 0
@@ -59,6 +57,80 @@ class MultiSheetExporter:
         self.sheet.append_row(*self.headers)
         self.sheet_row = 2
 
+    def write_row(self, values: list):
+        # time for a new sheet? do it
+        if self.sheet_row > self.max_rows:
+            self._add_sheet()
+
+        self.sheet.append_row(*values)
+        self.sheet_row += 1
+
+    def finalize(self):
+        temp_file = NamedTemporaryFile(delete=False, suffix=".xlsx", mode="wb+")
+        self.workbook.finalize(to_file=temp_file)
+        return temp_file
+
+
+class CSVGzipWriter:
+    """
+    Streaming writer which writes rows to a gzipped CSV file, buffering rows in memory and flushing them in fixed
+    size chunks so that memory usage is constant regardless of the number of rows.
+    """
+
+    extension = "csv.gz"
+
+    CHUNK_ROWS = 1000
+
+    def __init__(self, base_sheet_name: str, headers: list, max_rows: int):
+        self.temp_file = NamedTemporaryFile(delete=False, suffix=".csv.gz", mode="wb+")
+        self.gzip_file = gzip.GzipFile(fileobj=self.temp_file, mode="wb", compresslevel=6)
+        self.buffer = io.StringIO()
+        self.csv = csv.writer(self.buffer)
+        self.buffered = 0
+
+        self.write_row(headers)
+
+    def write_row(self, values: list):
+        self.csv.writerow(values)
+        self.buffered += 1
+
+        if self.buffered >= self.CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self):
+        self.gzip_file.write(self.buffer.getvalue().encode("utf-8"))
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.buffered = 0
+
+    def finalize(self):
+        self._flush()
+        self.gzip_file.close()  # doesn't close the underlying file
+        return self.temp_file
+
+
+class MultiSheetExporter:
+    """
+    Utility to aid writing a stream of rows which may exceed the 1048576 limit on rows per sheet, and require adding
+    new sheets. Rows are streamed to the writer for the requested format so memory usage doesn't grow with the
+    number of rows.
+    """
+
+    FORMAT_XLSX = "xlsx"
+    FORMAT_CSV_GZ = "csv.gz"
+    WRITERS = {FORMAT_XLSX: XLSXWriter, FORMAT_CSV_GZ: CSVGzipWriter}
+
+    MAX_EXCEL_ROWS = 1_048_576
+    MAX_EXCEL_COLS = 16384
+
+    def __init__(self, base_sheet_name: str, headers: list, tz, format: str = FORMAT_XLSX):
+        assert format in self.WRITERS, f"unsupported export format: {format}"
+
+        self.headers = headers
+        self.tz = tz
+        self.format = format
+        self.writer = self.WRITERS[format](base_sheet_name, headers, self.MAX_EXCEL_ROWS)
+
     def write_row(self, values):
         """
         Writes the passed in row to our exporter, taking care of creating new sheets if necessary
@@ -66,12 +138,7 @@ class MultiSheetExporter:
 
         assert len(values) == len(self.headers), "need same number of column values as column headers"
 
-        # time for a new sheet? do it
-        if self.sheet_row > self.MAX_EXCEL_ROWS:
-            self._add_sheet()
-
-        self.sheet.append_row(*[prepare_value(v, self.tz) for v in values])
-        self.sheet_row += 1
+        self.writer.write_row([prepare_value(v, self.tz) for v in values])
 
     def save_file(self):
         """
@@ -79,11 +146,10 @@ class MultiSheetExporter:
         """
         gc.collect()  # force garbage collection
 
-        temp_file = NamedTemporaryFile(delete=False, suffix=".xlsx", mode="wb+")
-        self.workbook.finalize(to_file=temp_file)
+        temp_file = self.writer.finalize()
         temp_file.flush()
 
-        return temp_file, "xlsx"
+        return temp_file, self.writer.extension
 
 
 def response_from_workbook(workbook, filename: str) -> HttpResponse:
@@ -1,3 +1,5 @@
+import csv
+import gzip
 import os
 from datetime import datetime
 from unittest.mock import PropertyMock, patch
@@ -107,3 +109,40 @@ class ExportTest(TembaTest):
         self.assertEqual(32 + 16, len(list(sheet2.columns)))
 
         os.unlink(temp_file.name)
+
+    @patch("temba.utils.export.models.CSVGzipWriter.CHUNK_ROWS", 10)
+    def test_multisheetexporter_csv(self):
+        exporter = MultiSheetExporter(
+            "test", ["Name", "Age", "Joined", "Active"], self.org.timezone, format=MultiSheetExporter.FORMAT_CSV_GZ
+        )
+
+        joined = datetime(2017, 2, 7, 15, 41, 23, 123_456).replace(tzinfo=ZoneInfo("Africa/Nairobi"))
+
+        # write enough rows to require several flushes and one partial chunk
+        for i in range(25):
+            exporter.write_row([f"Bob {i}", i, joined, i % 2 == 0])
+
+        temp_file, file_ext = exporter.save_file()
+
+        self.assertEqual("csv.gz", file_ext)
+
+        with gzip.open(temp_file.name, "rt", newline="") as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(26, len(rows))
+        self.assertEqual(["Name", "Age", "Joined", "Active"], rows[0])
+        self.assertEqual(["Bob 0", "0", "2017-02-07 14:41:23", "True"], rows[1])
+        self.assertEqual(["Bob 24", "24", "2017-02-07 14:41:23", "True"], rows[25])
+
+        os.unlink(temp_file.name)
+
+    def test_csv_export(self):
+        export = ContactExport.create(
+            org=self.org, user=self.admin, group=self.group, format=MultiSheetExporter.FORMAT_CSV_GZ
+        )
+        export.perform()
+
+        export.refresh_from_db()
+        self.assertEqual(Export.STATUS_COMPLETE, export.status)
+        self.assertEqual("csv.gz", export.extension)
+        self.assertTrue(export.path.endswith(f"/{export.uuid}.csv.gz"))
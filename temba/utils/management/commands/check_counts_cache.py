@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from temba.contacts.models import ContactGroup, ContactGroupCount
+from temba.msgs.models import Label, LabelCount, MsgFolder, folder_counts_cache
+from temba.orgs.models import Org
+
+
+class Command(BaseCommand):
+    help = "Compares cached folder, label and group totals for a workspace with the totals in the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("org_id", type=int, help="ID of the workspace to check")
+        parser.add_argument("--fix", action="store_true", help="Invalidate cached totals which don't match")
+
+    def handle(self, org_id: int, fix: bool, **options):
+        org = Org.objects.filter(id=org_id, is_active=True).first()
+        if not org:
+            raise CommandError(f"No such workspace with id {org_id}")
+
+        scopes = [folder._count_scope for folder in MsgFolder] + ["msgs:folder:E", "msgs:folder:C"]
+        folder_totals = org.counts.filter(scope__in=scopes).scope_totals()
+        labels = list(Label.get_active_for_org(org))
+        label_totals = dict(
+            LabelCount.objects.filter(label__in=labels, is_archived=False)
+            .values_list("label_id")
+            .annotate(count_sum=Sum("count"))
+        )
+
+        checks = (
+            (folder_counts_cache, {s: folder_totals.get(s, 0) for s in scopes}),
+            (LabelCount.totals_cache, {str(lb.id): label_totals.get(lb.id, 0) for lb in labels}),
+            (ContactGroupCount.totals_cache, self._get_group_totals(org)),
+        )
+
+        for cache, db_totals in checks:
+            cached = cache.peek(org.id)
+            mismatches = {k: (v, db_totals.get(k, 0)) for k, v in cached.items() if v != db_totals.get(k, 0)}
+            hits, misses, hit_rate = cache.get_hit_rate()
+
+            self.stdout.write(
+                f"{cache.name}: cached={len(cached)} mismatched={len(mismatches)} "
+                f"hits={hits} misses={misses} hit_rate={hit_rate:.1%}"
+            )
+
+            for key, (cached_total, db_total) in sorted(mismatches.items()):
+                self.stdout.write(f" > {key}: cached={cached_total} db={db_total}")
+
+            if mismatches and fix:
+                cache.invalidate(org.id)
+                self.stdout.write(" > invalidated")
+
+    def _get_group_totals(self, org) -> dict:
+        groups = ContactGroup.objects.filter(org=org, is_active=True)
+        counts = (
+            ContactGroupCount.objects.filter(group__in=groups).values_list("group_id").annotate(count_sum=Sum("count"))
+        )
+        return {str(group_id): total for group_id, total in counts}
@@ -1,9 +1,12 @@
 from io import StringIO
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test.utils import override_settings
 
-from temba.tests import TembaTest
+from temba.contacts.models import ContactGroupCount
+from temba.msgs.models import Msg, MsgFolder
+from temba.tests import TembaTest, cleanup
 from temba.utils import dynamo, s3
 
 from .create_buckets import BUCKETS
@@ -69,3 +72,59 @@ class MigrateDynamoTest(TembaTest):
 
         self.assertIn("Skipping TempMain", out.getvalue())
         self.assertIn("Skipping TempHistory", out.getvalue())
+
+
+class CheckCountsCacheTest(TembaTest):
+    @cleanup(valkey=True)
+    def test_command(self):
+        label = self.create_label("Spam")
+        group = self.create_group("Testers", contacts=[self.create_contact("Bob", phone="+1234567890")])
+
+        self.create_incoming_msg(self.create_contact("Ann", phone="+1234567891"), "Hi")
+
+        with override_settings(COUNTS_CACHE_TTL=60):
+            self.assertEqual(1, MsgFolder.get_counts(self.org)[MsgFolder.INBOX])
+            self.assertEqual(0, label.get_visible_count())
+            self.assertEqual(1, group.get_member_count())
+
+            # second calls are served from the cache
+            self.assertEqual(1, MsgFolder.get_counts(self.org)[MsgFolder.INBOX])
+            self.assertEqual(1, group.get_member_count())
+
+            self.assertEqual((1, 1, 0.5), ContactGroupCount.totals_cache.get_hit_rate())
+
+            out = StringIO()
+            call_command("check_counts_cache", self.org.id, stdout=out)
+
+            self.assertIn("folders: cached=8 mismatched=0", out.getvalue())
+            self.assertIn("labels: cached=1 mismatched=0", out.getvalue())
+            self.assertIn("groups: cached=1 mismatched=0 hits=1 misses=1 hit_rate=50.0%", out.getvalue())
+
+            # change the database without going through anything that invalidates the cache
+            self.create_incoming_msg(self.create_contact("Cat", phone="+1234567892"), "Hello")
+
+            self.assertEqual(1, MsgFolder.get_counts(self.org)[MsgFolder.INBOX])  # stale until TTL expires
+
+            out = StringIO()
+            call_command("check_counts_cache", self.org.id, "--fix", stdout=out)
+
+            self.assertIn("folders: cached=8 mismatched=1", out.getvalue())
+            self.assertIn(" > msgs:folder:I: cached=1 db=2", out.getvalue())
+            self.assertIn(" > invalidated", out.getvalue())
+
+            self.assertEqual(2, MsgFolder.get_counts(self.org)[MsgFolder.INBOX])
+
+            # actions on messages invalidate cached counts
+            msg = self.create_incoming_msg(self.create_contact("Dan", phone="+1234567893"), "Hey")
+            Msg.apply_action_archive(self.admin, [msg])
+
+            self.assertEqual(2, MsgFolder.get_counts(self.org)[MsgFolder.INBOX])
+            self.assertEqual(1, MsgFolder.get_counts(self.org)[MsgFolder.ARCHIVED])
+
+            msg2 = self.create_incoming_msg(self.create_contact("Eve", phone="+1234567894"), "Yo")
+            label.toggle_label([msg2], add=True)
+
+            self.assertEqual(1, label.get_visible_count())
+
+        with self.assertRaises(CommandError):
+            call_command("check_counts_cache", 12345678)
@@ -1,5 +1,9 @@
+import time
 from datetime import date
 
+from django_valkey import get_valkey_connection
+
+from django.conf import settings
 from django.db import connection, models
 from django.db.models import Q, Sum
 
@@ -24,7 +28,9 @@ class BaseSquashableCount(models.Model):
     """
 
     squash_over = ()
-    squash_max_distinct = 5000
+    squash_max_distinct = 5000  # max number of sets squashed per call to squash
+    squash_batch_size = 500  # max number of sets squashed per statement
+    squash_tracked = None  # optional column whose values across squashed sets are passed to on_squashed
 
     id = models.BigAutoField(auto_created=True, primary_key=True)
     count = models.BigIntegerField()
@@ -41,49 +47,79 @@ class BaseSquashableCount(models.Model):
         return cls.objects.filter(is_squashed=False)
 
     @classmethod
-    def squash(cls) -> int:
+    def squash(cls) -> dict:
         """
         Squashes all distinct sets of counts with unsquashed rows into a single row if they sum to non-zero or just
-        deletes them if they sum to zero. Returns the number of sets squashed.
+        deletes them if they sum to zero. Sets are squashed in batches, with each batch squashed by a single statement.
+        Returns stats of the number of sets squashed, the number of rows removed and the time taken.
         """
 
-        num_sets = 0
-        squash_over = cls.get_squash_over()
-        distinct_sets = (
-            cls.get_unsquashed()
-            .values(*squash_over)
-            .order_by(*squash_over)
-            .distinct(*squash_over)[: cls.squash_max_distinct]
-        )
-
-        for distinct_set in distinct_sets:
+        start = time.perf_counter()
+        num_sets, num_removed = 0, 0
+
+        while num_sets < cls.squash_max_distinct:
+            batch_size = min(cls.squash_batch_size, cls.squash_max_distinct - num_sets)
+
             with connection.cursor() as cursor:
-                sql, params = cls.get_squash_query(distinct_set)
+                sql, params = cls.get_squash_query(batch_size)
 
                 cursor.execute(sql, params)
+                batch_sets, batch_removed, batch_tracked = cursor.fetchone()
+
+            if batch_tracked:
+                cls.on_squashed(set(batch_tracked))
+
+            num_sets += batch_sets
+            num_removed += batch_removed
 
-            num_sets += 1
+            if batch_sets < batch_size:  # no more sets with unsquashed rows
+                break
 
-        return num_sets
+        return {"sets": num_sets, "removed": num_removed, "time": round(time.perf_counter() - start, 3)}
+
+    @classmethod
+    def get_squash_rollups(cls) -> list[str]:
+        """
+        Gets additional statements to be run as part of each squash statement. These can select from `removed` which
+        includes the `is_squashed` value of each removed row, so that the unsquashed deltas can be rolled up elsewhere
+        exactly once.
+        """
+        return []
+
+    @classmethod
+    def on_squashed(cls, tracked: set):
+        """
+        Called after each squash statement with the distinct values of the `squash_tracked` column of squashed sets.
+        """
 
     @classmethod
-    def get_squash_query(cls, distinct_set: dict) -> tuple:
+    def get_squash_query(cls, max_sets: int) -> tuple:
+        """
+        Gets the statement which squashes up to the given number of distinct sets with unsquashed rows. Rows are
+        deleted and their sums re-inserted in the same statement so concurrently inserted rows are either included in
+        the sum or left unsquashed for the next squash.
+        """
         squash_over = cls.get_squash_over()
-        delete_cond = " AND ".join([f'"{col}" = %s' for col in squash_over])
-        insert_cols = ", ".join([f'"{col}"' for col in squash_over])
-        insert_vals = ", ".join(["%s"] * len(squash_over))
+        table = cls._meta.db_table
+        cols = ", ".join([f'"{col}"' for col in squash_over])
+        removed_cols = ", ".join([f't."{col}"' for col in squash_over])
+        join_cond = " AND ".join([f't."{col}" = s."{col}"' for col in squash_over])
+        rollups = "".join([f", rollup{i} AS ({r})" for i, r in enumerate(cls.get_squash_rollups())])
+        tracked = f'ARRAY(SELECT DISTINCT "{cls.squash_tracked}" FROM sets)' if cls.squash_tracked else "NULL"
 
         sql = f"""
-        WITH removed as (
-            DELETE FROM {cls._meta.db_table} WHERE {delete_cond} RETURNING "count"
-        )
-        INSERT INTO {cls._meta.db_table}({insert_cols}, "count", "is_squashed")
-        SELECT {insert_vals}, s.total, TRUE FROM (
-            SELECT COALESCE(SUM("count"), 0) AS "total" FROM removed
-        ) s WHERE s.total != 0;
+        WITH sets AS (
+            SELECT DISTINCT {cols} FROM {table} WHERE NOT "is_squashed" ORDER BY {cols} LIMIT %s
+        ), removed AS (
+            DELETE FROM {table} t USING sets s WHERE {join_cond} RETURNING {removed_cols}, t."count", t."is_squashed"
+        ), inserted AS (
+            INSERT INTO {table}({cols}, "count", "is_squashed")
+            SELECT {cols}, SUM("count"), TRUE FROM removed GROUP BY {cols} HAVING SUM("count") != 0
+        ){rollups}
+        SELECT (SELECT COUNT(*) FROM sets), (SELECT COUNT(*) FROM removed), {tracked};
         """
 
-        return sql, tuple(distinct_set[col] for col in squash_over) * 2
+        return sql, (max_sets,)
 
     class Meta:
         abstract = True
@@ -172,3 +208,96 @@ class BaseDailyCount(BaseScopedCount):
 
     class Meta:
         abstract = True
+
+
+class CountsCache:
+    """
+    Read-through cache in valkey of totals from count tables, stored as a hash per org of keys (e.g. scopes or ids) to
+    totals. Counts are inserted by database triggers so we can't update totals as they change, and instead entries
+    live for COUNTS_CACHE_TTL seconds and are invalidated on changes we know about.
+    """
+
+    STATS_KEY = "counts_cache_stats"
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _key(self, org_id: int) -> str:
+        return f"counts_cache:{self.name}:{org_id}"
+
+    def get(self, org_id: int, keys: list, fetch) -> dict:
+        """
+        Gets totals for the given keys, calling fetch with any keys not in the cache to get their totals
+        """
+        ttl = settings.COUNTS_CACHE_TTL
+        if not ttl:
+            return fetch(keys)
+
+        r = get_valkey_connection()
+        key = self._key(org_id)
+        cached = r.hmget(key, [str(k) for k in keys]) if keys else []
+        totals = {k: int(v) for k, v in zip(keys, cached) if v is not None}
+        missing = [k for k in keys if k not in totals]
+
+        with r.pipeline(transaction=False) as pipe:
+            if missing:
+                fetched = fetch(missing)
+                totals.update({k: fetched.get(k, 0) for k in missing})
+
+                pipe.hset(key, mapping={str(k): totals[k] for k in missing})
+                pipe.expire(key, ttl, nx=True)  # only set the TTL when we create the hash
+
+            pipe.hincrby(self.STATS_KEY, f"{self.name}:hits", len(keys) - len(missing))
+            pipe.hincrby(self.STATS_KEY, f"{self.name}:misses", len(missing))
+            pipe.execute()
+
+        return totals
+
+    def get_all(self, org_id: int, fetch) -> dict:
+        """
+        Gets all totals for the given org, calling fetch with no arguments to get them if they're not cached. Caches
+        used this way should only be populated by this method, so that an existing hash is always complete.
+        """
+        ttl = settings.COUNTS_CACHE_TTL
+        if not ttl:
+            return fetch()
+
+        r = get_valkey_connection()
+        key = self._key(org_id)
+        cached = r.hgetall(key)
+
+        with r.pipeline(transaction=False) as pipe:
+            if cached:
+                totals = {k.decode(): int(v) for k, v in cached.items()}
+            else:
+                totals = fetch()
+
+                if totals:
+                    pipe.hset(key, mapping=totals)
+                    pipe.expire(key, ttl)
+
+            pipe.hincrby(self.STATS_KEY, f"{self.name}:hits", 1 if cached else 0)
+            pipe.hincrby(self.STATS_KEY, f"{self.name}:misses", 0 if cached else 1)
+            pipe.execute()
+
+        return totals
+
+    def peek(self, org_id: int) -> dict:
+        """
+        Gets the currently cached totals for the given org without fetching anything
+        """
+        r = get_valkey_connection()
+        return {k.decode(): int(v) for k, v in r.hgetall(self._key(org_id)).items()}
+
+    def invalidate(self, org_id: int):
+        r = get_valkey_connection()
+        r.delete(self._key(org_id))
+
+    def get_hit_rate(self) -> tuple[int, int, float]:
+        """
+        Gets the number of hits and misses, and the hit rate as a fraction
+        """
+        r = get_valkey_connection()
+        hits, misses = r.hmget(self.STATS_KEY, [f"{self.name}:hits", f"{self.name}:misses"])
+        hits, misses = int(hits or 0), int(misses or 0)
+        return hits, misses, (hits / (hits + misses)) if (hits + misses) else 0.0
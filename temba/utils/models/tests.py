@@ -1,14 +1,19 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import Group
 from django.core import checks
 from django.db import connection, models
 from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
 
+from temba.channels.models import ChannelEvent
 from temba.contacts.models import Contact
-from temba.tests import TembaTest
+from temba.tests import TembaTest, cleanup, matchers
 
-from .base import delete_in_batches, patch_queryset_count, update_if_changed
+from .base import delete_by_keyset, delete_in_batches, patch_queryset_count, split_key_range, update_if_changed
+from .counts import CountsCache
 from .es import SearchSliceQuerySet
 from .fields import JSONAsTextField
 
@@ -50,6 +55,91 @@ class ModelsTest(TembaTest):
         self.assertTrue(Group.objects.filter(id=to_keep.id).exists())
         self.assertEqual(4, Group.objects.filter(id__in=[g.id for g in to_delete]).count())
 
+    def test_delete_by_keyset(self):
+        to_keep = Group.objects.create(name="Test")
+        to_delete = [Group.objects.create(name=f"YY{i}") for i in range(10)]
+
+        # groups have m2m relations so batches are deleted through the collector
+        stats = delete_by_keyset(Group.objects.filter(name__startswith="YY"), batch_size=3)
+
+        self.assertEqual({"deleted": 10, "time": matchers.Float(), "rate": matchers.Float()}, stats)
+        self.assertTrue(Group.objects.filter(id=to_keep.id).exists())
+        self.assertEqual(0, Group.objects.filter(id__in=[g.id for g in to_delete]).count())
+
+        # nothing to delete
+        with self.assertNumQueries(1):
+            stats = delete_by_keyset(Group.objects.filter(name__startswith="YY"), batch_size=3)
+
+        self.assertEqual({"deleted": 0, "time": matchers.Float(), "rate": 0.0}, stats)
+
+        # channel events have no cascades so each batch is fetched and then raw deleted
+        contact = self.create_contact("Bob", phone="+1234567890")
+        events = [
+            ChannelEvent.objects.create(
+                org=self.org,
+                channel=self.channel,
+                event_type=ChannelEvent.TYPE_NEW_CONVERSATION,
+                contact=contact,
+                occurred_on=timezone.now(),
+            )
+            for i in range(5)
+        ]
+
+        with self.assertNumQueries(6):  # bounds, 2 x (fetch batch, delete batch), fetch empty batch
+            stats = delete_by_keyset(ChannelEvent.objects.filter(id__in=[e.id for e in events[1:]]), batch_size=2)
+
+        self.assertEqual(4, stats["deleted"])
+        self.assertEqual([events[0]], list(ChannelEvent.objects.filter(id__in=[e.id for e in events])))
+
+        # with multiple workers the key range is split between threads, each closing its own connections when done..
+        # but threads can't see rows created inside the test transaction so the executor here runs ranges inline
+        class InlineExecutor:
+            def __init__(self, max_workers):
+                self.max_workers = max_workers
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def map(self, fn, *iterables):
+                return list(map(fn, *iterables))
+
+        events = [
+            ChannelEvent.objects.create(
+                org=self.org,
+                channel=self.channel,
+                event_type=ChannelEvent.TYPE_NEW_CONVERSATION,
+                contact=contact,
+                occurred_on=timezone.now(),
+            )
+            for i in range(5)
+        ]
+
+        with (
+            patch("temba.utils.models.base.ThreadPoolExecutor", InlineExecutor),
+            patch("temba.utils.models.base.connections.close_all") as mock_close_all,
+        ):
+            stats = delete_by_keyset(
+                ChannelEvent.objects.filter(id__in=[e.id for e in events]), batch_size=2, workers=2
+            )
+
+        self.assertEqual(5, stats["deleted"])
+        self.assertEqual(2, mock_close_all.call_count)
+        self.assertEqual(0, ChannelEvent.objects.filter(id__in=[e.id for e in events]).count())
+
+        # a delete that takes no measurable time doesn't blow up calculating the rate
+        with patch("temba.utils.models.base.time.perf_counter", return_value=1.0):
+            stats = delete_by_keyset(ChannelEvent.objects.filter(id__in=[e.id for e in events]))
+
+        self.assertEqual({"deleted": 0, "time": 0.0, "rate": 0.0}, stats)
+
+    def test_split_key_range(self):
+        self.assertEqual([(1, 4), (5, 8), (9, 10)], split_key_range(1, 10, 3))
+        self.assertEqual([(5, 5), (6, 6)], split_key_range(5, 6, 4))
+        self.assertEqual([(7, 7)], split_key_range(7, 7, 2))
+
     def test_update_if_changed(self):
         with self.assertNumQueries(1):
             changed = update_if_changed(self.admin, first_name="Andrew", last_name="McAdmin")  # all fields changing
@@ -82,6 +172,76 @@ class ModelsTest(TembaTest):
         self.assertEqual("McAdmin", self.admin.last_name)
 
 
+class CountsCacheTest(TembaTest):
+    @cleanup(valkey=True)
+    def test_get(self):
+        cache = CountsCache("test")
+        fetches = []
+
+        def fetch(keys: list) -> dict:
+            fetches.append(keys)
+            return {k: k * 10 for k in keys if k != 3}
+
+        # caching disabled so always fetches
+        self.assertEqual({1: 10, 2: 20}, cache.get(self.org.id, [1, 2], fetch))
+        self.assertEqual({}, cache.peek(self.org.id))
+
+        with override_settings(COUNTS_CACHE_TTL=60):
+            self.assertEqual({1: 10, 2: 20}, cache.get(self.org.id, [1, 2], fetch))
+            self.assertEqual({"1": 10, "2": 20}, cache.peek(self.org.id))
+
+            # only missing keys are fetched, and keys without totals are cached as zero
+            self.assertEqual({1: 10, 2: 20, 3: 0}, cache.get(self.org.id, [1, 2, 3], fetch))
+            self.assertEqual({1: 10, 3: 0}, cache.get(self.org.id, [1, 3], fetch))
+            self.assertEqual({}, cache.get(self.org.id, [], fetch))
+
+            self.assertEqual([[1, 2], [1, 2], [3]], fetches)
+            self.assertEqual((4, 3, 4 / 7), cache.get_hit_rate())
+
+            # other orgs have their own entries
+            self.assertEqual({}, cache.peek(self.org2.id))
+
+            cache.invalidate(self.org.id)
+
+            self.assertEqual({}, cache.peek(self.org.id))
+            self.assertEqual({1: 10}, cache.get(self.org.id, [1], fetch))
+            self.assertEqual([[1, 2], [1, 2], [3], [1]], fetches)
+
+    @cleanup(valkey=True)
+    def test_get_all(self):
+        cache = CountsCache("test")
+        totals = {"a": 1, "b": 2}
+        fetches = []
+
+        def fetch() -> dict:
+            fetches.append(True)
+            return dict(totals)
+
+        self.assertEqual({"a": 1, "b": 2}, cache.get_all(self.org.id, fetch))
+        self.assertEqual({}, cache.peek(self.org.id))
+
+        with override_settings(COUNTS_CACHE_TTL=60):
+            self.assertEqual({"a": 1, "b": 2}, cache.get_all(self.org.id, fetch))
+
+            totals["a"] = 5
+
+            self.assertEqual({"a": 1, "b": 2}, cache.get_all(self.org.id, fetch))  # served from cache
+            self.assertEqual(2, len(fetches))
+            self.assertEqual((1, 1, 0.5), cache.get_hit_rate())
+
+            cache.invalidate(self.org.id)
+
+            self.assertEqual({"a": 5, "b": 2}, cache.get_all(self.org.id, fetch))
+
+            # empty totals aren't cached
+            totals.clear()
+            cache.invalidate(self.org.id)
+
+            self.assertEqual({}, cache.get_all(self.org.id, fetch))
+            self.assertEqual({}, cache.get_all(self.org.id, fetch))
+            self.assertEqual(5, len(fetches))
+
+
 class SearchSliceQuerySetTest(TembaTest):
     def test_fields(self):
         ann = self.create_contact("Ann", urns=["tel:+12340000001"])